@@ -21,6 +21,7 @@ def clear_all_data():
             'logs_systeme',
             'conflits', 
             'surveillances',
+            'indisponibilites_professeurs',
             'examens',
             'sessions_examen',
             'inscriptions',
@@ -63,8 +63,15 @@ OPTIMIZATION_CONFIG = {
         ('13:45', '15:15'),
         ('15:30', '17:00')
     ],
-    'optimization_timeout_seconds': 45,
-    'prioritize_department_supervisors': True
+    'optimization_timeout_seconds': 45,  # borne de toute la génération (anytime: amélioration jusqu'à ce délai)
+    'prioritize_department_supervisors': True,
+    # Cache disque des plans (clé = empreinte des données + hash des paramètres)
+    'plan_cache_dir': os.getenv('PLAN_CACHE_DIR', os.path.join(os.path.dirname(os.path.abspath(__file__)), '.plan_cache')),
+    'plan_cache_max_entries': 5,  # par session
+    # Points de contrôle des générations longues (reprise après interruption)
+    'checkpoint_dir': os.getenv('CHECKPOINT_DIR', os.path.join(os.path.dirname(os.path.abspath(__file__)), '.checkpoints')),
+    # Générations en arrière-plan (services/jobs.py): 1 = générations exécutées l'une après l'autre
+    'job_workers': 1
 }
 
 # Créneaux horaires
@@ -0,0 +1,218 @@
+"""
+Recherche locale par recuit simulé pour améliorer un plan d'examens
+- Mouvements: déplacer un module vers un autre créneau, échanger deux modules,
+  insérer un module non planifié
+- Salles et surveillants re-placés à chaque mouvement (_find_rooms_and_supervisors)
+- Évaluation INCRÉMENTALE de l'objectif: seuls les termes touchés par le mouvement
+  sont recalculés (cohortes du module, surveillants concernés)
+"""
+import math
+import random
+import time
+from typing import Dict, List, Optional, Set
+
+import numpy as np
+
+
+# Poids de l'objectif (à minimiser)
+DEFAULT_WEIGHTS = {
+    'unscheduled': 10000.0,  # Module non planifié
+    'spread': 1.0,           # Étudiant avec examens le même jour ou des jours consécutifs
+    'load': 10.0,            # Somme des carrés des charges surveillants (équilibrage)
+}
+
+
+class SimulatedAnnealing:
+    """
+    Amélioration d'un plan ExamScheduler par recuit simulé.
+    Objectif = w_u·non planifiés + w_s·étalement étudiants + w_l·Σ charge²
+    - étalement: Σ_cohortes taille × (paires d'examens même jour + jours consécutifs)
+    - Σ charge²: à total constant, minimiser la somme des carrés = minimiser la variance
+    """
+    
+    def __init__(self, scheduler, unscheduled: List[int], config: Dict = None, seed: int = 0):
+        self.scheduler = scheduler
+        self.config = config or {}
+        self.weights = {**DEFAULT_WEIGHTS, **self.config.get('annealing_weights', {})}
+        self.rng = random.Random(seed)
+        
+        self.unscheduled: Set[int] = set(unscheduled)
+        self.sizes = np.asarray(scheduler.cohort_sizes, dtype=np.int64)
+        self.n_days = len(scheduler.day_index)
+        
+        # Créneaux autorisés par module (division par département)
+        self.allowed_slots = {
+            module_id: scheduler._get_slots_for_dept(groups[0].dept_id, module_id)
+            for module_id, groups in scheduler.exams_by_module.items()
+        }
+        
+        self.stats = {'moves': 0, 'accepted': 0, 'improvements': 0, 'infeasible': 0}
+    
+    # Termes incrémentaux
+    
+    def _spread_cost(self, module_id: int, day: int) -> float:
+        """
+        Coût d'étalement d'un examen du module ce jour, occupation courante exclue de
+        l'examen lui-même: Σ taille × (même jour + veille + lendemain)
+        """
+        cohort_ids = self.scheduler.module_cohorts.get(module_id)
+        if cohort_ids is None or not len(cohort_ids):
+            return 0.0
+        occupancy = self.scheduler.cohort_day_exams
+        lo, hi = max(day - 1, 0), min(day + 2, self.n_days)
+        window = occupancy[cohort_ids, lo:hi].astype(np.int64).sum(axis=1)
+        return float(self.sizes[cohort_ids] @ window)
+    
+    def _load_snapshot(self, touched: Dict[int, int], assignments):
+        """Mémorise la charge initiale des surveillants touchés par le mouvement"""
+        loads = self.scheduler.prof_total_supervisions
+        for _, _, prof_ids in assignments:
+            for prof_id in prof_ids:
+                touched.setdefault(prof_id, loads[prof_id])
+    
+    def _load_delta(self, touched: Dict[int, int]) -> float:
+        loads = self.scheduler.prof_total_supervisions
+        return float(sum(loads[p] ** 2 - before ** 2 for p, before in touched.items()))
+    
+    # Opérations élémentaires (journalisées pour annulation)
+    
+    def _remove(self, module_id: int, journal: List, touched: Dict[int, int]) -> float:
+        scheduler = self.scheduler
+        placement = scheduler.placements[module_id]
+        self._load_snapshot(touched, placement.assignments)
+        scheduler._unplace_module(module_id, sync=False)
+        journal.append(('removed', module_id, placement))
+        return -self._spread_cost(module_id, scheduler.day_index[placement.slot.date])
+    
+    def _insert(self, module_id: int, slot, journal: List, touched: Dict[int, int]) -> Optional[float]:
+        scheduler = self.scheduler
+        if not scheduler._check_student_availability(module_id, slot):
+            return None
+        assignments = scheduler._find_rooms_and_supervisors(scheduler.exams_by_module[module_id], slot)
+        if not assignments:
+            return None
+        cost = self._spread_cost(module_id, scheduler.day_index[slot.date])
+        self._load_snapshot(touched, assignments)
+        scheduler._commit_assignments(module_id, assignments, slot)
+        journal.append(('placed', module_id, None))
+        return cost
+    
+    def _undo(self, journal: List):
+        scheduler = self.scheduler
+        for action, module_id, placement in reversed(journal):
+            if action == 'placed':
+                scheduler._unplace_module(module_id, sync=False)
+            else:
+                scheduler._commit_assignments(module_id, placement.assignments, placement.slot)
+    
+    # Mouvements
+    
+    def _random_slot(self, module_id: int, exclude=None):
+        slots = self.allowed_slots.get(module_id) or []
+        if not slots:
+            return None
+        slot = self.rng.choice(slots)
+        return None if exclude is not None and slot == exclude else slot
+    
+    def _propose(self, journal: List, touched: Dict[int, int]) -> Optional[float]:
+        """
+        Applique un mouvement aléatoire - retourne le delta pondéré (hors charge) ou None si
+        infaisable
+        """
+        scheduler = self.scheduler
+        w_spread = self.weights['spread']
+        
+        # Insertion d'un module non planifié
+        if self.unscheduled and self.rng.random() < 0.3:
+            module_id = self.rng.choice(tuple(self.unscheduled))
+            slot = self._random_slot(module_id)
+            if slot is None:
+                return None
+            cost = self._insert(module_id, slot, journal, touched)
+            return None if cost is None else w_spread * cost - self.weights['unscheduled']
+        
+        placed = list(scheduler.placements)
+        if not placed:
+            return None
+        
+        # Déplacement d'un module
+        if self.rng.random() < 0.7 or len(placed) < 2:
+            module_id = self.rng.choice(placed)
+            old_slot = scheduler.placements[module_id].slot
+            slot = self._random_slot(module_id, exclude=old_slot)
+            if slot is None:
+                return None
+            delta = self._remove(module_id, journal, touched)
+            cost = self._insert(module_id, slot, journal, touched)
+            return None if cost is None else w_spread * (delta + cost)
+        
+        # Échange de deux modules
+        m1, m2 = self.rng.sample(placed, 2)
+        s1, s2 = scheduler.placements[m1].slot, scheduler.placements[m2].slot
+        if s1 == s2 or s2 not in self.allowed_slots.get(m1, ()) or s1 not in self.allowed_slots.get(m2, ()):
+            return None
+        delta = self._remove(m1, journal, touched) + self._remove(m2, journal, touched)
+        cost1 = self._insert(m1, s2, journal, touched)
+        if cost1 is None:
+            return None
+        cost2 = self._insert(m2, s1, journal, touched)
+        return None if cost2 is None else w_spread * (delta + cost1 + cost2)
+    
+    # Boucle principale
+    
+    def run(self, deadline: float) -> List[int]:
+        """Recuit jusqu'à l'échéance - retourne la liste des modules non planifiés du meilleur plan"""
+        scheduler = self.scheduler
+        t0 = self.config.get('annealing_t0', 100.0)
+        t_end = self.config.get('annealing_t_end', 0.5)
+        start = time.time()
+        budget = max(deadline - start, 1e-9)
+        w_load = self.weights['load']
+        
+        current = best = 0.0
+        best_placements = dict(scheduler.placements)
+        best_unscheduled = set(self.unscheduled)
+        temperature = t0
+        
+        while True:
+            if self.stats['moves'] % 64 == 0:
+                elapsed = time.time() - start
+                if elapsed >= budget or scheduler._should_stop():
+                    break
+                temperature = t0 * (t_end / t0) ** (elapsed / budget)
+            self.stats['moves'] += 1
+            
+            journal: List = []
+            touched: Dict[int, int] = {}
+            delta = self._propose(journal, touched)
+            if delta is None:
+                self.stats['infeasible'] += 1
+                self._undo(journal)
+                continue
+            delta += w_load * self._load_delta(touched)
+            
+            if delta <= 0 or self.rng.random() < math.exp(-delta / temperature):
+                self.stats['accepted'] += 1
+                current += delta
+                for action, module_id, _ in journal:
+                    if action == 'placed':
+                        self.unscheduled.discard(module_id)
+                if current < best - 1e-9:
+                    best = current
+                    best_placements = dict(scheduler.placements)
+                    best_unscheduled = set(self.unscheduled)
+                    self.stats['improvements'] += 1
+            else:
+                self._undo(journal)
+        
+        # Restaurer le meilleur plan rencontré (le recuit peut finir en montée)
+        if current > best:
+            scheduler._reset_plan_state()
+            for module_id, placement in best_placements.items():
+                scheduler._commit_assignments(module_id, placement.assignments, placement.slot)
+            self.unscheduled = best_unscheduled
+        scheduler._rebuild_scheduled_exams()
+        
+        self.stats['objective_delta'] = round(best, 2)
+        self.stats['moves_per_second'] = round(self.stats['moves'] / max(time.time() - start, 1e-9))
+        return [m for m in scheduler.exams_by_module if m in self.unscheduled]
@@ -0,0 +1,160 @@
+"""
+Points de contrôle du planificateur (reprise après interruption sans recharger la base)
+- <base>.npz: tableaux (graphe de conflits, cohortes, examens planifiés, matrices
+  d'occupation, charges des surveillants) - non compressé: écriture et relecture en quelques ms
+- <base>.pkl: petit en-tête (phase, modules non planifiés, paramètres, données de
+  référence: créneaux, salles, professeurs, groupes d'examens, graine des essais perturbés)
+Les deux fichiers portent le même tampon; ils sont remplacés atomiquement (npz puis en-tête).
+"""
+import sys
+import os
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import pickle
+import time
+import uuid
+from typing import Dict, List, Optional
+
+import numpy as np
+from scipy import sparse
+
+from config import OPTIMIZATION_CONFIG
+
+
+CHECKPOINT_VERSION = 1
+
+# Données préchargées stockées dans l'en-tête (le reste est en tableaux)
+HEADER_STATE = (
+    'session_info', 'departments', 'rooms', 'professors', 'slots', 'slots_by_dept',
+    'day_index', 'exams_by_module', 'module_index', 'prof_unavailable'
+)
+
+
+def checkpoint_path(session_id: int) -> str:
+    """Base des fichiers du point de contrôle d'une session"""
+    directory = OPTIMIZATION_CONFIG.get('checkpoint_dir', '.checkpoints')
+    return os.path.join(directory, f"session_{session_id}")
+
+
+def has_checkpoint(path: str) -> bool:
+    return os.path.exists(f"{path}.pkl") and os.path.exists(f"{path}.npz")
+
+
+def remove_checkpoint(path: str):
+    for suffix in ('.pkl', '.npz'):
+        try:
+            os.remove(path + suffix)
+        except OSError:
+            pass
+
+
+def _replace(path: str, write):
+    """Écrit dans un fichier temporaire puis le renomme (jamais de fichier à moitié écrit)"""
+    tmp = f"{path}.{os.getpid()}.tmp"
+    with open(tmp, 'wb') as f:
+        write(f)
+    os.replace(tmp, path)
+
+
+def save_checkpoint(scheduler, path: str, phase: str, unscheduled: List[int], elapsed: float) -> float:
+    """
+    Sauvegarde l'état compact du planificateur; phase = 'loaded' (données chargées),
+    'greedy' (boucle gloutonne en cours) ou 'improve' (plan de base terminé).
+    Retourne la durée de l'écriture (s).
+    """
+    t0 = time.time()
+    os.makedirs(os.path.dirname(path) or '.', exist_ok=True)
+    stamp = uuid.uuid4().hex
+    
+    graph = scheduler.conflict_graph.tocsr()
+    cohort_keys = np.array(list(scheduler.module_cohorts), dtype=np.int64)
+    cohort_lists = [scheduler.module_cohorts[m] for m in cohort_keys.tolist()]
+    slot_pos = {slot: i for i, slot in enumerate(scheduler.slots)}
+    exams = scheduler.scheduled_exams
+    prof_pos = {p['id']: i for i, p in enumerate(scheduler.professors)}
+    loads = np.zeros(len(scheduler.professors), dtype=np.int64)
+    for prof_id, load in scheduler.prof_total_supervisions.items():
+        if prof_id in prof_pos:
+            loads[prof_pos[prof_id]] = load
+    
+    arrays = {
+        'stamp': np.array(stamp),
+        'module_ids': scheduler.module_ids,
+        'module_degree': scheduler.module_degree,
+        'module_conflict_weight': scheduler.module_conflict_weight,
+        'cohort_sizes': np.asarray(scheduler.cohort_sizes, dtype=np.int64),
+        'graph_data': graph.data,
+        'graph_indices': graph.indices,
+        'graph_indptr': graph.indptr,
+        'graph_shape': np.array(graph.shape, dtype=np.int64),
+        'cohort_keys': cohort_keys,
+        'cohort_indptr': np.cumsum([0] + [len(c) for c in cohort_lists], dtype=np.int64),
+        'cohort_values': np.concatenate(cohort_lists) if cohort_lists else np.zeros(0, dtype=np.intp),
+        # Plan: (module, salle, position du créneau, effectif, durée) + surveillants en CSR
+        'exams': np.array(
+            [(se.module_id, se.salle_id, slot_pos[se.slot], se.nb_etudiants, se.duree_minutes) for se in exams],
+            dtype=np.int64
+        ).reshape(-1, 5),
+        'exam_prof_indptr': np.cumsum([0] + [len(se.prof_ids) for se in exams], dtype=np.int64),
+        'exam_prof_ids': np.array([p for se in exams for p in se.prof_ids], dtype=np.int64),
+        'cohort_day_exams': scheduler.cohort_day_exams,
+        'module_day': scheduler.module_day,
+        'prof_loads': loads,
+    }
+    header = {name: getattr(scheduler, name) for name in HEADER_STATE}
+    header['exams_by_module'] = dict(header['exams_by_module'])
+    header.update({
+        'version': CHECKPOINT_VERSION,
+        'stamp': stamp,
+        'session_id': scheduler.session_id,
+        'config': scheduler.config,
+        'phase': phase,
+        'unscheduled': list(unscheduled),
+        'elapsed': elapsed,
+        'groupes': [se.groupe for se in exams],
+        'precheck': scheduler.precheck,
+        'best_score': scheduler.best_score,
+        'anytime_stats': dict(scheduler.anytime_stats),  # itérations = graine du prochain essai perturbé
+        'saved_at': time.time(),
+    })
+    
+    _replace(f"{path}.npz", lambda f: np.savez(f, **arrays))
+    _replace(f"{path}.pkl", lambda f: pickle.dump(header, f, protocol=pickle.HIGHEST_PROTOCOL))
+    return time.time() - t0
+
+
+def load_checkpoint(path: str) -> Optional[Dict]:
+    """
+    Relit un point de contrôle → {'state': données préchargées (format export_state),
+    'header': en-tête, 'arrays': tableaux}; None si absent, incomplet ou d'une autre version.
+    """
+    try:
+        with open(f"{path}.pkl", 'rb') as f:
+            header = pickle.load(f)
+        arrays = dict(np.load(f"{path}.npz", allow_pickle=False))
+    except (OSError, ValueError, EOFError, pickle.UnpicklingError):
+        return None
+    if header.get('version') != CHECKPOINT_VERSION or str(arrays['stamp']) != header['stamp']:
+        return None
+    
+    indptr = arrays['cohort_indptr']
+    values = arrays['cohort_values'].astype(np.intp)
+    state = {name: header[name] for name in HEADER_STATE}
+    state.update({
+        'session_id': header['session_id'],
+        'config': header['config'],
+        'deadline': None,
+        'module_ids': arrays['module_ids'],
+        'module_degree': arrays['module_degree'],
+        'module_conflict_weight': arrays['module_conflict_weight'],
+        'cohort_sizes': arrays['cohort_sizes'].tolist(),
+        'conflict_graph': sparse.csr_matrix(
+            (arrays['graph_data'], arrays['graph_indices'], arrays['graph_indptr']),
+            shape=tuple(arrays['graph_shape'])
+        ),
+        'module_cohorts': {
+            module_id: values[indptr[i]:indptr[i + 1]]
+            for i, module_id in enumerate(arrays['cohort_keys'].tolist())
+        },
+    })
+    return {'state': state, 'header': header, 'arrays': arrays}
@@ -0,0 +1,185 @@
+"""
+Générations de planning en arrière-plan
+- pool de threads du processus serveur (OPTIMIZATION_CONFIG job_workers, 1 par défaut:
+  les générations soumises s'exécutent l'une après l'autre)
+- registre local en mémoire: survit aux reruns Streamlit (la page interroge l'état)
+- progression et meilleur plan intermédiaire via le progress_callback du planificateur;
+  annulation via request_stop: le meilleur plan complet est enregistré; arrêtée avant la fin
+  de la passe gloutonne, la génération n'enregistre rien (le plan existant est conservé)
+"""
+import sys
+import os
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import threading
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, List, Optional
+
+from config import OPTIMIZATION_CONFIG
+from services.optimization import run_optimization
+
+
+# États d'une génération
+JOB_STATUSES = ('en_attente', 'en_cours', 'termine', 'annule', 'erreur')
+ACTIVE_STATUSES = ('en_attente', 'en_cours')
+
+# Générations terminées gardées dans le registre
+MAX_FINISHED_JOBS = 20
+
+_jobs: Dict[str, Dict] = {}
+_lock = threading.Lock()
+_executor: Optional[ThreadPoolExecutor] = None
+
+
+def _get_executor() -> ThreadPoolExecutor:
+    global _executor
+    with _lock:
+        if _executor is None:
+            _executor = ThreadPoolExecutor(
+                max_workers=OPTIMIZATION_CONFIG.get('job_workers', 1),
+                thread_name_prefix='generation'
+            )
+        return _executor
+
+
+def _update(job_id: str, **fields):
+    with _lock:
+        _jobs[job_id].update(fields)
+
+
+def _prune():
+    """Oublie les plus anciennes générations terminées (appelé sous verrou)"""
+    finished = sorted(
+        (job for job in _jobs.values() if job['status'] not in ACTIVE_STATUSES),
+        key=lambda job: job['created']
+    )
+    for job in finished[:-MAX_FINISHED_JOBS]:
+        del _jobs[job['id']]
+
+
+def _run(job_id: str):
+    """Exécute une génération dans un thread du pool"""
+    with _lock:
+        job = _jobs.get(job_id)
+        # Annulé avant son démarrage (déjà oublié par _prune si la file était longue)
+        if job is None or job['status'] != 'en_attente':
+            return
+        job.update(status='en_cours', started=time.time())
+    
+    def on_start(scheduler):
+        with _lock:
+            job['scheduler'] = scheduler
+            cancelled = job['cancel_requested']
+        if cancelled:
+            scheduler.request_stop()
+    
+    def progress(value: float, best_plan: Optional[Dict]):
+        scheduler = job.get('scheduler')
+        fields = {'progress': float(min(max(value, 0.0), 1.0))}
+        if scheduler is not None:
+            fields['scheduled'] = len(scheduler.scheduled_exams)
+        if best_plan:
+            fields.update(
+                best_scheduled=best_plan['scheduled'],
+                best_unscheduled=len(best_plan['unscheduled']),
+                score=best_plan['score'],
+            )
+        _update(job_id, **fields)
+    
+    try:
+        result = run_optimization(job['session_id'], job['config'], progress_callback=progress, on_start=on_start)
+    except Exception as e:
+        result = {'success': False, 'error': str(e)}
+    
+    if not result.get('success'):
+        status = 'erreur'
+    elif job['cancel_requested']:
+        status = 'annule'
+    else:
+        status = 'termine'
+    with _lock:
+        job.update(
+            status=status, progress=1.0, result=result, error=result.get('error'),
+            finished=time.time(), scheduler=None
+        )
+        _prune()
+
+
+def submit_generation(session_id: int, config: Dict = None) -> str:
+    """Soumet une génération (run_optimization) au pool; retourne l'identifiant du job"""
+    job_id = uuid.uuid4().hex[:12]
+    with _lock:
+        _jobs[job_id] = {
+            'id': job_id,
+            'session_id': session_id,
+            'config': dict(config or {}),
+            'status': 'en_attente',
+            'progress': 0.0,
+            'scheduled': 0,
+            'best_scheduled': None,
+            'best_unscheduled': None,
+            'score': None,
+            'result': None,
+            'error': None,
+            'created': time.time(),
+            'started': None,
+            'finished': None,
+            'cancel_requested': False,
+            'scheduler': None,
+        }
+    _get_executor().submit(_run, job_id)
+    return job_id
+
+
+def get_job_status(job_id: str) -> Optional[Dict]:
+    """Copie de l'état d'un job (sans le planificateur) + durée écoulée; None si inconnu"""
+    with _lock:
+        job = _jobs.get(job_id)
+        if job is None:
+            return None
+        status = {k: v for k, v in job.items() if k != 'scheduler'}
+    if status['started']:
+        status['elapsed'] = (status['finished'] or time.time()) - status['started']
+    else:
+        status['elapsed'] = 0.0
+    return status
+
+
+def cancel_job(job_id: str) -> bool:
+    """
+    Annule un job: retiré de la file s'il n'a pas démarré, sinon arrêt demandé au
+    planificateur (meilleur plan gardé s'il est complet). False si inconnu ou déjà terminé.
+    """
+    with _lock:
+        job = _jobs.get(job_id)
+        if job is None or job['status'] not in ACTIVE_STATUSES:
+            return False
+        job['cancel_requested'] = True
+        if job['status'] == 'en_attente':
+            job.update(status='annule', progress=1.0, finished=time.time())
+            _prune()
+            return True
+        scheduler = job['scheduler']
+    if scheduler is not None:
+        scheduler.request_stop()
+    return True
+
+
+def active_job(session_id: int) -> Optional[str]:
+    """Job en attente ou en cours de la session (le plus récent), None sinon"""
+    with _lock:
+        active = [
+            job for job in _jobs.values()
+            if job['session_id'] == session_id and job['status'] in ACTIVE_STATUSES
+        ]
+    return max(active, key=lambda job: job['created'])['id'] if active else None
+
+
+def list_jobs(session_id: int = None) -> List[Dict]:
+    """États des jobs connus (les plus récents d'abord)"""
+    with _lock:
+        ids = [job['id'] for job in sorted(_jobs.values(), key=lambda job: job['created'], reverse=True)
+               if session_id is None or job['session_id'] == session_id]
+    return [status for status in map(get_job_status, ids) if status]
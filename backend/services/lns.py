@@ -0,0 +1,273 @@
+"""
+Recherche à grand voisinage (LNS) avec réparation exacte par MILP (scipy.optimize.milp)
+- Voisinage: modules non planifiés + modules en conflit avec eux, ou un couple département-jour
+- Le voisinage est libéré puis re-résolu comme un petit MILP (HiGHS via SciPy)
+- La solution est appliquée avec les règles habituelles (salles, surveillants) et
+  conservée seulement si elle ne dégrade pas le plan
+"""
+import random
+import time
+from collections import defaultdict
+from typing import Dict, List, Optional, Set, Tuple
+
+import numpy as np
+from scipy import sparse
+from scipy.optimize import milp, LinearConstraint, Bounds
+
+
+class LargeNeighbourhoodSearch:
+    """
+    LNS sur un plan ExamScheduler.
+    Variables x[m, s] ∈ {0, 1}: module libéré m placé au créneau s.
+    Contraintes:
+    - un créneau au plus par module
+    - par cohorte et par jour: nb d'examens ≤ max_exam_per_student_per_day - occupation fixe
+    - par créneau: salles, places et surveillants libres (agrégés)
+    Objectif: maximiser les modules placés, puis minimiser l'étalement (examens proches).
+    """
+    
+    def __init__(self, scheduler, unscheduled: List[int], config: Dict = None, seed: int = 0):
+        self.scheduler = scheduler
+        self.config = config or {}
+        self.rng = random.Random(seed)
+        self.unscheduled: Set[int] = set(unscheduled)
+        self.neighbourhood_size = self.config.get('lns_neighbourhood_size', 30)
+        self.milp_time_limit = self.config.get('lns_milp_time_limit', 2.0)
+        self.deadline: Optional[float] = None
+        
+        self.allowed_slots = {
+            module_id: scheduler._get_slots_for_dept(groups[0].dept_id, module_id)
+            for module_id, groups in scheduler.exams_by_module.items()
+        }
+        self.modules_by_dept: Dict[int, List[int]] = defaultdict(list)
+        for module_id, groups in scheduler.exams_by_module.items():
+            self.modules_by_dept[groups[0].dept_id].append(module_id)
+        
+        self.stats = {'iterations': 0, 'improvements': 0, 'repaired': 0, 'milp_solves': 0, 'milp_time': 0.0}
+    
+    # Voisinages
+    
+    def _conflict_neighbourhood(self) -> List[int]:
+        """Modules non planifiés (même département) + modules placés en conflit avec eux"""
+        scheduler = self.scheduler
+        seed_module = self.rng.choice(sorted(self.unscheduled))
+        dept_id = scheduler.exams_by_module[seed_module][0].dept_id
+        
+        freed = [m for m in self.modules_by_dept[dept_id] if m in self.unscheduled]
+        freed = freed[:max(1, self.neighbourhood_size // 3)]
+        if seed_module not in freed:
+            freed[0] = seed_module
+        
+        neighbours = []
+        for module_id in freed:
+            neighbours.extend(m for m in scheduler.module_conflicts(module_id) if m in scheduler.placements)
+        self.rng.shuffle(neighbours)
+        for module_id in neighbours:
+            if len(freed) >= self.neighbourhood_size:
+                break
+            if module_id not in freed:
+                freed.append(module_id)
+        return freed
+    
+    def _dept_day_neighbourhood(self) -> List[int]:
+        """Tous les modules d'un département placés un jour donné + ses non planifiés"""
+        scheduler = self.scheduler
+        if self.unscheduled:
+            dept_id = scheduler.exams_by_module[self.rng.choice(sorted(self.unscheduled))][0].dept_id
+        else:
+            dept_id = self.rng.choice(sorted(self.modules_by_dept))
+        dept_modules = self.modules_by_dept[dept_id]
+        days = sorted({scheduler.placements[m].slot.date for m in dept_modules if m in scheduler.placements})
+        if not days:
+            return [m for m in dept_modules if m in self.unscheduled][:self.neighbourhood_size]
+        day = self.rng.choice(days)
+        
+        freed = [m for m in dept_modules if m in scheduler.placements and scheduler.placements[m].slot.date == day]
+        freed += [m for m in dept_modules if m in self.unscheduled]
+        return freed[:self.neighbourhood_size]
+    
+    # Réparation MILP
+    
+    def _rooms_needed(self, module_id: int) -> int:
+        """Borne inférieure du nb de salles (regroupement possible des premiers groupes)"""
+        n_groups = len(self.scheduler.exams_by_module[module_id])
+        if self.config.get('allow_room_sharing', True) and n_groups > 1:
+            return n_groups - (min(self.config.get('max_groups_per_room', 2), n_groups) - 1)
+        return n_groups
+    
+    def _free_resources(self, slot, span: Tuple) -> Tuple[int, int, int]:
+        """
+        Salles libres, places libres et surveillants disponibles à ce créneau, sur tout le span
+        (indisponibilités déclarées et limite journalière effective comprises)
+        """
+        scheduler = self.scheduler
+        free_rooms = [r for r in scheduler.rooms if not scheduler._room_busy(r['id'], span)]
+        limit = scheduler._daily_supervision_limit()
+        free_profs = sum(
+            1 for p in scheduler.professors
+            if scheduler._is_prof_available_for_slot(p['id'], slot, span)
+            and scheduler.prof_daily_count[p['id']][slot.date] < limit
+        )
+        return len(free_rooms), sum(r['capacite'] for r in free_rooms), free_profs
+    
+    def _build_and_solve(self, freed: List[int]) -> Optional[List[Tuple[int, object]]]:
+        """Construit et résout le MILP du voisinage - retourne [(module, créneau)] ou None"""
+        scheduler = self.scheduler
+        max_exams = self.config.get('max_exam_per_student_per_day', 1)
+        
+        # Variables: couples (module, créneau) faisables seuls dans l'état fixé
+        variables: List[Tuple[int, object]] = []
+        spans: Dict[Tuple[int, object], Tuple] = {}
+        for module_id in freed:
+            groups = scheduler.exams_by_module[module_id]
+            for slot in self.allowed_slots[module_id]:
+                if not scheduler._check_student_availability(module_id, slot):
+                    continue
+                if not scheduler._find_rooms_and_supervisors(groups, slot):
+                    continue
+                variables.append((module_id, slot))
+                spans[(module_id, slot)] = scheduler._span(slot, scheduler._module_duration(groups))
+        if not variables:
+            return None
+        
+        n = len(variables)
+        rows, cols, lower, upper = [], [], [], []
+        
+        def add_row(indices: List[int], coefs: List[float], ub: float):
+            r = len(upper)
+            rows.extend([r] * len(indices))
+            cols.extend(indices)
+            values.extend(coefs)
+            lower.append(-np.inf)
+            upper.append(ub)
+        
+        values: List[float] = []
+        
+        # 1. Un créneau au plus par module
+        by_module: Dict[int, List[int]] = defaultdict(list)
+        for j, (module_id, _) in enumerate(variables):
+            by_module[module_id].append(j)
+        for indices in by_module.values():
+            add_row(indices, [1.0] * len(indices), 1)
+        
+        # 2. Cohortes: examens par jour ≤ capacité résiduelle
+        by_cohort_day: Dict[Tuple[int, int], List[int]] = defaultdict(list)
+        for j, (module_id, slot) in enumerate(variables):
+            day = scheduler.day_index[slot.date]
+            for cohort_id in scheduler.module_cohorts.get(module_id, ()):
+                by_cohort_day[(int(cohort_id), day)].append(j)
+        for (cohort_id, day), indices in by_cohort_day.items():
+            if len({variables[j][0] for j in indices}) < 2:
+                continue
+            residual = max_exams - int(scheduler.cohort_day_exams[cohort_id, day])
+            add_row(indices, [1.0] * len(indices), residual)
+        
+        # 3. Ressources agrégées par créneau: salles, places, surveillants
+        by_slot: Dict[object, List[int]] = defaultdict(list)
+        for j, (_, slot) in enumerate(variables):
+            by_slot[slot].append(j)
+        for slot, indices in by_slot.items():
+            if len({variables[j][0] for j in indices}) < 2:
+                continue
+            # Ressources libres sur le span le plus long des modules candidats à ce créneau
+            span = max((spans[variables[j]] for j in indices), key=len)
+            free_rooms, free_seats, free_profs = self._free_resources(slot, span)
+            rooms_needed = [float(self._rooms_needed(variables[j][0])) for j in indices]
+            seats_needed = [float(sum(g.nb_etudiants for g in scheduler.exams_by_module[variables[j][0]])) for j in indices]
+            add_row(indices, rooms_needed, free_rooms)
+            add_row(indices, seats_needed, free_seats)
+            add_row(indices, rooms_needed, free_profs)
+        
+        # Objectif: -1 par module placé, + jusqu'à 0.5 selon l'étalement (examens proches)
+        spread = np.zeros(n)
+        occupancy = scheduler.cohort_day_exams
+        n_days = occupancy.shape[1]
+        sizes = np.asarray(scheduler.cohort_sizes, dtype=np.int64)
+        for j, (module_id, slot) in enumerate(variables):
+            cohort_ids = scheduler.module_cohorts.get(module_id)
+            if cohort_ids is None or not len(cohort_ids):
+                continue
+            day = scheduler.day_index[slot.date]
+            window = occupancy[cohort_ids, max(day - 1, 0):min(day + 2, n_days)].astype(np.int64).sum(axis=1)
+            spread[j] = sizes[cohort_ids] @ window
+        c = -1.0 + 0.5 * spread / (spread.max() + 1.0)
+        
+        # Temps de résolution borné par l'échéance de la phase
+        time_limit = self.milp_time_limit
+        if self.deadline is not None:
+            time_limit = min(time_limit, self.deadline - time.time())
+            if time_limit <= 0:
+                return None
+        
+        A = sparse.csr_matrix((values, (rows, cols)), shape=(len(upper), n))
+        start = time.time()
+        result = milp(
+            c,
+            integrality=np.ones(n),
+            bounds=Bounds(0, 1),
+            constraints=LinearConstraint(A, lower, upper),
+            options={'time_limit': time_limit, 'disp': False}
+        )
+        self.stats['milp_solves'] += 1
+        self.stats['milp_time'] += time.time() - start
+        
+        if result.x is None:
+            return None
+        return [variables[j] for j in np.flatnonzero(result.x > 0.5)]
+    
+    def _repair(self, freed: List[int]) -> bool:
+        """Libère le voisinage, applique la solution MILP; annule si le plan se dégrade"""
+        scheduler = self.scheduler
+        previous = {m: scheduler._unplace_module(m, sync=False) for m in freed if m in scheduler.placements}
+        before_placed = len(previous)
+        
+        solution = self._build_and_solve(freed) or []
+        
+        # Application: gros modules d'abord, avec les règles habituelles (salles + surveillants)
+        placed: List[int] = []
+        seats = lambda m: sum(g.nb_etudiants for g in scheduler.exams_by_module[m])
+        for module_id, slot in sorted(solution, key=lambda v: -seats(v[0])):
+            if not scheduler._check_student_availability(module_id, slot):
+                continue
+            assignments = scheduler._find_rooms_and_supervisors(scheduler.exams_by_module[module_id], slot)
+            if assignments:
+                scheduler._commit_assignments(module_id, assignments, slot)
+                placed.append(module_id)
+        # Relaxation agrégée: compléter en glouton les modules non appliqués
+        for module_id in freed:
+            if module_id not in scheduler.placements and scheduler._place_module(module_id, scheduler.exams_by_module[module_id]):
+                placed.append(module_id)
+        
+        if len(placed) < before_placed:
+            for module_id in placed:
+                scheduler._unplace_module(module_id, sync=False)
+            for module_id, placement in previous.items():
+                scheduler._commit_assignments(module_id, placement.assignments, placement.slot)
+            return False
+        
+        for module_id in freed:
+            if module_id in scheduler.placements:
+                self.unscheduled.discard(module_id)
+            else:
+                self.unscheduled.add(module_id)
+        if len(placed) > before_placed:
+            self.stats['repaired'] += len(placed) - before_placed
+            return True
+        return False
+    
+    def run(self, deadline: float) -> List[int]:
+        """Itère jusqu'à l'échéance (ou plus aucun module non planifié)"""
+        scheduler = self.scheduler
+        self.deadline = deadline
+        while self.unscheduled and time.time() < deadline and not scheduler._should_stop():
+            self.stats['iterations'] += 1
+            if self.stats['iterations'] % 2:
+                freed = self._conflict_neighbourhood()
+            else:
+                freed = self._dept_day_neighbourhood()
+            if freed and self._repair(freed):
+                self.stats['improvements'] += 1
+        
+        scheduler._rebuild_scheduled_exams()
+        self.stats['milp_time'] = round(self.stats['milp_time'], 2)
+        return [m for m in scheduler.exams_by_module if m in self.unscheduled]
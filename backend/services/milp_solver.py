@@ -0,0 +1,262 @@
+"""
+Solveur exact (MILP, scipy.optimize.milp / HiGHS) pour petites sessions
+- Sessions de rattrapage, sélection de niveaux réduite, un seul département
+- Construit le modèle à partir des structures préchargées par ExamScheduler
+  (cohortes, créneaux autorisés, salles, surveillants)
+- Les salles sont modélisées exactement par créneau (conditions de Hall sur les
+  paliers de capacité), les surveillants par capacités agrégées
+"""
+import time
+from collections import defaultdict
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+from scipy import sparse
+from scipy.optimize import milp, LinearConstraint, Bounds
+
+
+# Statuts scipy.optimize.milp
+MILP_STATUS = {0: 'optimal', 1: 'time_limit', 2: 'infeasible', 3: 'unbounded', 4: 'error'}
+
+
+class ExactSolver:
+    """
+    Modèle: x[m, s, p] ∈ {0, 1} - module m au créneau s avec le motif de salles p
+    (p = groupes séparés, ou premiers groupes regroupés comme dans le glouton).
+    Contraintes:
+    - un créneau au plus par module (objectif: maximiser les modules placés)
+    - par cohorte et par jour: ≤ max_exam_per_student_per_day examens
+    - par créneau et par palier de capacité c: nb de salles demandées > c ≤ nb de salles > c
+      (exact pour l'affectation salles/groupes: les salles compatibles sont emboîtées)
+    - par créneau / par jour: salles ≤ surveillants disponibles (au moins 1 par salle)
+    Un examen long compte sur tous les créneaux de son span (duree_examen_minutes).
+    """
+    
+    def __init__(self, scheduler, config: Dict = None):
+        self.scheduler = scheduler
+        self.config = config or {}
+        self.max_variables = self.config.get('milp_max_variables', 60000)
+        self.stats: Dict = {
+            'status': None, 'gap': None, 'solve_time': 0.0, 'variables': 0,
+            'constraints': 0, 'placed': 0, 'bound': None, 'fallback': False
+        }
+    
+    def _room_patterns(self, module_id: int) -> List[List[Tuple[int, list]]]:
+        """Motifs de salles possibles: [(effectif demandé, groupes)] par salle"""
+        groups = sorted(self.scheduler.exams_by_module[module_id], key=lambda g: g.nb_etudiants, reverse=True)
+        patterns = [[(g.nb_etudiants, [g]) for g in groups]]
+        if self.config.get('allow_room_sharing', True) and len(groups) > 1:
+            k = min(self.config.get('max_groups_per_room', 2), len(groups))
+            merged = [(sum(g.nb_etudiants for g in groups[:k]), groups[:k])]
+            patterns.append(merged + [(g.nb_etudiants, [g]) for g in groups[k:]])
+        return patterns
+    
+    def _build_model(self):
+        """Construit (c, A, bornes) et la liste des variables"""
+        scheduler = self.scheduler
+        max_exams = self.config.get('max_exam_per_student_per_day', 1)
+        max_per_day = min(
+            self.config.get('max_supervisions_per_prof_per_day', 3),
+            self.config.get('max_exam_per_professor_per_day', 3)
+        )
+        capacities = sorted({room['capacite'] for room in scheduler.rooms})
+        max_capacity = capacities[-1] if capacities else 0
+        # Paliers: (seuil exclusif, nb de salles au-dessus)
+        levels = [(prev, sum(1 for r in scheduler.rooms if r['capacite'] > prev))
+                  for prev in [0] + capacities[:-1]]
+        slot_rank = {slot: i for i, slot in enumerate(scheduler.slots)}
+        n_slots = max(len(scheduler.slots), 1)
+        
+        variables: List[Tuple[int, object, list]] = []
+        self.patterns = {}
+        spans = {}
+        for module_id, groups in scheduler.exams_by_module.items():
+            patterns = [p for p in self._room_patterns(module_id) if max(d for d, _ in p) <= max_capacity]
+            self.patterns[module_id] = patterns
+            duration = scheduler._module_duration(groups)
+            for slot in scheduler._get_slots_for_dept(groups[0].dept_id, module_id):
+                span = scheduler._span(slot, duration)
+                if span is None:
+                    continue
+                spans[(module_id, slot)] = span
+                for pattern in patterns:
+                    variables.append((module_id, slot, pattern))
+        
+        n = len(variables)
+        self.stats['variables'] = n
+        if not n or n > self.max_variables:
+            return variables, None, None, None, None
+        
+        rows, cols, values, upper = [], [], [], []
+        
+        def add_row(indices: List[int], coefs: List[float], ub: float):
+            r = len(upper)
+            rows.extend([r] * len(indices))
+            cols.extend(indices)
+            values.extend(coefs)
+            upper.append(ub)
+        
+        by_module = defaultdict(list)
+        by_cohort_day = defaultdict(list)
+        by_cohort_slot = defaultdict(list)
+        by_slot = defaultdict(list)
+        by_day = defaultdict(list)
+        for j, (module_id, slot, _) in enumerate(variables):
+            day = scheduler.day_index[slot.date]
+            span = spans[(module_id, slot)]
+            by_module[module_id].append(j)
+            for covered in span:
+                by_slot[covered].append(j)
+            by_day[day].append(j)
+            for cohort_id in scheduler.module_cohorts.get(module_id, ()):
+                by_cohort_day[(int(cohort_id), day)].append(j)
+                if max_exams > 1:
+                    for covered in span:
+                        by_cohort_slot[(int(cohort_id), covered)].append(j)
+        
+        # 1. Un créneau (et un motif) au plus par module
+        for indices in by_module.values():
+            add_row(indices, [1.0] * len(indices), 1)
+        
+        # 2. Étudiants: examens par jour (et un seul examen par créneau si plusieurs/jour)
+        for indices in by_cohort_day.values():
+            if len({variables[j][0] for j in indices}) > 1:
+                add_row(indices, [1.0] * len(indices), max_exams)
+        for indices in by_cohort_slot.values():
+            if len({variables[j][0] for j in indices}) > 1:
+                add_row(indices, [1.0] * len(indices), 1)
+        
+        # 3. Salles par palier de capacité (conditions de Hall) et surveillants par créneau
+        #    (hors professeurs déclarés indisponibles)
+        n_profs = len(scheduler.professors)
+        for slot, indices in by_slot.items():
+            for threshold, available in levels:
+                coefs = [float(sum(1 for d, _ in variables[j][2] if d > threshold)) for j in indices]
+                if sum(coefs) > available:
+                    add_row(indices, coefs, available)
+            rooms = [float(len(variables[j][2])) for j in indices]
+            available_profs = n_profs - bin(scheduler.slot_unavailable_mask.get(slot, 0)).count('1')
+            if sum(rooms) > available_profs:
+                add_row(indices, rooms, available_profs)
+        
+        # 4. Surveillants par jour (limite par professeur et par jour)
+        for indices in by_day.values():
+            rooms = [float(len(variables[j][2])) for j in indices]
+            if sum(rooms) > n_profs * max_per_day:
+                add_row(indices, rooms, n_profs * max_per_day)
+        
+        # Objectif: maximiser les modules placés (départage: créneaux au plus tôt)
+        c = np.array([-1.0 + 1e-3 * slot_rank[slot] / n_slots for _, slot, _ in variables])
+        A = sparse.csr_matrix((values, (rows, cols)), shape=(len(upper), n))
+        self.stats['constraints'] = len(upper)
+        return variables, c, A, np.full(len(upper), -np.inf), np.array(upper, dtype=float)
+    
+    def _apply_slot(self, slot, chosen: List[Tuple[int, list]]) -> List[int]:
+        """
+        Affecte salles puis surveillants aux modules retenus sur un créneau.
+        Salles: demandes décroissantes → plus petite salle libre suffisante, ou
+        affectation optimale de toutes les demandes du créneau (room_assignment='assignment').
+        Retourne les modules non appliqués (surveillants manquants).
+        """
+        scheduler = self.scheduler
+        spans = {
+            module_id: scheduler._span(slot, scheduler._module_duration(scheduler.exams_by_module[module_id]))
+            for module_id, _ in chosen
+        }
+        free_rooms = [r for r in reversed(scheduler.rooms) if slot not in scheduler.room_schedule[r['id']]]
+        free_rooms.sort(key=lambda r: r['capacite'])
+        
+        demands = [(demand, groups, module_id) for module_id, pattern in chosen for demand, groups in pattern]
+        demands.sort(key=lambda d: -d[0])
+        rooms_of = defaultdict(list)
+        optimal = None
+        if self.config.get('room_assignment', 'first_fit') == 'assignment':
+            # Span le plus long du créneau: salles libres pour tous les modules retenus
+            longest = max(spans.values(), key=len)
+            optimal = scheduler._assign_rooms_optimal([d for d, _, _ in demands], slot, span=longest)
+        if optimal:
+            for (_, groups, module_id), room in zip(demands, optimal[0]):
+                rooms_of[module_id].append((groups, room))
+        for demand, groups, module_id in (demands if not optimal else []):
+            room = next((r for r in free_rooms
+                         if r['capacite'] >= demand and not scheduler._room_busy(r['id'], spans[module_id])), None)
+            if room is None:
+                rooms_of[module_id] = None
+                continue
+            free_rooms.remove(room)
+            if rooms_of[module_id] is not None:
+                rooms_of[module_id].append((groups, room))
+        
+        failed = []
+        for module_id, _ in chosen:
+            rooms = rooms_of[module_id]
+            if not rooms:
+                failed.append(module_id)
+                continue
+            dept_id = scheduler.exams_by_module[module_id][0].dept_id
+            assignments, used_profs = [], set()
+            for groups, room in rooms:
+                supervisors = scheduler._find_supervisors(
+                    dept_id, slot, scheduler._get_required_supervisors(room), used_profs, spans[module_id]
+                )
+                if not supervisors:
+                    assignments = None
+                    break
+                used_profs.update(supervisors)
+                assignments.extend((group, room, supervisors) for group in groups)
+            if assignments and scheduler.defer_supervisors:
+                assignments = scheduler._check_supervisor_capacity(assignments, slot, spans[module_id])
+            if assignments:
+                scheduler._commit_assignments(module_id, assignments, slot)
+            else:
+                failed.append(module_id)
+        return failed
+    
+    def solve(self, time_limit: float) -> Optional[List[int]]:
+        """
+        Résout le modèle puis applique la solution.
+        Retourne les modules non placés par le MILP (à compléter en glouton), ou None
+        si aucune solution n'est disponible (modèle trop grand, pas de solution réalisable).
+        """
+        scheduler = self.scheduler
+        variables, c, A, lower, upper = self._build_model()
+        if c is None:
+            self.stats['status'] = 'too_large' if variables else 'empty'
+            print(f"🧮 MILP: {len(variables)} variables (max {self.max_variables}) → glouton")
+            return None
+        
+        print(f"🧮 MILP: {len(variables)} variables, {A.shape[0]} contraintes (limite {time_limit:.0f}s)")
+        start = time.time()
+        result = milp(
+            c,
+            integrality=np.ones(len(variables)),
+            bounds=Bounds(0, 1),
+            constraints=LinearConstraint(A, lower, upper),
+            options={'time_limit': max(time_limit, 1.0), 'disp': False}
+        )
+        self.stats['solve_time'] = round(time.time() - start, 2)
+        self.stats['status'] = MILP_STATUS.get(result.status, 'error')
+        gap = getattr(result, 'mip_gap', None)
+        self.stats['gap'] = None if gap is None or not np.isfinite(gap) else round(float(gap), 4)
+        bound = getattr(result, 'mip_dual_bound', None)
+        if bound is not None and np.isfinite(bound):
+            self.stats['bound'] = int(np.floor(-bound + 1e-6))
+        
+        if result.x is None:
+            print(f"🧮 MILP: aucune solution ({self.stats['status']}) en {self.stats['solve_time']}s")
+            return None
+        
+        chosen_by_slot = defaultdict(list)
+        for j in np.flatnonzero(result.x > 0.5):
+            module_id, slot, pattern = variables[j]
+            chosen_by_slot[slot].append((module_id, pattern))
+        self.stats['placed'] = sum(len(v) for v in chosen_by_slot.values())
+        
+        failed = []
+        for slot in scheduler.slots:
+            if slot in chosen_by_slot:
+                failed.extend(self._apply_slot(slot, chosen_by_slot[slot]))
+        
+        print(f"🧮 MILP {self.stats['status']}: {self.stats['placed']}/{len(scheduler.exams_by_module)} modules, "
+              f"gap {self.stats['gap']}, {self.stats['solve_time']}s")
+        return [m for m in scheduler.exams_by_module if m not in scheduler.placements]
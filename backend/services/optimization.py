@@ -15,11 +15,29 @@ from datetime import datetime, timedelta, date
 from typing import List, Dict, Tuple, Optional, Set
 from dataclasses import dataclass, field
 from collections import defaultdict
+from concurrent.futures import ProcessPoolExecutor, as_completed, wait, FIRST_COMPLETED
+import multiprocessing
 import random
 import time
+from bisect import bisect_left, bisect_right, insort
+import heapq
+
+import numpy as np
+from scipy import sparse
+from scipy.sparse import csgraph
+from scipy.optimize import linear_sum_assignment
 
 from database import execute_query, get_cursor
 from config import OPTIMIZATION_CONFIG
+from services.annealing import SimulatedAnnealing
+from services.lns import LargeNeighbourhoodSearch
+from services.milp_solver import ExactSolver
+from services.supervision import SupervisorFlow
+from services.precheck import FeasibilityPrecheck
+from services.unavailability import load_unavailabilities
+from services.quality import metrics_from_scheduler
+from services import plan_cache
+from services import checkpoint
 
 
 # Data Classes
@@ -64,6 +82,15 @@ class ScheduledExam:
     nb_etudiants: int
     groupe: str = None
     prof_ids: List[int] = field(default_factory=list)  # Plusieurs surveillants possibles
+    duree_minutes: int = 90
+
+
+@dataclass
+class Placement:
+    """Placement d'un module: créneau + assignations (groupe, salle, surveillants) + examens créés"""
+    slot: ExamSlot
+    assignments: List[Tuple[GroupExam, Dict, List[int]]]
+    exams: List[ScheduledExam]
 
 
 @dataclass
@@ -89,18 +116,60 @@ class ExamScheduler:
     - multi-supervisors: Plusieurs surveillants selon capacité salle
     """
     
-    def __init__(self, session_id: int, config: Dict = None):
+    # État d'un plan en cours (échangé en bloc quand un meilleur plan est trouvé)
+    PLAN_STATE = (
+        'scheduled_exams', 'placements', 'room_schedule', 'slot_room_mask', 'room_sharing', 'slot_shared_index',
+        'cohort_day_exams', 'module_day', 'prof_slot_busy', 'prof_daily_count', 'prof_total_supervisions',
+        'slot_prof_mask', 'day_full_mask', 'prof_heap', 'dept_prof_heaps', 'slot_team_count', 'day_team_count'
+    )
+    
+    # Données préchargées partagées (lecture seule) avec les workers / copies du planificateur
+    PRELOADED_STATE = (
+        'session_info', 'departments', 'rooms', 'professors', 'slots', 'slots_by_dept',
+        'day_index', 'exams_by_module', 'cohort_sizes', 'module_cohorts', 'module_ids',
+        'module_index', 'conflict_graph', 'module_degree', 'module_conflict_weight', 'prof_unavailable'
+    )
+    
+    # Diagnostic des modules non planifiés: motifs de rejet d'un créneau (colonnes de rejection_counts)
+    REJECTION_REASONS = ('etudiants', 'salle_capacite', 'salle_occupee', 'surveillants', 'jours_departement', 'duree')
+    REJECTION_LABELS = {
+        'etudiants': 'conflit étudiants',
+        'salle_capacite': 'aucune salle assez grande',
+        'salle_occupee': 'salles occupées',
+        'surveillants': 'surveillants insuffisants',
+        'jours_departement': 'jours réservés à un autre département',
+        'duree': 'examen dépassant la journée',
+    }
+    
+    def __init__(self, session_id: int, config: Dict = None, session_info: Dict = None):
         self.session_id = session_id
         self.config = config or {}
-        self.session_info = self._load_session()
+        self.session_info = session_info or self._load_session()
         
         self.exams_by_module: Dict[int, List[GroupExam]] = defaultdict(list)
         self.scheduled_exams: List[ScheduledExam] = []
+        self.placements: Dict[int, Placement] = {}  # module_id -> placement courant
         self.conflicts: List[Conflict] = []
         
         # Contraintes
         self.room_schedule: Dict[int, Dict[ExamSlot, int]] = defaultdict(dict)
-        self.student_schedule: Dict[int, Set[date]] = defaultdict(set)
+        # Index des salles: bit i = self.rooms[i] (capacités décroissantes); masque des salles occupées par créneau
+        self.room_bit: Dict[int, int] = {}
+        self.room_by_id: Dict[int, Dict] = {}
+        self.room_neg_capacities: List[int] = []
+        self.slot_room_mask: Dict[ExamSlot, int] = {}
+        # Durées: un examen occupe salle et surveillants sur tous les créneaux du jour que son
+        # intervalle [début, début + durée) chevauche (span, mis en cache par (créneau, durée))
+        self.slot_windows: Dict[ExamSlot, Tuple[int, int]] = {}
+        self.day_slots: Dict[date, List[ExamSlot]] = {}
+        self.span_cache: Dict[Tuple[ExamSlot, int], Optional[Tuple[ExamSlot, ...]]] = {}
+        # Partage de salles entre modules (cross_module_sharing): (salle, créneau) → places
+        # restantes, équipe de surveillants, places par module; index trié (places, salle) par créneau
+        self.cross_module_sharing = self.config.get('cross_module_sharing', False)
+        self.room_sharing: Dict[Tuple[int, ExamSlot], Dict] = {}
+        self.slot_shared_index: Dict[ExamSlot, List[Tuple[int, int]]] = {}
+        # Occupation étudiants: matrice (cohorte × jour d'examen) = nb d'examens ce jour
+        self.cohort_day_exams: np.ndarray = np.zeros((0, 0), dtype=np.int8)
         self.prof_slot_busy: Dict[Tuple[int, ExamSlot], bool] = {}
         self.prof_daily_count: Dict[int, Dict[date, int]] = defaultdict(lambda: defaultdict(int))
         
@@ -110,15 +179,94 @@ class ExamScheduler:
         self.professors_by_dept: Dict[int, List[Dict]] = defaultdict(list)
         self.slots: List[ExamSlot] = []
         self.slots_by_dept: Dict[int, List[ExamSlot]] = {}  # Pour division par département
+        self.day_index: Dict[date, int] = {}  # Jour d'examen -> colonne de la matrice d'occupation
         
         # Distribution équitable
         self.prof_total_supervisions: Dict[int, int] = defaultdict(int)
+        # Pool de surveillants: tas (charge, rang, prof_id) global et par département,
+        # invalidation paresseuse; masque des profs occupés par créneau (bit = rang)
+        self.prof_rank: Dict[int, int] = {}
+        self.prof_heap: List[Tuple[int, int, int]] = []
+        self.dept_prof_heaps: Dict[int, List[Tuple[int, int, int]]] = {}
+        self.slot_prof_mask: Dict[ExamSlot, int] = {}
+        self.day_full_mask: Dict[date, int] = {}  # profs ayant atteint la limite journalière
+        self.dept_prof_mask: Dict[int, int] = {}
+        self.all_prof_mask = 0
+        # Indisponibilités (calendrier): prof → masque des créneaux (bit = position dans
+        # self.slots), et transposé créneau → masque des profs (bit = rang) pour le pool
+        self.prof_unavailable: Dict[int, int] = {}
+        self.slot_bit: Dict[ExamSlot, int] = {}
+        self.slot_unavailable_mask: Dict[ExamSlot, int] = {}
+        # Mode deux phases (supervisor_assignment='flow', hors démarrage à chaud): la phase 1 ne
+        # cherche pas les surveillants, elle vérifie seulement la capacité agrégée (salles à
+        # surveiller par créneau, surveillances par jour); équipes vides jusqu'au flot (phase 2)
+        self.defer_supervisors = self.config.get('supervisor_assignment', 'greedy') == 'flow' \
+            and not self.config.get('warm_start', False)
+        self.slot_team_count: Dict[ExamSlot, int] = defaultdict(int)
+        self.day_team_count: Dict[date, int] = defaultdict(int)
         
         # Départements
         self.departments: List[Dict] = []
         
         # OPTIMISATION: Préchargement des inscriptions (évite N+1 queries)
         self.inscriptions_by_module: Dict[int, List[int]] = defaultdict(list)
+        
+        # OPTIMISATION: Cohortes = étudiants ayant exactement les mêmes modules
+        self.student_cohort: Dict[int, int] = {}
+        self.cohort_sizes: List[int] = []
+        self.cohorts_by_module: Dict[int, List[int]] = defaultdict(list)
+        self.module_cohorts: Dict[int, np.ndarray] = {}
+        
+        # Graphe de conflits module×module (poids = nb d'étudiants partagés)
+        self.module_ids: np.ndarray = np.zeros(0, dtype=np.int64)
+        self.module_index: Dict[int, int] = {}
+        self.conflict_graph: sparse.csr_matrix = sparse.csr_matrix((0, 0), dtype=np.int32)
+        self.module_degree: np.ndarray = np.zeros(0, dtype=np.int64)
+        self.module_conflict_weight: np.ndarray = np.zeros(0, dtype=np.int64)
+        self.module_day: np.ndarray = np.zeros(0, dtype=np.int32)  # Jour placé (-1 = non placé)
+        
+        # Score du plan retenu (multi-start)
+        self.best_score: Optional[Dict] = None
+        
+        # Anytime: échéance globale, meilleur plan publié, arrêt demandé
+        self.deadline: Optional[float] = None
+        self.timed_out = False
+        self.untried_modules: List[int] = []  # non traités (boucle interrompue): plan incomplet
+        self.stop_requested = False
+        self.stop_event = None  # signal d'arrêt partagé (essais exécutés dans un worker)
+        self.best_plan: Optional[Dict] = None
+        self.anytime_stats: Dict = {'iterations': 0, 'improvements': 0}
+        self.annealing_stats: Optional[Dict] = None
+        self.lns_stats: Optional[Dict] = None
+        self.milp_stats: Optional[Dict] = None
+        self.supervision_stats: Optional[Dict] = None
+        self.precheck: Optional[Dict] = None
+        # Compteurs de rejets par module non planifié (ligne = rejection_index[module], colonne = motif),
+        # remplis pendant la recherche de créneau de _place_module; rejection_tried: modules dont
+        # la ligne décrit la dernière tentative (échouée) sur le plan courant
+        self.rejection_index: Dict[int, int] = {}
+        self.rejection_counts: np.ndarray = np.zeros((0, len(self.REJECTION_REASONS)), dtype=np.int32)
+        self.rejection_tried: Set[int] = set()
+        
+        # Démarrage à chaud: plan enregistré, modules conservés tels quels
+        self.existing_plan: Dict[int, List[Dict]] = {}
+        self.kept_modules: Optional[Set[int]] = None
+        self.warm_start_updates: List[Tuple[int, int]] = []  # (nb_etudiants, examen_id)
+        self.warm_start_stats: Optional[Dict] = None
+        
+        # Points de contrôle (config checkpoint / checkpoint_path): état compact écrit
+        # périodiquement sur disque, reprise sans rechargement depuis la base
+        self.checkpoint_path: Optional[str] = None
+        if not self.config.get('warm_start', False):
+            self.checkpoint_path = self.config.get('checkpoint_path') or (
+                checkpoint.checkpoint_path(session_id) if self.config.get('checkpoint', False) else None
+            )
+        self.checkpoint_interval = self.config.get('checkpoint_interval_seconds', 5)
+        self.last_checkpoint = 0.0
+        self.run_started: Optional[float] = None
+        self.elapsed_before = 0.0  # temps déjà consommé avant la reprise
+        self.resume_phase: Optional[str] = None
+        self.resume_unscheduled: List[int] = []
     
     def _load_session(self) -> Dict:
         result = execute_query(
@@ -143,6 +291,169 @@ class ExamScheduler:
             ORDER BY capacite DESC
         """) or []
         print(f"📍 {len(self.rooms)} salles disponibles")
+        self._build_room_index()
+    
+    def _build_room_index(self):
+        """
+        OPTIMISATION: index des salles pour _find_rooms_and_supervisors.
+        Salles triées par capacité décroissante (ordre SQL, tri stable): les salles
+        assez grandes pour n étudiants forment un préfixe (bisect), et la première
+        salle libre de ce préfixe est le bit de poids faible du masque libre.
+        """
+        self.rooms = sorted(self.rooms, key=lambda r: -r['capacite'])
+        self.room_bit = {room['id']: 1 << i for i, room in enumerate(self.rooms)}
+        self.room_neg_capacities = [-room['capacite'] for room in self.rooms]
+        self.room_by_id = {room['id']: room for room in self.rooms}
+        self.slot_room_mask = {}
+    
+    def _free_rooms_mask(self, slot: ExamSlot, min_capacity: int, used_mask: int = 0, span: Tuple = None) -> int:
+        """Masque des salles libres sur tout le span (défaut: ce créneau) avec capacité >= min_capacity"""
+        fitting = bisect_right(self.room_neg_capacities, -min_capacity)
+        occupied = used_mask
+        for covered in span or (slot,):
+            occupied |= self.slot_room_mask.get(covered, 0)
+        return ((1 << fitting) - 1) & ~occupied
+    
+    def _occupy_room(self, room_id: int, slot: ExamSlot, module_id: int, span: Tuple = None):
+        bit = self.room_bit.get(room_id, 0)
+        for covered in span or (slot,):
+            self.room_schedule[room_id][covered] = module_id
+            self.slot_room_mask[covered] = self.slot_room_mask.get(covered, 0) | bit
+    
+    def _release_room(self, room_id: int, slot: ExamSlot, span: Tuple = None):
+        bit = self.room_bit.get(room_id, 0)
+        for covered in span or (slot,):
+            self.room_schedule[room_id].pop(covered, None)
+            self.slot_room_mask[covered] = self.slot_room_mask.get(covered, 0) & ~bit
+    
+    def _room_busy(self, room_id: int, span: Tuple) -> bool:
+        return any(covered in self.room_schedule[room_id] for covered in span)
+    
+    @staticmethod
+    def _minutes(value) -> int:
+        """Heure ('08:30', '8:30:00' ou timedelta) → minutes depuis minuit"""
+        if isinstance(value, timedelta):
+            return int(value.total_seconds() // 60)
+        hours, minutes = str(value).split(':')[:2]
+        return int(hours) * 60 + int(minutes)
+    
+    def _build_slot_windows(self):
+        """Fenêtres [début, fin) en minutes et créneaux de chaque jour triés par heure de début"""
+        self.slot_windows = {
+            slot: (self._minutes(slot.heure_debut), self._minutes(slot.heure_fin)) for slot in self.slots
+        }
+        day_slots = defaultdict(list)
+        for slot in self.slots:
+            day_slots[slot.date].append(slot)
+        self.day_slots = {day: sorted(slots, key=lambda s: self.slot_windows[s][0]) for day, slots in day_slots.items()}
+        self.span_cache = {}
+    
+    def _span(self, slot: ExamSlot, duration: int) -> Optional[Tuple[ExamSlot, ...]]:
+        """
+        Créneaux occupés par un examen de `duration` minutes commençant à `slot`: le créneau
+        lui-même et les suivants du même jour qui chevauchent [début, début + durée).
+        None si l'examen déborde après le dernier créneau de la journée.
+        """
+        key = (slot, duration)
+        if key in self.span_cache:
+            return self.span_cache[key]
+        if slot not in self.slot_windows:
+            self._build_slot_windows()
+        start = self.slot_windows[slot][0]
+        end = start + duration
+        day_slots = self.day_slots[slot.date]
+        if end > max(self.slot_windows[s][1] for s in day_slots):
+            span = None
+        else:
+            span = (slot,) + tuple(s for s in day_slots if start < self.slot_windows[s][0] < end)
+        self.span_cache[key] = span
+        return span
+    
+    @staticmethod
+    def _module_duration(group_exams) -> int:
+        return max((g.duree_minutes or 90 for g in group_exams), default=90)
+    
+    def _share_room(
+        self, room: Dict, slot: ExamSlot, module_id: int, seats: int, prof_ids: List[int], span: Tuple, end: int
+    ):
+        """
+        Enregistre les places prises par un module dans une salle (partageable entre modules).
+        span/end: créneaux et fin (minutes) de l'examen le plus long de la salle.
+        """
+        key = (room['id'], slot)
+        index = self.slot_shared_index.setdefault(slot, [])
+        record = self.room_sharing.get(key)
+        if record is None:
+            record = self.room_sharing[key] = {
+                'residual': room['capacite'], 'team': list(prof_ids), 'modules': {}, 'span': span, 'end': end
+            }
+        else:
+            self._unindex_shared(index, record['residual'], room['id'])
+            if end > record['end']:
+                record['span'], record['end'] = span, end
+        record['modules'][module_id] = record['modules'].get(module_id, 0) + seats
+        record['residual'] -= seats
+        if record['residual'] > 0 and len(record['modules']) < self.config.get('max_modules_per_room', 3):
+            insort(index, (record['residual'], room['id']))
+    
+    def _unshare_room(self, room_id: int, slot: ExamSlot, module_id: int) -> Optional[Dict]:
+        """Retire un module d'une salle partagée - retourne l'occupation si d'autres modules restent"""
+        key = (room_id, slot)
+        record = self.room_sharing.get(key)
+        if record is None or module_id not in record['modules']:
+            return None
+        index = self.slot_shared_index.setdefault(slot, [])
+        self._unindex_shared(index, record['residual'], room_id)
+        record['residual'] += record['modules'].pop(module_id)
+        if not record['modules']:
+            del self.room_sharing[key]
+            return None
+        for covered in record['span']:
+            self.room_schedule[room_id][covered] = next(iter(record['modules']))
+        insort(index, (record['residual'], room_id))
+        return record
+    
+    @staticmethod
+    def _unindex_shared(index: List[Tuple[int, int]], residual: int, room_id: int):
+        pos = bisect_left(index, (residual, room_id))
+        if pos < len(index) and index[pos] == (residual, room_id):
+            del index[pos]
+    
+    def _pack_shared_rooms(
+        self,
+        group_exams: List[GroupExam],
+        slot: ExamSlot
+    ) -> Tuple[List[Tuple[GroupExam, Dict, List[int]]], List[GroupExam]]:
+        """
+        Partage de salles entre modules d'un même créneau (premier ajustement décroissant):
+        groupes par effectifs décroissants, chacun dans la salle déjà ouverte dont les places
+        restantes suffisent au plus juste (index trié → bisect). Les surveillants sont ceux
+        de la salle; l'examen doit se terminer avant le plus long déjà présent dans la salle.
+        L'équipe est déjà comptée (une surveillance par salle et créneau, voir
+        _commit_assignments): la rejoindre n'ajoute rien à la limite journalière.
+        Retourne (assignations partagées, groupes restant à placer).
+        """
+        index = self.slot_shared_index.get(slot)
+        if not index:
+            return [], group_exams
+        end = self.slot_windows[slot][0] + self._module_duration(group_exams)
+        
+        taken: Dict[int, int] = defaultdict(int)
+        packed, remaining = [], []
+        for group in sorted(group_exams, key=lambda g: g.nb_etudiants, reverse=True):
+            pos = bisect_left(index, (group.nb_etudiants, -1))
+            while pos < len(index) and (
+                index[pos][0] - taken[index[pos][1]] < group.nb_etudiants
+                or self.room_sharing[(index[pos][1], slot)]['end'] < end
+            ):
+                pos += 1
+            if pos == len(index):
+                remaining.append(group)
+                continue
+            room_id = index[pos][1]
+            taken[room_id] += group.nb_etudiants
+            packed.append((group, self.room_by_id[room_id], self.room_sharing[(room_id, slot)]['team']))
+        return packed, remaining
     
     def _load_professors(self):
         """Charge tous les professeurs"""
@@ -155,17 +466,227 @@ class ExamScheduler:
                 self.professors_by_dept[dept_id].append(prof)
         
         print(f"👨‍🏫 {len(self.professors)} professeurs disponibles")
+        self._build_prof_index()
     
-    def _preload_inscriptions(self):
-        """OPTIMISATION: Précharge TOUTES les inscriptions en 1 requête"""
-        result = execute_query("""
-            SELECT module_id, etudiant_id FROM inscriptions
-        """) or []
+    def _build_prof_index(self):
+        """
+        OPTIMISATION: pool de surveillants pour _find_supervisors.
+        Rang = position dans self.professors: (charge, rang) reproduit exactement le
+        tri stable par charge de l'ancienne implémentation.
+        """
+        self.prof_rank = {prof['id']: i for i, prof in enumerate(self.professors)}
+        self.all_prof_mask = (1 << len(self.professors)) - 1
+        self.dept_prof_mask = defaultdict(int)
+        for i, prof in enumerate(self.professors):
+            self.dept_prof_mask[prof.get('dept_id')] |= 1 << i
+        self.slot_prof_mask = {}
+        self.day_full_mask = {}
+        self._index_unavailabilities()
+        self._rebuild_prof_heaps()
+    
+    def _load_unavailabilities(self):
+        """Charge le calendrier d'indisponibilités des professeurs sur la période de la session"""
+        bits_by_day = defaultdict(dict)
+        for i, slot in enumerate(self.slots):
+            bits_by_day[slot.date][slot.creneau_id] = 1 << i
+        
+        unavailable = defaultdict(int)
+        rows = load_unavailabilities(self.session_info['date_debut'], self.session_info['date_fin'])
+        for row in rows:
+            for day, bits in bits_by_day.items():
+                if not row['date_debut'] <= day <= row['date_fin']:
+                    continue
+                if row['creneau_id'] is None:
+                    unavailable[row['professeur_id']] |= sum(bits.values())
+                else:
+                    unavailable[row['professeur_id']] |= bits.get(row['creneau_id'], 0)
+        self.prof_unavailable = dict(unavailable)
+        
+        if rows:
+            print(f"📅 {len(rows)} indisponibilité(s) pour {len(self.prof_unavailable)} professeur(s)")
+        self._index_unavailabilities()
+    
+    def _index_unavailabilities(self):
+        """Bits des créneaux et masque transposé (créneau → profs indisponibles) pour le pool"""
+        self.slot_bit = {slot: 1 << i for i, slot in enumerate(self.slots)}
+        self.slot_unavailable_mask = {}
+        for prof_id, blocked in self.prof_unavailable.items():
+            rank = self.prof_rank.get(prof_id)
+            if rank is None:
+                continue
+            for slot, bit in self.slot_bit.items():
+                if blocked & bit:
+                    self.slot_unavailable_mask[slot] = self.slot_unavailable_mask.get(slot, 0) | (1 << rank)
+    
+    def _is_prof_unavailable(self, prof_id: int, slot: ExamSlot, span: Tuple = None) -> bool:
+        """Indisponibilité déclarée (calendrier) sur le créneau ou le span: test de bits"""
+        blocked = self.prof_unavailable.get(prof_id)
+        return bool(blocked) and any(blocked & self.slot_bit.get(covered, 0) for covered in span or (slot,))
+    
+    def _daily_supervision_limit(self) -> int:
+        """Limite journalière effective (_find_supervisors et _is_prof_available_for_slot)"""
+        return min(
+            self.config.get('max_supervisions_per_prof_per_day', 3),
+            self.config.get('max_exam_per_professor_per_day', 3)
+        )
+    
+    def _room_supervisions(self, n_groups: int) -> int:
+        """Surveillances comptées à chaque membre de l'équipe d'une salle de n groupes (_commit_assignments)"""
+        return 1 if self.cross_module_sharing else n_groups
+    
+    def _rebuild_prof_heaps(self):
+        """(Re)construit les tas à partir des charges courantes (purge des entrées périmées)"""
+        self.prof_heap = []
+        self.dept_prof_heaps = defaultdict(list)
+        for i, prof in enumerate(self.professors):
+            entry = (self.prof_total_supervisions.get(prof['id'], 0), i, prof['id'])
+            self.prof_heap.append(entry)
+            self.dept_prof_heaps[prof.get('dept_id')].append(entry)
+        heapq.heapify(self.prof_heap)
+        for heap in self.dept_prof_heaps.values():
+            heapq.heapify(heap)
+    
+    def _push_prof_loads(self, prof_ids: Set[int]):
+        """Nouvelle entrée pour chaque charge modifiée (l'ancienne devient périmée)"""
+        if len(self.prof_heap) > 8 * len(self.professors) + 64:
+            self._rebuild_prof_heaps()
+            return
+        for prof_id in prof_ids:
+            rank = self.prof_rank.get(prof_id)
+            if rank is None:
+                continue
+            entry = (self.prof_total_supervisions[prof_id], rank, prof_id)
+            heapq.heappush(self.prof_heap, entry)
+            heapq.heappush(self.dept_prof_heaps[self.professors[rank].get('dept_id')], entry)
+    
+    def _update_day_full(self, prof_id: int, day: date):
+        rank = self.prof_rank.get(prof_id)
+        if rank is None:
+            return
+        if self.prof_daily_count[prof_id][day] >= self._daily_supervision_limit():
+            self.day_full_mask[day] = self.day_full_mask.get(day, 0) | (1 << rank)
+        else:
+            self.day_full_mask[day] = self.day_full_mask.get(day, 0) & ~(1 << rank)
+    
+    def _mark_prof_busy(self, prof_id: int, slot: ExamSlot, span: Tuple = None):
+        rank = self.prof_rank.get(prof_id)
+        for covered in span or (slot,):
+            self.prof_slot_busy[(prof_id, covered)] = True
+            if rank is not None:
+                self.slot_prof_mask[covered] = self.slot_prof_mask.get(covered, 0) | (1 << rank)
+    
+    def _mark_prof_free(self, prof_id: int, slot: ExamSlot, span: Tuple = None):
+        rank = self.prof_rank.get(prof_id)
+        for covered in span or (slot,):
+            self.prof_slot_busy.pop((prof_id, covered), None)
+            if rank is not None:
+                self.slot_prof_mask[covered] = self.slot_prof_mask.get(covered, 0) & ~(1 << rank)
+    
+    def _preload_inscriptions(self, module_ids: Set[int] = None):
+        """
+        OPTIMISATION: Précharge TOUTES les inscriptions en 1 requête.
+        module_ids: seulement les étudiants inscrits à ces modules (voisinage d'un
+        re-planning) - suffisant pour tous les conflits impliquant ces modules.
+        """
+        if module_ids is not None:
+            if not module_ids:
+                result = []
+            else:
+                placeholders = ','.join(['%s'] * len(module_ids))
+                result = execute_query(f"""
+                    SELECT module_id, etudiant_id FROM inscriptions
+                    WHERE etudiant_id IN (
+                        SELECT etudiant_id FROM inscriptions WHERE module_id IN ({placeholders})
+                    )
+                """, tuple(module_ids)) or []
+        else:
+            result = execute_query("""
+                SELECT module_id, etudiant_id FROM inscriptions
+            """) or []
         
+        modules_by_student: Dict[int, Set[int]] = defaultdict(set)
         for row in result:
             self.inscriptions_by_module[row['module_id']].append(row['etudiant_id'])
+            modules_by_student[row['etudiant_id']].add(row['module_id'])
         
         print(f"📋 {len(result)} inscriptions préchargées")
+        self._build_cohorts(modules_by_student)
+    
+    def _build_cohorts(self, modules_by_student: Dict[int, Set[int]]):
+        """
+        OPTIMISATION: Regroupe les étudiants ayant le même ensemble de modules.
+        Tous les étudiants d'une cohorte ont le même planning: les vérifications
+        et mises à jour se font par cohorte au lieu de par étudiant.
+        """
+        cohort_index: Dict[Tuple[int, ...], int] = {}
+        
+        for etudiant_id, module_ids in modules_by_student.items():
+            key = tuple(sorted(module_ids))
+            cohort_id = cohort_index.get(key)
+            if cohort_id is None:
+                cohort_id = len(cohort_index)
+                cohort_index[key] = cohort_id
+                self.cohort_sizes.append(0)
+            self.student_cohort[etudiant_id] = cohort_id
+            self.cohort_sizes[cohort_id] += 1
+        
+        for key, cohort_id in cohort_index.items():
+            for module_id in key:
+                self.cohorts_by_module[module_id].append(cohort_id)
+        
+        # Index numpy pour le fancy-indexing dans la matrice d'occupation
+        self.module_cohorts = {
+            module_id: np.array(cohort_ids, dtype=np.intp)
+            for module_id, cohort_ids in self.cohorts_by_module.items()
+        }
+        
+        print(f"👥 {len(cohort_index)} cohortes pour {len(self.student_cohort)} étudiants")
+    
+    def _build_conflict_graph(self):
+        """
+        OPTIMISATION: Construit une fois le graphe module×module des étudiants partagés.
+        Produit creux d'incidence: G = B · diag(taille cohortes) · Bᵀ (B = modules × cohortes).
+        """
+        self.module_ids = np.array(sorted(self.module_cohorts), dtype=np.int64)
+        self.module_index = {module_id: idx for idx, module_id in enumerate(self.module_ids.tolist())}
+        n_modules = len(self.module_ids)
+        n_cohorts = len(self.cohort_sizes)
+        
+        if n_modules:
+            rows = np.concatenate([
+                np.full(len(self.module_cohorts[module_id]), idx, dtype=np.intp)
+                for idx, module_id in enumerate(self.module_ids.tolist())
+            ])
+            cols = np.concatenate([self.module_cohorts[module_id] for module_id in self.module_ids.tolist()])
+        else:
+            rows = cols = np.zeros(0, dtype=np.intp)
+        
+        incidence = sparse.csr_matrix(
+            (np.ones(len(rows), dtype=np.int32), (rows, cols)),
+            shape=(n_modules, n_cohorts)
+        )
+        sizes = sparse.diags(np.asarray(self.cohort_sizes, dtype=np.int32), dtype=np.int32)
+        graph = (incidence @ sizes @ incidence.T).tocsr()
+        graph.setdiag(0)
+        graph.eliminate_zeros()
+        graph.sort_indices()
+        
+        self.conflict_graph = graph
+        self.module_degree = np.diff(graph.indptr)
+        self.module_conflict_weight = np.asarray(graph.sum(axis=1)).ravel()
+        self.module_day = np.full(n_modules, -1, dtype=np.int32)
+        
+        print(f"🕸️ Graphe de conflits: {n_modules} modules, {graph.nnz // 2} arêtes")
+    
+    def module_conflicts(self, module_id: int) -> Dict[int, int]:
+        """Retourne les modules en conflit avec ce module -> nb d'étudiants partagés"""
+        idx = self.module_index.get(module_id)
+        if idx is None:
+            return {}
+        start, end = self.conflict_graph.indptr[idx], self.conflict_graph.indptr[idx + 1]
+        neighbours = self.module_ids[self.conflict_graph.indices[start:end]]
+        weights = self.conflict_graph.data[start:end]
+        return dict(zip(neighbours.tolist(), weights.tolist()))
     
     def _generate_slots(self):
         """Génère les créneaux avec support jours de repos et division département"""
@@ -232,10 +753,19 @@ class ExamScheduler:
             print(f"📅 Alternance départements: Groupe A ({len(dept_group_a)} depts) → {len(odd_days)} jours")
             print(f"📅 Alternance départements: Groupe B ({len(dept_group_b)} depts) → {len(even_days)} jours")
         
+        self.day_index = {day: idx for idx, day in enumerate(work_days)}
+        
         print(f"📅 {len(self.slots)} créneaux générés (repos: {rest_days} jour(s))")
     
-    def _load_exams_by_group(self):
-        """Charge les examens PAR GROUPE avec filtrage par niveau"""
+    def _init_occupancy(self):
+        """Alloue la matrice d'occupation (cohorte × jour) une fois cohortes et jours connus"""
+        self.cohort_day_exams = np.zeros((len(self.cohort_sizes), len(self.day_index)), dtype=np.int8)
+    
+    def _load_exams_by_group(self, module_ids: Set[int] = None):
+        """
+        Charge les examens PAR GROUPE avec filtrage par niveau.
+        module_ids: seulement ces modules (voisinage d'un re-planning).
+        """
         selected_levels = self.config.get('selected_levels', ['L1', 'L2', 'L3', 'M1', 'M2'])
         
         # Validation: ne garder que les niveaux valides pour éviter injection SQL
@@ -246,6 +776,13 @@ class ExamScheduler:
         
         levels_str = "','".join(selected_levels)
         
+        module_filter, params = "", None
+        if module_ids is not None:
+            if not module_ids:
+                return
+            module_filter = f"AND m.id IN ({','.join(['%s'] * len(module_ids))})"
+            params = tuple(sorted(module_ids))
+        
         group_data = execute_query(f"""
             SELECT 
                 m.id AS module_id,
@@ -261,11 +798,11 @@ class ExamScheduler:
             JOIN formations f ON m.formation_id = f.id
             LEFT JOIN inscriptions i ON i.module_id = m.id
             LEFT JOIN etudiants e ON i.etudiant_id = e.id
-            WHERE m.semestre = 'S1' AND f.niveau IN ('{levels_str}')
+            WHERE m.semestre = 'S1' AND f.niveau IN ('{levels_str}') {module_filter}
             GROUP BY m.id, m.code, m.nom, m.formation_id, f.dept_id, f.niveau, e.groupe
             HAVING nb_etudiants > 0
             ORDER BY nb_etudiants DESC, m.id, groupe
-        """) or []
+        """, params) or []
         
         for row in group_data:
             exam = GroupExam(
@@ -302,59 +839,83 @@ class ExamScheduler:
         # print(f"🔍 Salle {room.get('nom', '?')} capacité={capacity} → {result} surveillants requis")
         return result
     
-    def _is_prof_available_for_slot(self, prof_id: int, slot: ExamSlot) -> bool:
-        """Vérifie si un prof est disponible à ce créneau"""
-        if self.prof_slot_busy.get((prof_id, slot), False):
+    def _is_prof_available_for_slot(self, prof_id: int, slot: ExamSlot, span: Tuple = None) -> bool:
+        """Vérifie si un prof est disponible à ce créneau (et aux suivants couverts par le span)"""
+        if self._is_prof_unavailable(prof_id, slot, span):
+            return False
+        if any(self.prof_slot_busy.get((prof_id, covered), False) for covered in span or (slot,)):
             return False
         max_per_day = self.config.get('max_exam_per_professor_per_day', 3)
         if self.prof_daily_count[prof_id][slot.date] >= max_per_day:
             return False
         return True
     
-    def _find_supervisors(self, dept_id: int, slot: ExamSlot, count: int, excluded: Set[int]) -> List[int]:
-        """Trouve plusieurs surveillants disponibles - retourne au moins 1 si possible"""
-        supervisors = []
+    def _pop_available_profs(
+        self,
+        heap: List[Tuple[int, int, int]],
+        available: int,
+        count: int
+    ) -> List[int]:
+        """
+        Parcourt le tas par charge croissante jusqu'à trouver `count` profs du masque
+        `available` (s'arrête dès que tous les disponibles sont trouvés).
+        Entrées périmées (charge modifiée) ou en double supprimées; les autres sont remises.
+        """
+        count = min(count, bin(available).count('1'))
+        loads = self.prof_total_supervisions
+        found, kept, seen = [], [], set()
+        while heap and len(found) < count:
+            entry = heapq.heappop(heap)
+            load, rank, prof_id = entry
+            if load != loads[prof_id] or prof_id in seen:
+                continue
+            seen.add(prof_id)
+            kept.append(entry)
+            if (available >> rank) & 1:
+                found.append(prof_id)
+        for entry in kept:
+            heapq.heappush(heap, entry)
+        return found
+    
+    def _find_supervisors(
+        self, dept_id: int, slot: ExamSlot, count: int, excluded: Set[int], span: Tuple = None
+    ) -> List[int]:
+        """
+        Trouve plusieurs surveillants disponibles - retourne au moins 1 si possible.
+        OPTIMISÉ: tas par charge (équité) au lieu de trier tous les professeurs à chaque appel.
+        """
+        if self.defer_supervisors:
+            # Phase 1 du mode deux phases: équipe choisie par le flot, capacité vérifiée par
+            # _check_supervisor_capacity (marqueur non vide pour les recherches de salles)
+            return [None]
         
-        # Limite de surveillances par JOUR (conformément au PDF: Professeurs max 3 examens/jour)
-        max_per_day = self.config.get('max_supervisions_per_prof_per_day', 3)
+        supervisors = []
         
-        # Trier par nombre total de surveillances (équité)
-        sorted_profs = sorted(
-            self.professors,
-            key=lambda p: self.prof_total_supervisions[p['id']]
-        )
+        # Disponibles: ni occupés sur le span, ni à la limite journalière (max 3 examens/jour), ni exclus
+        busy = self.day_full_mask.get(slot.date, 0)
+        for covered in span or (slot,):
+            busy |= self.slot_prof_mask.get(covered, 0) | self.slot_unavailable_mask.get(covered, 0)
+        available = self.all_prof_mask & ~busy
+        for prof_id in excluded:
+            rank = self.prof_rank.get(prof_id)
+            if rank is not None:
+                available &= ~(1 << rank)
+        if not available:
+            return []
         
         dept_priority = self.config.get('dept_priority', True)
         
         # D'abord professeurs du département si priorité activée
-        if dept_priority:
-            for prof in sorted_profs:
-                if len(supervisors) >= count:
-                    break
-                if prof.get('dept_id') != dept_id:
-                    continue
-                if prof['id'] in excluded:
-                    continue
-                # Vérifier la limite de surveillances par JOUR
-                if self.prof_daily_count[prof['id']][slot.date] >= max_per_day:
-                    continue
-                if self._is_prof_available_for_slot(prof['id'], slot):
-                    supervisors.append(prof['id'])
+        if dept_priority and self.dept_prof_mask.get(dept_id, 0) & available:
+            supervisors = self._pop_available_profs(
+                self.dept_prof_heaps[dept_id], available & self.dept_prof_mask[dept_id], count
+            )
+            for prof_id in supervisors:
+                available &= ~(1 << self.prof_rank[prof_id])
         
         # Ensuite autres professeurs si besoin
-        for prof in sorted_profs:
-            if len(supervisors) >= count:
-                break
-            if prof['id'] in excluded or prof['id'] in supervisors:
-                continue
-            # Vérifier la limite de surveillances par JOUR
-            if self.prof_daily_count[prof['id']][slot.date] >= max_per_day:
-                continue
-            if self._is_prof_available_for_slot(prof['id'], slot):
-                supervisors.append(prof['id'])
-        
-        # Debug désactivé pour performance (2000+ appels)
-        # print(f"👥 _find_supervisors: demandé={count}, trouvé={len(supervisors)}")
+        if len(supervisors) < count and available:
+            supervisors += self._pop_available_profs(self.prof_heap, available, count - len(supervisors))
         
         # Retourner ce qu'on a trouvé si au moins 1 surveillant (mode souple)
         return supervisors if supervisors else []
@@ -367,23 +928,98 @@ class ExamScheduler:
         return self.slots
     
     def _check_student_availability(self, module_id: int, slot: ExamSlot) -> bool:
-        """Vérifie qu'aucun étudiant n'a déjà un examen ce jour - OPTIMISÉ"""
+        """Vérifie qu'aucun étudiant n'a déjà un examen ce jour - OPTIMISÉ (par cohorte)"""
         max_exams = self.config.get('max_exam_per_student_per_day', 1)
         
-        # Utiliser les inscriptions préchargées au lieu de requête DB
-        student_ids = self.inscriptions_by_module.get(module_id, [])
+        idx = self.module_index.get(module_id)
+        if idx is None:
+            return True
+        day = self.day_index[slot.date]
         
-        for etudiant_id in student_ids:
-            # Compter les examens de cet étudiant ce jour
-            student_day_exams = sum(1 for d in self.student_schedule.get(etudiant_id, set()) if d == slot.date)
-            if student_day_exams >= max_exams:
-                return False
-        return True
+        # Rejet rapide via le graphe: un module en conflit est-il déjà placé ce jour?
+        graph = self.conflict_graph
+        neighbours = graph.indices[graph.indptr[idx]:graph.indptr[idx + 1]]
+        if not (self.module_day[neighbours] == day).any():
+            return True
+        if max_exams <= 1:
+            return False
+        
+        # Plusieurs examens/jour autorisés: compter par cohorte
+        cohort_ids = self.module_cohorts[module_id]
+        
+        # Test vectorisé: nb d'examens ce jour pour chaque cohorte du module
+        day_counts = self.cohort_day_exams[cohort_ids, day]
+        return not (day_counts >= max_exams).any()
     
     def _find_rooms_and_supervisors(
         self, 
         group_exams: List[GroupExam], 
         slot: ExamSlot
+    ) -> Optional[List[Tuple[GroupExam, Dict, List[int]]]]:
+        """
+        Salles et surveillants d'un module sur un créneau: places restantes des salles
+        partagées d'abord (cross_module_sharing), puis nouvelles salles (premier ajustement
+        ou affectation optimale selon room_assignment). Un examen long bloque salles et
+        surveillants sur les créneaux suivants qu'il chevauche.
+        """
+        span = self._span(slot, self._module_duration(group_exams))
+        if span is None:
+            return None
+        
+        shared = []
+        if self.cross_module_sharing:
+            shared, group_exams = self._pack_shared_rooms(group_exams, slot)
+            if not group_exams:
+                return shared
+        
+        if self.config.get('room_assignment', 'first_fit') == 'assignment':
+            assignments = self._find_rooms_assignment(group_exams, slot, span)
+        else:
+            assignments = self._find_rooms_first_fit(group_exams, slot, span)
+        if not assignments:
+            return None
+        if self.defer_supervisors:
+            return self._check_supervisor_capacity(shared + assignments, slot, span)
+        return shared + assignments
+    
+    def _check_supervisor_capacity(
+        self,
+        assignments: List[Tuple[GroupExam, Dict, List[int]]],
+        slot: ExamSlot,
+        span: Tuple
+    ) -> Optional[List[Tuple[GroupExam, Dict, List[int]]]]:
+        """
+        Phase 1 du mode deux phases: au lieu de chercher les surveillants, vérifie qu'il reste
+        assez de professeurs pour les nouvelles salles (disponibles sur chaque créneau du span,
+        surveillances du jour sous la limite, comptées comme dans _commit_assignments).
+        Condition nécessaire seulement: le flot peut encore échouer (repli _staff_greedily).
+        Retourne les assignations avec des équipes vides, ou None.
+        """
+        rows = defaultdict(int)
+        for _, room, _ in assignments:
+            if (room['id'], slot) not in self.room_sharing:
+                rows[room['id']] += 1
+        n_profs = len(self.professors)
+        for covered in span:
+            free = n_profs - bin(self.slot_unavailable_mask.get(covered, 0)).count('1')
+            if self.slot_team_count[covered] + len(rows) > free:
+                return None
+        
+        # Profs disponibles sur au moins un créneau du jour × limite journalière
+        unavailable_all_day = self.all_prof_mask
+        for day_slot in self.day_slots.get(slot.date, span):
+            unavailable_all_day &= self.slot_unavailable_mask.get(day_slot, 0)
+        day_capacity = self._daily_supervision_limit() * (n_profs - bin(unavailable_all_day).count('1'))
+        needed = sum(self._room_supervisions(n_groups) for n_groups in rows.values())
+        if self.day_team_count[slot.date] + needed > day_capacity:
+            return None
+        return [(group, room, []) for group, room, _ in assignments]
+    
+    def _find_rooms_first_fit(
+        self, 
+        group_exams: List[GroupExam], 
+        slot: ExamSlot,
+        span: Tuple = None
     ) -> Optional[List[Tuple[GroupExam, Dict, List[int]]]]:
         """
         RÈGLES OPTIMISÉES:
@@ -396,7 +1032,7 @@ class ExamScheduler:
         max_groups_per_room = self.config.get('max_groups_per_room', 2)  # Limite par défaut: 2 groupes max
         
         assignments = []
-        used_rooms = set()
+        used_rooms = 0  # masque des salles déjà prises par ce module
         used_profs = set()
         
         # Trier par nb étudiants décroissant
@@ -407,155 +1043,1363 @@ class ExamScheduler:
             groups_to_merge = sorted_groups[:max_groups_per_room]  # Limiter au max configuré
             total_students = sum(g.nb_etudiants for g in groups_to_merge)
             
-            # Chercher une grande salle pour ces groupes seulement
-            for room in self.rooms:
-                if slot in self.room_schedule[room['id']]:
-                    continue
-                if room['capacite'] >= total_students:
-                    # Trouvé! Assigner seulement les groupes limités
-                    required = self._get_required_supervisors(room)
-                    supervisors = self._find_supervisors(dept_id, slot, required, used_profs)
+            # Chercher une grande salle pour ces groupes seulement (salles libres assez grandes, par capacité décroissante)
+            free = self._free_rooms_mask(slot, total_students, span=span)
+            while free:
+                lowest = free & -free
+                free ^= lowest
+                room = self.rooms[lowest.bit_length() - 1]
+                # Trouvé! Assigner seulement les groupes limités
+                required = self._get_required_supervisors(room)
+                supervisors = self._find_supervisors(dept_id, slot, required, used_profs, span)
+                
+                if supervisors:  # Au moins 1 surveillant
+                    for group in groups_to_merge:
+                        assignments.append((group, room, supervisors))
+                    used_rooms |= lowest
+                    used_profs.update(supervisors)
                     
-                    if supervisors:  # Au moins 1 surveillant
-                        for group in groups_to_merge:
-                            assignments.append((group, room, supervisors))
-                        used_rooms.add(room['id'])
-                        used_profs.update(supervisors)
-                        
-                        # Traiter les groupes restants individuellement
-                        remaining_groups = sorted_groups[max_groups_per_room:]
-                        sorted_groups = remaining_groups
-                        break
+                    # Traiter les groupes restants individuellement
+                    remaining_groups = sorted_groups[max_groups_per_room:]
+                    sorted_groups = remaining_groups
+                    break
         
         # Mode normal: une salle par groupe
         for group in sorted_groups:
-            room_found = None
-            for room in self.rooms:
-                if room['id'] in used_rooms:
-                    continue
-                if slot in self.room_schedule[room['id']]:
-                    continue
-                if room['capacite'] < group.nb_etudiants:
-                    continue
-                room_found = room
-                break
-            
-            if not room_found:
+            free = self._free_rooms_mask(slot, group.nb_etudiants, used_rooms, span)
+            if not free:
                 return None
+            lowest = free & -free
+            room_found = self.rooms[lowest.bit_length() - 1]
             
             # Trouver les surveillants requis - accepte minimum 1
             required = self._get_required_supervisors(room_found)
-            supervisors = self._find_supervisors(dept_id, slot, required, used_profs)
+            supervisors = self._find_supervisors(dept_id, slot, required, used_profs, span)
             
             if not supervisors:  # Au moins 1 surveillant requis
                 return None
             
             assignments.append((group, room_found, supervisors))
-            used_rooms.add(room_found['id'])
+            used_rooms |= lowest
             used_profs.update(supervisors)
         
         return assignments
     
+    def _assign_rooms_optimal(
+        self,
+        demands: List[int],
+        slot: ExamSlot,
+        used_mask: int = 0,
+        span: Tuple = None
+    ) -> Optional[Tuple[List[Dict], int]]:
+        """
+        Affectation optimale demandes (effectifs) → salles libres du créneau (et du span)
+        (scipy.optimize.linear_sum_assignment, coût = places perdues).
+        Retourne (salle de chaque demande, places perdues) ou None si impossible.
+        """
+        if not demands:
+            return [], 0
+        free = self._free_rooms_mask(slot, min(demands), used_mask, span)
+        candidates = []
+        while free:
+            lowest = free & -free
+            free ^= lowest
+            candidates.append(lowest.bit_length() - 1)
+        if len(candidates) < len(demands):
+            return None
+        
+        capacities = np.array([self.rooms[i]['capacite'] for i in candidates])
+        needed = np.asarray(demands)[:, None]
+        infeasible = capacities[None, :] < needed
+        waste = capacities[None, :] - needed
+        cost = np.where(infeasible, waste.max() + capacities.sum() + 1, waste)
+        rows, cols = linear_sum_assignment(cost)
+        if infeasible[rows, cols].any():
+            return None
+        return [self.rooms[candidates[c]] for c in cols], int(waste[rows, cols].sum())
+    
+    def _find_rooms_assignment(
+        self,
+        group_exams: List[GroupExam],
+        slot: ExamSlot,
+        span: Tuple = None
+    ) -> Optional[List[Tuple[GroupExam, Dict, List[int]]]]:
+        """
+        Variante de _find_rooms_first_fit (room_assignment='assignment'):
+        chaque motif (groupes séparés, ou premiers groupes regroupés) est affecté
+        de façon optimale aux salles libres; le motif retenu minimise places perdues
+        + coût par salle utilisée (les amphis ne sont plus pris pour de petits groupes).
+        """
+        dept_id = group_exams[0].dept_id
+        room_cost = self.config.get('room_assignment_room_cost', 20)
+        sorted_groups = sorted(group_exams, key=lambda x: x.nb_etudiants, reverse=True)
+        
+        patterns = [[[g] for g in sorted_groups]]
+        if self.config.get('allow_room_sharing', True) and len(sorted_groups) > 1:
+            k = self.config.get('max_groups_per_room', 2)
+            patterns.append([sorted_groups[:k]] + [[g] for g in sorted_groups[k:]])
+        
+        solved = []
+        for pattern in patterns:
+            result = self._assign_rooms_optimal([sum(g.nb_etudiants for g in groups) for groups in pattern], slot, span=span)
+            if result:
+                solved.append((result[1] + room_cost * len(pattern), pattern, result[0]))
+        
+        for _, pattern, rooms in sorted(solved, key=lambda x: x[0]):
+            assignments, used_profs = [], set()
+            for groups, room in zip(pattern, rooms):
+                supervisors = self._find_supervisors(dept_id, slot, self._get_required_supervisors(room), used_profs, span)
+                if not supervisors:
+                    assignments = None
+                    break
+                used_profs.update(supervisors)
+                assignments.extend((group, room, supervisors) for group in groups)
+            if assignments:
+                return assignments
+        return None
+    
     def _commit_assignments(
         self, 
         module_id: int, 
         assignments: List[Tuple[GroupExam, Dict, List[int]]], 
         slot: ExamSlot
     ):
-        """Enregistre les assignations"""
+        """
+        Enregistre les assignations (salles et surveillants bloqués sur tout le span).
+        Surveillances comptées (prof_daily_count, prof_total_supervisions) une fois par ligne
+        de groupe; avec cross_module_sharing, une fois par salle et créneau: l'équipe d'une
+        salle déjà ouverte par un autre module n'est ni re-bloquée ni re-comptée.
+        Équipe vide (phase 1 du mode deux phases): la salle est comptée dans la capacité
+        agrégée (slot_team_count par salle, day_team_count comme une surveillance).
+        """
+        duration = self._module_duration([group for group, _, _ in assignments])
+        span = self._span(slot, duration) or (slot,)
+        counted = set()
+        if self.cross_module_sharing:
+            counted = {room['id'] for _, room, _ in assignments if (room['id'], slot) in self.room_sharing}
+        exams, reserved = [], set()
         for group, room, prof_ids in assignments:
-            self.scheduled_exams.append(ScheduledExam(
+            exam = ScheduledExam(
                 module_id=module_id,
                 salle_id=room['id'],
                 slot=slot,
                 nb_etudiants=group.nb_etudiants,
                 groupe=group.groupe,
-                prof_ids=prof_ids
-            ))
+                prof_ids=prof_ids,
+                duree_minutes=duration
+            )
+            self.scheduled_exams.append(exam)
+            exams.append(exam)
             
-            self.room_schedule[room['id']][slot] = module_id
+            self._occupy_room(room['id'], slot, module_id, span)
             
+            if room['id'] in counted:
+                continue
+            if self.cross_module_sharing:
+                counted.add(room['id'])
+            if not prof_ids:
+                self.day_team_count[slot.date] += 1
+                if room['id'] not in reserved:
+                    reserved.add(room['id'])
+                    for covered in span:
+                        self.slot_team_count[covered] += 1
             for prof_id in prof_ids:
-                self.prof_slot_busy[(prof_id, slot)] = True
+                self._mark_prof_busy(prof_id, slot, span)
                 self.prof_daily_count[prof_id][slot.date] += 1
                 self.prof_total_supervisions[prof_id] += 1
+        touched = {prof_id for _, _, prof_ids in assignments for prof_id in prof_ids}
+        for prof_id in touched:
+            self._update_day_full(prof_id, slot.date)
+        self._push_prof_loads(touched)
+        
+        if self.cross_module_sharing:
+            seats, teams = defaultdict(int), {}
+            for group, room, prof_ids in assignments:
+                seats[room['id']] += group.nb_etudiants
+                teams[room['id']] = (room, prof_ids)
+            end = self.slot_windows[slot][0] + duration
+            for room_id, room_seats in seats.items():
+                self._share_room(teams[room_id][0], slot, module_id, room_seats, teams[room_id][1], span, end)
+        
+        # Marquer les cohortes - OPTIMISÉ (mise à jour vectorisée, une ligne par cohorte)
+        cohort_ids = self.module_cohorts.get(module_id)
+        if cohort_ids is not None and len(cohort_ids):
+            self.cohort_day_exams[cohort_ids, self.day_index[slot.date]] += 1
+        idx = self.module_index.get(module_id)
+        if idx is not None:
+            self.module_day[idx] = self.day_index[slot.date]
         
-        # Marquer les étudiants - OPTIMISÉ (utilise données préchargées)
-        student_ids = self.inscriptions_by_module.get(module_id, [])
-        for etudiant_id in student_ids:
-            self.student_schedule[etudiant_id].add(slot.date)
+        self.placements[module_id] = Placement(slot=slot, assignments=list(assignments), exams=exams)
+        self.rejection_tried.discard(module_id)
     
-    def schedule(self, progress_callback=None) -> Tuple[int, int, float]:
-        """Exécute l'algorithme de planification"""
-        start_time = time.time()
+    def _unplace_module(self, module_id: int, sync: bool = True) -> Optional[Placement]:
+        """
+        Retire un module planifié (inverse exact de _commit_assignments).
+        sync=False: scheduled_exams n'est pas filtré (recherche locale) - appeler
+        _rebuild_scheduled_exams() ensuite.
+        """
+        placement = self.placements.pop(module_id, None)
+        if placement is None:
+            return None
+        slot = placement.slot
+        span = self._span(slot, self._module_duration([group for group, _, _ in placement.assignments])) or (slot,)
         
-        print("\n" + "="*60)
-        print("🚀 OPTIMISATION v6.0 - Paramètres Avancés")
-        print("="*60)
-        print(f"   - Rest days: {self.config.get('rest_days', 0)}")
-        print(f"   - Division par dept: {self.config.get('dept_splitting', False)}")
-        print(f"   - Surveillants: salle={self.config.get('supervisors_small_room', 1)}, amphi={self.config.get('supervisors_amphi', 2)}")
+        # Salles partagées encore occupées par d'autres modules: salle et équipe restent prises
+        # (et comptées); sinon libérées sur le span de l'examen le plus long qu'elles ont accueilli
+        kept_rooms, room_spans = set(), {}
+        if self.cross_module_sharing:
+            for room_id in {room['id'] for _, room, _ in placement.assignments}:
+                shared = self.room_sharing.get((room_id, slot))
+                if shared is not None:
+                    room_spans[room_id] = shared['span']
+                if self._unshare_room(room_id, slot, module_id) is not None:
+                    kept_rooms.add(room_id)
+        
+        released, unreserved = set(), set()
+        for group, room, prof_ids in placement.assignments:
+            room_span = room_spans.get(room['id'], span)
+            if room['id'] in kept_rooms or room['id'] in released:
+                continue
+            self._release_room(room['id'], slot, room_span)
+            if self.cross_module_sharing:
+                released.add(room['id'])
+            if not prof_ids:
+                self.day_team_count[slot.date] -= 1
+                if room['id'] not in unreserved:
+                    unreserved.add(room['id'])
+                    for covered in room_span:
+                        self.slot_team_count[covered] -= 1
+            for prof_id in prof_ids:
+                self._mark_prof_free(prof_id, slot, room_span)
+                self.prof_daily_count[prof_id][slot.date] -= 1
+                self.prof_total_supervisions[prof_id] -= 1
+        touched = {prof_id for _, _, prof_ids in placement.assignments for prof_id in prof_ids}
+        for prof_id in touched:
+            self._update_day_full(prof_id, slot.date)
+        self._push_prof_loads(touched)
         
+        cohort_ids = self.module_cohorts.get(module_id)
+        if cohort_ids is not None and len(cohort_ids):
+            self.cohort_day_exams[cohort_ids, self.day_index[slot.date]] -= 1
+        idx = self.module_index.get(module_id)
+        if idx is not None:
+            self.module_day[idx] = -1
+        
+        if sync:
+            removed = {id(exam) for exam in placement.exams}
+            self.scheduled_exams = [se for se in self.scheduled_exams if id(se) not in removed]
+        return placement
+    
+    def _rebuild_scheduled_exams(self):
+        """Reconstruit scheduled_exams à partir des placements courants"""
+        self.scheduled_exams = [exam for placement in self.placements.values() for exam in placement.exams]
+    
+    def _reset_plan_state(self):
+        """Vide le plan courant (données préchargées conservées)"""
+        self.scheduled_exams = []
+        self.placements = {}
+        self.room_schedule = defaultdict(dict)
+        self.slot_room_mask = {}
+        self.room_sharing = {}
+        self.slot_shared_index = {}
+        self.prof_slot_busy = {}
+        self.prof_daily_count = defaultdict(lambda: defaultdict(int))
+        self.prof_total_supervisions = defaultdict(int)
+        self.slot_prof_mask = {}
+        self.day_full_mask = {}
+        self.slot_team_count = defaultdict(int)
+        self.day_team_count = defaultdict(int)
+        self._rebuild_prof_heaps()
+        self.module_day = np.full(len(self.module_ids), -1, dtype=np.int32)
+        self._init_occupancy()
+    
+    def _dsatur_order(self, modules: List[Tuple[int, List[GroupExam]]]):
+        """
+        Ordre DSatur (degré de saturation) sur le graphe de conflits étudiants.
+        Choisit à chaque étape le module ayant le moins de jours encore possibles
+        (jours de son département sans module en conflit déjà placé), puis le plus
+        grand degré, puis l'ordre d'entrée (effectifs décroissants). Saturation mise
+        à jour incrémentalement après chaque placement.
+        """
+        n = len(modules)
+        n_days = len(self.day_index)
+        graph = self.conflict_graph
+        
+        graph_idx = np.array([self.module_index.get(m, -1) for m, _ in modules], dtype=np.intp)
+        local_of = np.full(len(self.module_ids), -1, dtype=np.intp)
+        local_of[graph_idx[graph_idx >= 0]] = np.flatnonzero(graph_idx >= 0)
+        
+        # Jours autorisés par module (division par département)
+        allowed = np.zeros((n, n_days), dtype=bool)
+        for i, (module_id, group_exams) in enumerate(modules):
+            for slot in self._get_slots_for_dept(group_exams[0].dept_id, module_id):
+                allowed[i, self.day_index[slot.date]] = True
+        remaining_days = allowed.sum(axis=1)
+        blocked = np.zeros((n, n_days), dtype=bool)
+        
+        degree = np.where(graph_idx >= 0, self.module_degree[np.maximum(graph_idx, 0)], 0)
+        rank = np.arange(n)
+        pending = np.ones(n, dtype=bool)
+        
+        for _ in range(n):
+            candidates = np.flatnonzero(pending)
+            # lexsort: dernière clé = clé primaire
+            pick = candidates[np.lexsort((
+                rank[candidates], -degree[candidates], remaining_days[candidates]
+            ))[0]]
+            pending[pick] = False
+            
+            yield modules[pick]
+            
+            gidx = graph_idx[pick]
+            if gidx < 0 or self.module_day[gidx] < 0:
+                continue
+            day = self.module_day[gidx]
+            
+            # Saturation incrémentale des voisins non encore traités
+            neighbours = local_of[graph.indices[graph.indptr[gidx]:graph.indptr[gidx + 1]]]
+            neighbours = neighbours[neighbours >= 0]
+            neighbours = neighbours[pending[neighbours] & allowed[neighbours, day] & ~blocked[neighbours, day]]
+            blocked[neighbours, day] = True
+            remaining_days[neighbours] -= 1
+    
+    def _load_data(self):
+        """Charge toutes les données nécessaires à la planification"""
         self._load_departments()
         self._load_rooms()
         self._load_professors()
         self._preload_inscriptions()  # OPTIMISATION: preload inscriptions
+        self._build_conflict_graph()
         self._generate_slots()
+        self._load_unavailabilities()
         self._load_exams_by_group()
+        self._init_occupancy()
+    
+    def export_state(self) -> Dict:
+        """Exporte les données préchargées (picklable) pour reconstruire un planificateur sans DB"""
+        state = {name: getattr(self, name) for name in self.PRELOADED_STATE}
+        state['session_id'] = self.session_id
+        state['config'] = self.config
+        state['deadline'] = self.deadline
+        return state
+    
+    @classmethod
+    def from_state(
+        cls,
+        state: Dict,
+        config: Dict = None,
+        room_ids: Set[int] = None,
+        prof_ids: Set[int] = None
+    ) -> 'ExamScheduler':
+        """Reconstruit un planificateur vierge à partir de données préchargées (sans accès DB)"""
+        scheduler = cls(
+            state['session_id'],
+            config if config is not None else state['config'],
+            session_info=state['session_info']
+        )
+        for name in cls.PRELOADED_STATE:
+            setattr(scheduler, name, state[name])
+        
+        # Tranche de ressources éventuelle (sous-problème)
+        if room_ids is not None:
+            scheduler.rooms = [r for r in scheduler.rooms if r['id'] in room_ids]
+        scheduler._build_room_index()
+        if prof_ids is not None:
+            scheduler.professors = [p for p in scheduler.professors if p['id'] in prof_ids]
+        scheduler._build_prof_index()
+        for prof in scheduler.professors:
+            if prof.get('dept_id'):
+                scheduler.professors_by_dept[prof['dept_id']].append(prof)
+        
+        scheduler.module_day = np.full(len(scheduler.module_ids), -1, dtype=np.int32)
+        scheduler._init_occupancy()
+        scheduler.deadline = state.get('deadline')
+        scheduler.checkpoint_path = None  # copies (workers, essais): pas de point de contrôle
+        return scheduler
+    
+    @classmethod
+    def from_checkpoint(cls, path: str, config: Dict = None) -> Optional['ExamScheduler']:
+        """
+        Reprend un planificateur depuis son point de contrôle (sans accès DB): données
+        préchargées restaurées, plan rejoué puis vérifié contre les matrices sauvegardées.
+        Retourne None si le point de contrôle est absent ou illisible.
+        """
+        loaded = checkpoint.load_checkpoint(path)
+        if loaded is None:
+            return None
+        header, arrays = loaded['header'], loaded['arrays']
+        
+        scheduler = cls.from_state(loaded['state'], config)
+        scheduler.exams_by_module = defaultdict(list, scheduler.exams_by_module)
+        scheduler.checkpoint_path = path
+        
+        prof_indptr, prof_ids = arrays['exam_prof_indptr'], arrays['exam_prof_ids'].tolist()
+        scheduler._adopt_exams([
+            ScheduledExam(
+                module_id=module_id, salle_id=salle_id, slot=scheduler.slots[slot_pos],
+                nb_etudiants=nb_etudiants, groupe=groupe, duree_minutes=duree,
+                prof_ids=prof_ids[prof_indptr[i]:prof_indptr[i + 1]]
+            )
+            for i, ((module_id, salle_id, slot_pos, nb_etudiants, duree), groupe)
+            in enumerate(zip(arrays['exams'].tolist(), header['groupes']))
+        ])
+        loads = np.array([scheduler.prof_total_supervisions.get(p['id'], 0) for p in scheduler.professors])
+        if not (np.array_equal(scheduler.cohort_day_exams, arrays['cohort_day_exams'])
+                and np.array_equal(scheduler.module_day, arrays['module_day'])
+                and np.array_equal(loads, arrays['prof_loads'])):
+            raise ValueError(f"Point de contrôle incohérent: {path}")
+        
+        scheduler.resume_phase = header['phase']
+        scheduler.resume_unscheduled = header['unscheduled']
+        scheduler.elapsed_before = header['elapsed']
+        scheduler.precheck = header['precheck']
+        scheduler.best_score = header['best_score']
+        scheduler.anytime_stats = header['anytime_stats']
+        return scheduler
+    
+    def _checkpoint(self, phase: str, unscheduled: List[int], force: bool = False):
+        """Écrit un point de contrôle (au plus un par checkpoint_interval_seconds sauf force)"""
+        if not self.checkpoint_path:
+            return
+        now = time.time()
+        if not force and now - self.last_checkpoint < self.checkpoint_interval:
+            return
+        elapsed = self.elapsed_before + (now - self.run_started if self.run_started else 0)
+        duration = checkpoint.save_checkpoint(self, self.checkpoint_path, phase, unscheduled, elapsed)
+        self.last_checkpoint = time.time()
+        print(f"💾 Point de contrôle ({phase}, {len(self.scheduled_exams)} examens) en {duration * 1000:.0f} ms")
+    
+    def _take_plan(self, other: 'ExamScheduler'):
+        """Remplace le plan courant par celui d'un autre planificateur (même données)"""
+        for name in self.PLAN_STATE:
+            setattr(self, name, getattr(other, name))
+        # Les rejets comptés suivent le plan
+        self.rejection_index, self.rejection_counts = other.rejection_index, other.rejection_counts
+        self.rejection_tried = other.rejection_tried
+    
+    def _should_stop(self) -> bool:
+        """Échéance atteinte ou arrêt demandé"""
+        if self.stop_requested or (self.stop_event is not None and self.stop_event.is_set()):
+            return True
+        return self.deadline is not None and time.time() >= self.deadline
+    
+    def request_stop(self):
+        """Demande l'arrêt: la recherche s'interrompt et conserve le meilleur plan"""
+        self.stop_requested = True
+    
+    def _publish_best(self, scheduled_exams: List[ScheduledExam], unscheduled: List[int], score: Dict = None):
+        """Publie le meilleur plan courant (lisible via progress_callback ou best_plan)"""
+        self.best_plan = {
+            'scheduled': len(scheduled_exams),
+            'unscheduled': list(unscheduled),
+            'score': score,
+            'scheduled_exams': list(scheduled_exams),
+        }
+    
+    def _improve_until_deadline(self, unscheduled: List[int], progress_callback=None, reserve: float = 0) -> List[int]:
+        """
+        Anytime: à partir du plan glouton, enchaîne des essais perturbés jusqu'à l'échéance
+        (moins `reserve` secondes laissées à la phase suivante).
+        Le plan courant n'est remplacé que par un plan strictement meilleur: il est donc
+        toujours complet et utilisable, même en cas d'interruption.
+        """
+        state = self.export_state()
+        if self.deadline:
+            state['deadline'] = self.deadline - reserve
+        best_score = self.plan_score(len(unscheduled))
+        self._publish_best(self.scheduled_exams, unscheduled, best_score)
+        start = time.time()
+        total = max(state['deadline'] - start, 1e-9) if self.deadline else None
+        seed = self.anytime_stats['iterations']  # reprise: essais suivants
+        
+        print(f"♾️ Amélioration continue jusqu'à l'échéance ({total:.1f}s restantes)" if total else "♾️ Amélioration continue")
         
-        if not self.exams_by_module:
-            print("⚠️ Aucun examen à planifier")
-            return 0, 0, time.time() - start_time
+        try:
+            while not self._should_stop() and not (total and time.time() >= state['deadline']):
+                seed += 1
+                candidate = ExamScheduler.from_state(state)
+                _, candidate_unscheduled = candidate._schedule_modules(
+                    candidate._perturbed_modules(seed), record_conflicts=False
+                )
+                if candidate.timed_out:
+                    break  # plan partiel: non comparable
+                
+                self.anytime_stats['iterations'] += 1
+                score = candidate.plan_score(len(candidate_unscheduled))
+                if self._score_key(score) < self._score_key(best_score):
+                    self._take_plan(candidate)
+                    unscheduled, best_score = candidate_unscheduled, score
+                    self.anytime_stats['improvements'] += 1
+                    self._publish_best(self.scheduled_exams, unscheduled, best_score)
+                    self.best_score = best_score
+                    self._checkpoint('improve', unscheduled)
+                
+                if progress_callback and total:
+                    progress_callback(min((time.time() - start) / total, 1.0), self.best_plan)
+                if self.config.get('anytime_stop_when_perfect', False) and not unscheduled:
+                    break
+        except KeyboardInterrupt:
+            print("⏹️ Interruption - meilleur plan conservé")
+        
+        self.best_score = best_score
+        print(f"♾️ {self.anytime_stats['iterations']} essai(s), {self.anytime_stats['improvements']} amélioration(s) → {best_score}")
+        return unscheduled
+    
+    def _anneal(self, unscheduled: List[int], budget: float, reserve: float = 0) -> List[int]:
+        """Phase de recherche locale (recuit simulé) bornée par budget et échéance"""
+        end = time.time() + budget
+        if self.deadline:
+            end = min(end, self.deadline - reserve)
+        
+        annealer = SimulatedAnnealing(self, unscheduled, self.config, seed=self.config.get('seed', 0))
+        unscheduled = annealer.run(end)
+        self.annealing_stats = annealer.stats
+        self.best_score = self.plan_score(len(unscheduled))
+        
+        print(f"🔥 Recuit: {annealer.stats['moves']} mouvements ({annealer.stats['moves_per_second']}/s), "
+              f"{annealer.stats['accepted']} acceptés, objectif {annealer.stats['objective_delta']:+.0f}")
+        return unscheduled
+    
+    def _repair_lns(self, unscheduled: List[int], budget: float) -> List[int]:
+        """Phase LNS: voisinages libérés puis re-résolus exactement (MILP)"""
+        end = time.time() + budget
+        if self.deadline:
+            end = min(end, self.deadline)
         
-        if not self.rooms:
-            print("⚠️ Aucune salle disponible")
-            return 0, 0, time.time() - start_time
+        search = LargeNeighbourhoodSearch(self, unscheduled, self.config, seed=self.config.get('seed', 0))
+        unscheduled = search.run(end)
+        self.lns_stats = search.stats
+        self.best_score = self.plan_score(len(unscheduled))
         
-        sorted_modules = sorted(
-            self.exams_by_module.items(),
-            key=lambda x: sum(g.nb_etudiants for g in x[1]),
+        print(f"🧩 LNS: {search.stats['iterations']} voisinage(s), {search.stats['repaired']} module(s) récupéré(s), "
+              f"{search.stats['milp_solves']} MILP ({search.stats['milp_time']}s)")
+        return unscheduled
+    
+    def _assign_supervisors_flow(self, unscheduled: List[int]) -> List[int]:
+        """
+        Mode deux phases: affecte toutes les surveillances d'un coup (flot de coût minimal).
+        Flot infaisable sur les salles de la phase 1: repli sur la recherche gloutonne.
+        """
+        flow = SupervisorFlow(self, self.config)
+        self.supervision_stats = flow.run()
+        if self.defer_supervisors and self.supervision_stats['status'] != 'optimal':
+            unscheduled = self._staff_greedily(unscheduled)
+            self.supervision_stats.update(flow.load_stats('after'), fallback='glouton')
+        self.defer_supervisors = False
+        if self.best_score is not None:
+            self.best_score = self.plan_score(len(unscheduled))
+        
+        stats = self.supervision_stats
+        if 'gini_after' in stats:
+            print(f"👥 Surveillants ({stats['status']}{', repli glouton' if stats.get('fallback') else ''}, "
+                  f"{stats['solve_time']}s): Gini {stats.get('gini_before', '-')} → {stats['gini_after']}, "
+                  f"variance {stats.get('variance_before', '-')} → {stats['variance_after']}")
+        return unscheduled
+    
+    def _staff_greedily(self, unscheduled: List[int]) -> List[int]:
+        """
+        Repli du mode deux phases (flot infaisable, plan partiel à l'échéance): les salles de la
+        phase 1 reçoivent les surveillants de la recherche gloutonne, dans l'ordre de placement.
+        Les modules restés sans surveillant sont retirés puis re-planifiés par le glouton complet
+        (si l'échéance le permet) - retourne la liste des modules non planifiés.
+        """
+        placements = list(self.placements.items())
+        self.defer_supervisors = False
+        self._reset_plan_state()
+        
+        failed = []
+        for module_id, placement in placements:
+            slot = placement.slot
+            group_exams = [group for group, _, _ in placement.assignments]
+            span = self._span(slot, self._module_duration(group_exams)) or (slot,)
+            teams, used_profs, assignments = {}, set(), []
+            for group, room, _ in placement.assignments:
+                if room['id'] not in teams:
+                    shared = self.room_sharing.get((room['id'], slot))
+                    teams[room['id']] = shared['team'] if shared else self._find_supervisors(
+                        group.dept_id, slot, self._get_required_supervisors(room), used_profs, span
+                    )
+                    used_profs.update(teams[room['id']])
+                if not teams[room['id']]:
+                    failed.append(module_id)
+                    break
+                assignments.append((group, room, teams[room['id']]))
+            else:
+                self._commit_assignments(module_id, assignments, slot)
+        if not failed:
+            return unscheduled
+        
+        print(f"👥 Repli glouton: {len(failed)} module(s) sans surveillant")
+        if self._should_stop():
+            for module_id in failed:
+                self._record_unscheduled(module_id, self.exams_by_module[module_id])
+            return list(unscheduled) + failed
+        _, still = self._schedule_modules(self._sorted_modules(failed))
+        return list(unscheduled) + still
+    
+    def _set_unscheduled(self, unscheduled: List[int]):
+        """Reconstruit les conflits PLANIFICATION_IMPOSSIBLE pour la liste finale"""
+        self.conflicts = [c for c in self.conflicts if c.type != 'PLANIFICATION_IMPOSSIBLE']
+        for module_id in unscheduled:
+            self._record_unscheduled(module_id, self.exams_by_module[module_id])
+    
+    def _adopt_exams(self, exams: List[ScheduledExam]):
+        """Rejoue dans l'état courant des examens planifiés ailleurs (worker, autre plan)"""
+        rooms_by_id = {room['id']: room for room in self.rooms}
+        by_module: Dict[Tuple[int, ExamSlot], List[ScheduledExam]] = defaultdict(list)
+        for se in exams:
+            by_module[(se.module_id, se.slot)].append(se)
+        
+        for (module_id, slot), module_exams in by_module.items():
+            groups = {g.groupe: g for g in self.exams_by_module.get(module_id, [])}
+            assignments = [
+                (groups[se.groupe], rooms_by_id[se.salle_id], se.prof_ids)
+                for se in module_exams
+            ]
+            self._commit_assignments(module_id, assignments, slot)
+    
+    def _find_components(self) -> List[List[int]]:
+        """Composantes connexes du graphe de conflits restreint aux modules à planifier"""
+        module_ids = [m for m in self.exams_by_module if m in self.module_index]
+        components: List[List[int]] = [[m] for m in self.exams_by_module if m not in self.module_index]
+        
+        if module_ids:
+            idx = np.array([self.module_index[m] for m in module_ids], dtype=np.intp)
+            subgraph = self.conflict_graph[idx][:, idx]
+            n_components, labels = csgraph.connected_components(subgraph, directed=False)
+            grouped: List[List[int]] = [[] for _ in range(n_components)]
+            for module_id, label in zip(module_ids, labels):
+                grouped[label].append(module_id)
+            components.extend(grouped)
+        
+        return components
+    
+    def _partition_components(self, components: List[List[int]], n_workers: int) -> List[Dict]:
+        """
+        Répartit les composantes en sous-problèmes indépendants avec leur tranche de ressources.
+        - Classes de jours: des composantes sans jour commun (ex: groupes A/B de la division
+          par département) partagent toutes les salles et tous les surveillants.
+        - Dans une classe: composantes réparties en bacs (LPT), salles et surveillants
+          distribués au prorata de la demande (surveillants de préférence par département).
+        """
+        def module_demand(module_id: int) -> int:
+            return sum(g.nb_etudiants for g in self.exams_by_module[module_id])
+        
+        def module_days(module_id: int) -> Set[int]:
+            dept_id = self.exams_by_module[module_id][0].dept_id
+            return {self.day_index[s.date] for s in self._get_slots_for_dept(dept_id, module_id)}
+        
+        # 1. Classes de composantes partageant au moins un jour
+        day_classes: List[Tuple[Set[int], List[List[int]]]] = []
+        for component in components:
+            days = set().union(*(module_days(m) for m in component))
+            merged_days, merged_components = days, [component]
+            remaining = []
+            for class_days, class_components in day_classes:
+                if class_days & merged_days:
+                    merged_days = merged_days | class_days
+                    merged_components.extend(class_components)
+                else:
+                    remaining.append((class_days, class_components))
+            day_classes = remaining + [(merged_days, merged_components)]
+        
+        total_demand = sum(module_demand(m) for c in components for m in c) or 1
+        tasks = []
+        
+        for _, class_components in day_classes:
+            class_demand = sum(module_demand(m) for c in class_components for m in c)
+            n_bins = min(len(class_components), max(1, round(n_workers * class_demand / total_demand)))
+            
+            # 2. Bacs équilibrés (LPT: plus grosse composante dans le bac le moins chargé)
+            bins = [{'module_ids': [], 'demand': 0, 'dept_demand': defaultdict(int)} for _ in range(n_bins)]
+            for component in sorted(class_components, key=lambda c: -sum(module_demand(m) for m in c)):
+                target = min(bins, key=lambda b: b['demand'])
+                for module_id in component:
+                    demand = module_demand(module_id)
+                    target['module_ids'].append(module_id)
+                    target['demand'] += demand
+                    target['dept_demand'][self.exams_by_module[module_id][0].dept_id] += demand
+            
+            # 3. Ressources au prorata de la demande (un seul bac = toutes les ressources)
+            def deal(items, weight_of, shares):
+                assigned = [[] for _ in bins]
+                totals = [0.0] * len(bins)
+                for item in items:
+                    b = min(range(len(bins)), key=lambda i: (totals[i] / shares[i] if shares[i] else float('inf')))
+                    assigned[b].append(item)
+                    totals[b] += weight_of(item)
+                return assigned
+            
+            shares = [b['demand'] or 1 for b in bins]
+            room_slices = deal(self.rooms, lambda r: r['capacite'], shares)
+            
+            prof_slices = [[] for _ in bins]
+            profs_by_dept: Dict[Optional[int], List[Dict]] = defaultdict(list)
+            for prof in self.professors:
+                profs_by_dept[prof.get('dept_id')].append(prof)
+            for dept_id, dept_profs in profs_by_dept.items():
+                dept_shares = [b['dept_demand'].get(dept_id, 0) for b in bins]
+                if not any(dept_shares):
+                    dept_shares = shares
+                for b, chunk in enumerate(deal(dept_profs, lambda p: 1, dept_shares)):
+                    prof_slices[b].extend(chunk)
+            
+            for b, bin_ in enumerate(bins):
+                tasks.append({
+                    'module_ids': bin_['module_ids'],
+                    'room_ids': {r['id'] for r in room_slices[b]},
+                    'prof_ids': {p['id'] for p in prof_slices[b]},
+                })
+        
+        return tasks
+    
+    def _schedule_components_parallel(self, progress_callback=None) -> Tuple[int, List[int]]:
+        """
+        Décomposition en composantes indépendantes résolues dans un pool de processus,
+        puis fusion et passe de réconciliation (modules échoués replacés avec toutes les ressources).
+        """
+        components = self._find_components()
+        n_workers = self.config.get('max_workers') or os.cpu_count() or 1
+        tasks = self._partition_components(components, n_workers)
+        
+        print(f"🧩 {len(components)} composante(s) indépendante(s) → {len(tasks)} sous-problème(s)")
+        
+        if len(tasks) <= 1:
+            return self._schedule_modules(self._sorted_modules(), progress_callback)
+        
+        results = []
+        with ProcessPoolExecutor(
+            max_workers=min(n_workers, len(tasks)),
+            initializer=_init_worker,
+            initargs=(self.export_state(),)
+        ) as pool:
+            futures = [pool.submit(_solve_partition, task) for task in tasks]
+            for done, future in enumerate(as_completed(futures), start=1):
+                results.append(future.result())
+                if progress_callback:
+                    progress_callback(0.9 * done / len(tasks), self.best_plan)
+        
+        # Fusion: les tranches sont disjointes (salles/surveillants ou jours), pas de collision
+        failed: List[int] = []
+        for result in results:
+            self._adopt_exams(result['scheduled_exams'])
+            failed.extend(result['unscheduled'])
+        merged_count = len(self.scheduled_exams)
+        
+        # Réconciliation: replacer les modules échoués avec toutes les ressources restantes
+        repaired_count, unscheduled = self._schedule_modules(self._sorted_modules(failed))
+        
+        print(f"🧩 Fusion: {merged_count} examens, réconciliation: {len(failed) - len(unscheduled)}/{len(failed)} modules replacés")
+        
+        if progress_callback:
+            progress_callback(1.0, self.best_plan)
+        
+        return merged_count + repaired_count, unscheduled
+    
+    def _perturbed_modules(self, seed: int) -> List[Tuple[int, List[GroupExam]]]:
+        """Ordre perturbé (bruit multiplicatif sur les effectifs) - seed 0 = ordre déterministe"""
+        sorted_modules = self._sorted_modules()
+        if not seed:
+            return sorted_modules
+        rng = random.Random(seed)
+        noise = self.config.get('multi_start_noise', 0.2)
+        return sorted(
+            sorted_modules,
+            key=lambda x: sum(g.nb_etudiants for g in x[1]) * (1 + rng.uniform(-noise, noise)),
             reverse=True
         )
+    
+    def plan_score(self, unscheduled_count: int) -> Dict:
+        """Score d'un plan: modules non planifiés, variance des charges surveillants, jours utilisés"""
+        loads = np.array([self.prof_total_supervisions.get(p['id'], 0) for p in self.professors], dtype=float)
+        return {
+            'unscheduled': unscheduled_count,
+            'supervisor_variance': float(loads.var()) if len(loads) else 0.0,
+            'days_used': len({se.slot.date for se in self.scheduled_exams}),
+        }
+    
+    @staticmethod
+    def _score_key(score: Dict) -> Tuple:
+        """Clé de comparaison lexicographique (plus petit = meilleur)"""
+        return (score['unscheduled'], round(score['supervisor_variance'], 6), score['days_used'])
+    
+    def _schedule_multi_start(self, progress_callback=None) -> Tuple[int, List[int]]:
+        """
+        Multi-start: N ordres perturbés (graines différentes) résolus en parallèle,
+        chaque plan est noté et seul le meilleur est conservé. Budget global de temps:
+        les runs non terminés à l'échéance sont abandonnés.
+        """
+        n_starts = self.config.get('multi_start', 1)
+        n_workers = self.config.get('max_workers') or os.cpu_count() or 1
+        deadline = self.deadline or float('inf')
+        if self.config.get('time_budget_seconds'):
+            deadline = min(deadline, time.time() + self.config['time_budget_seconds'])
+        
+        print(f"🎲 Multi-start: {n_starts} essais, {n_workers} worker(s), budget {deadline - time.time():.1f}s")
+        
+        # Les essais reçoivent l'échéance et un signal d'arrêt: ils s'interrompent d'eux-mêmes
+        state = self.export_state()
+        state['deadline'] = deadline if deadline != float('inf') else None
+        stop_event = multiprocessing.Event()
+        
+        best = None
+        pool = ProcessPoolExecutor(
+            max_workers=min(n_workers, n_starts),
+            initializer=_init_worker,
+            initargs=(state, stop_event)
+        )
+        try:
+            pending = {pool.submit(_solve_multi_start, seed) for seed in range(n_starts)}
+            finished = 0
+            while pending:
+                remaining = deadline - time.time()
+                if remaining <= 0 or self.stop_requested:
+                    break
+                # Attente par tranches d'une seconde: un arrêt demandé est pris en compte
+                done, pending = wait(pending, timeout=min(remaining, 1.0), return_when=FIRST_COMPLETED)
+                for future in done:
+                    result = future.result()
+                    if not result['complete']:
+                        continue  # essai interrompu: plan partiel, non comparable
+                    finished += 1
+                    if best is None or self._score_key(result['score']) < self._score_key(best['score']):
+                        best = result
+                        self._publish_best(best['scheduled_exams'], best['unscheduled'], best['score'])
+                    if progress_callback:
+                        progress_callback(finished / n_starts, self.best_plan)
+        finally:
+            # Budget épuisé ou arrêt: essais non démarrés abandonnés, ceux en cours arrêtés
+            # (vérification à chaque module) - aucun worker ne survit à l'appel
+            stop_event.set()
+            pool.shutdown(wait=True, cancel_futures=True)
+        
+        if best is None:
+            print("⚠️ Budget épuisé avant le premier essai - repli sur le glouton déterministe")
+            return self._schedule_modules(self._sorted_modules(), progress_callback)
+        
+        print(f"🎲 {finished}/{n_starts} essais terminés, meilleur: graine {best['seed']} → {best['score']}")
+        
+        self._adopt_exams(best['scheduled_exams'])
+        for module_id in best['unscheduled']:
+            self._record_unscheduled(module_id, self.exams_by_module[module_id])
+        self.best_score = best['score']
+        return len(self.scheduled_exams), best['unscheduled']
+    
+    def _schedule_milp(self, progress_callback=None) -> Tuple[int, List[int]]:
+        """
+        Mode exact (config solver='milp'): résolution MILP puis complétion gloutonne.
+        Repli glouton si le modèle est trop grand, sans solution, ou si l'échéance
+        interrompt la résolution avec un plan moins bon que le glouton.
+        """
+        time_limit = self.config.get('milp_time_limit')
+        if time_limit is None:
+            time_limit = max(self.deadline - time.time(), 1.0) if self.deadline else 60.0
+        
+        solver = ExactSolver(self, self.config)
+        unscheduled = solver.solve(time_limit)
+        self.milp_stats = solver.stats
+        if progress_callback:
+            progress_callback(0.9, self.best_plan)
+        
+        # Modules non appliqués (surveillants agrégés): tentative gloutonne
+        if unscheduled is not None:
+            unscheduled = [m for m, groups in self._sorted_modules(unscheduled) if not self._place_module(m, groups)]
+        
+        if unscheduled is None or solver.stats['status'] != 'optimal':
+            # Repli borné par la même échéance: interrompu, il laisse des modules non traités
+            greedy = ExamScheduler.from_state(self.export_state())
+            greedy.stop_requested = self.stop_requested
+            _, greedy_unscheduled = greedy._schedule_modules(greedy._sorted_modules(), record_conflicts=False)
+            if unscheduled is None or len(greedy_unscheduled) < len(unscheduled):
+                print(f"🧮 Repli glouton: {len(greedy_unscheduled)} module(s) non planifié(s)")
+                self._take_plan(greedy)
+                unscheduled = greedy_unscheduled
+                self.timed_out, self.untried_modules = greedy.timed_out, greedy.untried_modules
+                self.milp_stats['fallback'] = True
+        
+        for module_id in unscheduled:
+            if module_id not in self.untried_modules:
+                self._record_unscheduled(module_id, self.exams_by_module[module_id])
+        return len(self.scheduled_exams), unscheduled
+    
+    def _load_existing_plan(self, module_ids: Set[int] = None) -> Dict[int, List[Dict]]:
+        """
+        Charge le plan enregistré de la session (examens + surveillants), par module.
+        module_ids: seulement les lignes de ces modules (voisinage d'un re-planning).
+        """
+        module_filter, params = "", (self.session_id,)
+        if module_ids is not None:
+            if not module_ids:
+                return defaultdict(list)
+            module_filter = f"AND e.module_id IN ({','.join(['%s'] * len(module_ids))})"
+            params += tuple(sorted(module_ids))
+        
+        rows = execute_query(f"""
+            SELECT e.id, e.module_id, e.salle_id, e.date_examen, e.creneau_id, e.nb_etudiants_prevus,
+                   COALESCE(e.groupe, 'G01') AS groupe
+            FROM examens e
+            WHERE e.session_id = %s {module_filter}
+            ORDER BY e.module_id, e.id
+        """, params) or []
+        
+        supervisors = defaultdict(list)
+        for row in execute_query(f"""
+            SELECT sv.examen_id, sv.professeur_id
+            FROM surveillances sv
+            JOIN examens e ON sv.examen_id = e.id
+            WHERE e.session_id = %s {module_filter}
+            ORDER BY sv.id
+        """, params) or []:
+            supervisors[row['examen_id']].append(row['professeur_id'])
+        
+        # Salle partagée entre modules (cross_module_sharing): l'équipe n'est enregistrée que sur
+        # une ligne de la salle et du créneau; les autres lignes la reprennent (shared_team)
+        teams = {}
+        for row in rows:
+            if supervisors[row['id']]:
+                teams.setdefault((row['salle_id'], row['date_examen'], row['creneau_id']), supervisors[row['id']])
+        plan = defaultdict(list)
+        for row in rows:
+            row['prof_ids'] = supervisors[row['id']]
+            row['shared_team'] = False
+            if not row['prof_ids']:
+                row['prof_ids'] = list(teams.get((row['salle_id'], row['date_examen'], row['creneau_id']), []))
+                row['shared_team'] = bool(row['prof_ids'])
+            plan[row['module_id']].append(row)
+        
+        print(f"♻️ Plan existant: {len(rows)} examens, {len(plan)} modules")
+        return plan
+    
+    def _existing_assignments(
+        self,
+        module_id: int,
+        rows: List[Dict],
+        slots_by_key: Dict[Tuple, ExamSlot],
+        rooms_by_id: Dict[int, Dict],
+        prof_ids: Set[int]
+    ) -> Optional[Tuple[ExamSlot, List[Tuple[GroupExam, Dict, List[int]]]]]:
+        """Assignations enregistrées d'un module si elles restent réalisables, sinon None"""
+        group_exams = self.exams_by_module.get(module_id)
+        slot = slots_by_key.get((rows[0]['date_examen'], rows[0]['creneau_id']))
+        if not group_exams or slot is None:
+            return None
+        if slot not in self._get_slots_for_dept(group_exams[0].dept_id, module_id):
+            return None
+        
+        # Mêmes groupes, même créneau pour toutes les lignes
+        rows_by_group = {row['groupe']: row for row in rows}
+        if len(rows_by_group) != len(rows) or set(rows_by_group) != {g.groupe for g in group_exams}:
+            return None
+        if any(slots_by_key.get((row['date_examen'], row['creneau_id'])) != slot for row in rows):
+            return None
+        if not self._check_student_availability(module_id, slot):
+            return None
+        duration = self._module_duration(group_exams)
+        span = self._span(slot, duration)
+        if span is None:
+            return None
+        end = self.slot_windows[slot][0] + duration
+        
+        # Salles encore disponibles, libres et assez grandes sur tout le span (groupes regroupés
+        # compris), ou salle partagée avec un module déjà restauré (même équipe, fin non dépassée)
+        seats = defaultdict(int)
+        assignments = []
+        joined = {}
+        for group in group_exams:
+            row = rows_by_group[group.groupe]
+            room = rooms_by_id.get(row['salle_id'])
+            if room is None or not row['prof_ids']:
+                return None
+            capacity = room['capacite']
+            if self._room_busy(room['id'], span):
+                record = self.room_sharing.get((room['id'], slot))
+                if record is None or sorted(record['team']) != sorted(row['prof_ids']) or record['end'] < end:
+                    return None
+                joined[room['id']] = record
+                capacity = record['residual']
+            seats[room['id']] += group.nb_etudiants
+            if seats[room['id']] > capacity:
+                return None
+            assignments.append((group, room, list(row['prof_ids'])))
+        
+        # Surveillants encore présents, libres et sous la limite journalière
+        max_per_day = self.config.get('max_supervisions_per_prof_per_day', 3)
+        shared_profs = {p for record in joined.values() for p in record['team']}
+        for prof_id in {p for _, _, profs in assignments for p in profs} - shared_profs:
+            if prof_id not in prof_ids or not self._is_prof_available_for_slot(prof_id, slot, span):
+                return None
+            if self.prof_daily_count[prof_id][slot.date] >= max_per_day:
+                return None
+        return slot, assignments
+    
+    def _schedule_warm_start(self, progress_callback=None) -> Tuple[int, List[int]]:
+        """
+        Démarrage à chaud (config warm_start): le plan enregistré sert de point de départ.
+        Les placements encore réalisables sont conservés tels quels (modules les plus
+        gros d'abord), seuls les modules invalidés ou nouveaux sont re-planifiés.
+        """
+        self.existing_plan = self._load_existing_plan()
+        slots_by_key = {(slot.date, slot.creneau_id): slot for slot in self.slots}
+        rooms_by_id = {room['id']: room for room in self.rooms}
+        prof_ids = {prof['id'] for prof in self.professors}
+        
+        self.kept_modules = set()
+        self.warm_start_updates = []
+        for module_id, group_exams in self._sorted_modules([m for m in self.existing_plan if m in self.exams_by_module]):
+            rows = self.existing_plan[module_id]
+            restored = self._existing_assignments(module_id, rows, slots_by_key, rooms_by_id, prof_ids)
+            if not restored:
+                continue
+            slot, assignments = restored
+            self._commit_assignments(module_id, assignments, slot)
+            self.kept_modules.add(module_id)
+            
+            # Effectifs modifiés: simple mise à jour de la ligne
+            rows_by_group = {row['groupe']: row for row in rows}
+            for group in group_exams:
+                row = rows_by_group[group.groupe]
+                if row['nb_etudiants_prevus'] != group.nb_etudiants:
+                    self.warm_start_updates.append((group.nb_etudiants, row['id']))
+        
+        to_place = [m for m in self.exams_by_module if m not in self.kept_modules]
+        print(f"♻️ {len(self.kept_modules)} module(s) conservé(s), {len(to_place)} à (re)planifier")
+        _, unscheduled = self._schedule_modules(self._sorted_modules(to_place), progress_callback)
+        
+        rows_deleted = sum(len(rows) for m, rows in self.existing_plan.items() if m not in self.kept_modules)
+        rows_inserted = sum(len(p.exams) for m, p in self.placements.items() if m not in self.kept_modules)
+        self.warm_start_stats = {
+            'kept_modules': len(self.kept_modules),
+            'replanned_modules': len(to_place),
+            'rows_unchanged': sum(len(self.existing_plan[m]) for m in self.kept_modules) - len(self.warm_start_updates),
+            'rows_updated': len(self.warm_start_updates),
+            'rows_deleted': rows_deleted,
+            'rows_inserted': rows_inserted,
+            'rows_changed': rows_deleted + rows_inserted + len(self.warm_start_updates),
+        }
+        print(f"♻️ Lignes modifiées: {self.warm_start_stats['rows_changed']} "
+              f"(-{rows_deleted} / +{rows_inserted} / ~{len(self.warm_start_updates)})")
+        return len(self.scheduled_exams), unscheduled
+    
+    def _sorted_modules(self, module_ids=None) -> List[Tuple[int, List[GroupExam]]]:
+        """Modules à planifier triés par effectif total décroissant"""
+        items = self.exams_by_module.items() if module_ids is None else \
+            [(m, self.exams_by_module[m]) for m in module_ids]
+        return sorted(items, key=lambda x: sum(g.nb_etudiants for g in x[1]), reverse=True)
+    
+    def _place_module(self, module_id: int, group_exams: List[GroupExam]) -> int:
+        """
+        Place un module sur le premier créneau valide - retourne le nb d'examens créés (0 = échec).
+        Les créneaux rejetés sont comptés par motif au passage (rejection_counts): le
+        diagnostic d'un module non planifié ne rejoue pas la recherche.
+        """
+        first_group = group_exams[0]
+        
+        # Obtenir les créneaux pour ce département (avec division si activée)
+        available_slots = self._get_slots_for_dept(first_group.dept_id, module_id)
+        
+        index = self._rejection_row(module_id)  # peut agrandir la matrice
+        row = self.rejection_counts[index]
+        row[:] = 0
+        row[self.REJECTION_REASONS.index('jours_departement')] = len(self.slots) - len(available_slots)
+        students = self.REJECTION_REASONS.index('etudiants')
+        
+        for slot in available_slots:
+            if not self._check_student_availability(module_id, slot):
+                row[students] += 1
+                continue
+            
+            assignments = self._find_rooms_and_supervisors(group_exams, slot)
+            if not assignments:
+                row[self._room_failure_reason(group_exams, slot)] += 1
+                continue
+            
+            self._commit_assignments(module_id, assignments, slot)
+            return len(assignments)
+        self.rejection_tried.add(module_id)
+        return 0
+    
+    def _rejection_row(self, module_id: int) -> int:
+        """
+        Ligne de rejection_counts d'un module (une ligne par module connu; la matrice grandit
+        quand de nouveaux modules sont chargés, les lignes existantes sont recopiées)
+        """
+        index = self.rejection_index.get(module_id)
+        if index is not None:
+            return index
+        for m in list(self.exams_by_module) + [module_id]:
+            self.rejection_index.setdefault(m, len(self.rejection_index))
+        grown = np.zeros((len(self.rejection_index), len(self.REJECTION_REASONS)), dtype=np.int32)
+        grown[:len(self.rejection_counts)] = self.rejection_counts
+        self.rejection_counts = grown
+        return self.rejection_index[module_id]
+    
+    def _room_failure_reason(self, group_exams: List[GroupExam], slot: ExamSlot) -> int:
+        """
+        Motif d'échec salles/surveillants d'un module sur un créneau (indice de REJECTION_REASONS),
+        déduit des masques de salles seulement
+        """
+        span = self._span(slot, self._module_duration(group_exams))
+        if span is None:
+            return self.REJECTION_REASONS.index('duree')
+        largest = self.rooms[0]['capacite'] if self.rooms else 0  # salles par capacités décroissantes
+        if max(g.nb_etudiants for g in group_exams) > largest:
+            return self.REJECTION_REASONS.index('salle_capacite')
+        used_rooms = 0
+        for group in sorted(group_exams, key=lambda x: x.nb_etudiants, reverse=True):
+            free = self._free_rooms_mask(slot, group.nb_etudiants, used_rooms, span)
+            if not free:
+                return self.REJECTION_REASONS.index('salle_occupee')
+            used_rooms |= free & -free
+        return self.REJECTION_REASONS.index('surveillants')
+    
+    def _diagnose_module(self, module_id: int, group_exams: List[GroupExam]) -> np.ndarray:
+        """
+        Rejets par motif d'un module non planifié: ceux comptés par sa dernière tentative
+        (_place_module). Module non tenté sur ce plan (placé ailleurs puis retiré par la
+        recherche locale, plan d'un worker): créneaux ré-examinés sur l'état courant avec les
+        seuls masques (étudiants, salles), sans recherche de surveillants.
+        """
+        index = self._rejection_row(module_id)  # peut agrandir la matrice
+        row = self.rejection_counts[index]
+        if module_id in self.rejection_tried:
+            return row
+        row[:] = 0
+        available_slots = self._get_slots_for_dept(group_exams[0].dept_id, module_id)
+        row[self.REJECTION_REASONS.index('jours_departement')] = len(self.slots) - len(available_slots)
+        students = self.REJECTION_REASONS.index('etudiants')
+        for slot in available_slots:
+            if not self._check_student_availability(module_id, slot):
+                row[students] += 1
+            else:
+                row[self._room_failure_reason(group_exams, slot)] += 1
+        self.rejection_tried.add(module_id)
+        return row
+    
+    def _record_unscheduled(self, module_id: int, group_exams: List[GroupExam]):
+        """Enregistre un conflit PLANIFICATION_IMPOSSIBLE pour ce module (avec les rejets par motif)"""
+        first_group = group_exams[0]
+        counts = self._diagnose_module(module_id, group_exams)
+        details = ", ".join(
+            f"{self.REJECTION_LABELS[reason]} {count}"
+            for reason, count in zip(self.REJECTION_REASONS, counts.tolist()) if count
+        )
+        self.conflicts.append(Conflict(
+            type='PLANIFICATION_IMPOSSIBLE',
+            examen1_id=module_id,
+            examen2_id=None,
+            entite_id=None,
+            description=f"Impossible: {first_group.module_code} ({first_group.niveau})"
+                        + (f" - créneaux rejetés: {details}" if details else ""),
+            severite='CRITIQUE'
+        ))
+    
+    def unscheduled_diagnostics(self) -> List[Dict]:
+        """Rejets par motif des modules non planifiés (motif dominant = goulot à corriger)"""
+        diagnostics = []
+        for conflict in self.conflicts:
+            if conflict.type != 'PLANIFICATION_IMPOSSIBLE':
+                continue
+            module_id = conflict.examen1_id
+            first_group = self.exams_by_module[module_id][0]
+            index = self._rejection_row(module_id)
+            counts = self.rejection_counts[index]
+            diagnostics.append({
+                'module_id': module_id,
+                'module_code': first_group.module_code,
+                'niveau': first_group.niveau,
+                'creneaux': len(self.slots),
+                **dict(zip(self.REJECTION_REASONS, counts.tolist())),
+                'goulot': self.REJECTION_REASONS[int(counts.argmax())] if counts.any() else None,
+            })
+        return diagnostics
+    
+    def _schedule_modules(
+        self,
+        sorted_modules: List[Tuple[int, List[GroupExam]]],
+        progress_callback=None,
+        record_conflicts: bool = True,
+        checkpoint_unscheduled: Optional[List[int]] = None
+    ) -> Tuple[int, List[int]]:
+        """
+        Boucle gloutonne - retourne (nb examens planifiés, modules non planifiés).
+        checkpoint_unscheduled: modules non planifiés avant cet appel; si fourni, des points
+        de contrôle sont écrits pendant la boucle.
+        Échéance ou arrêt demandé (vérifiés à chaque module) interrompent la boucle: les modules
+        restants sont non traités (untried_modules), jamais enregistrés comme impossibles.
+        """
+        # Ordre de traitement: effectifs décroissants (défaut) ou DSatur
+        if self.config.get('ordering', 'students') == 'dsatur':
+            module_order = self._dsatur_order(sorted_modules)
+        else:
+            module_order = sorted_modules
         
         scheduled_count = 0
-        conflict_count = 0
+        unscheduled: List[int] = []
         total = len(sorted_modules)
         
-        print(f"\n⏳ Planification de {total} modules...")
+        for idx, (module_id, group_exams) in enumerate(module_order):
+            checkpoint = idx % 50 == 0
+            if checkpoint and progress_callback:
+                progress_callback(idx / total, self.best_plan)
+            if not self.timed_out and self._should_stop():
+                self.timed_out = True
+                print(f"⏰ {'Arrêt demandé' if self.stop_requested else 'Échéance atteinte'}: "
+                      f"{total - idx} module(s) non traité(s)")
+            if checkpoint and checkpoint_unscheduled is not None and not self.timed_out:
+                self._checkpoint('greedy', checkpoint_unscheduled + unscheduled)
+            
+            if self.timed_out:
+                unscheduled.append(module_id)
+                self.untried_modules.append(module_id)
+                continue
+            
+            placed = self._place_module(module_id, group_exams)
+            if placed:
+                scheduled_count += placed
+                continue
+            
+            unscheduled.append(module_id)
+            if record_conflicts:
+                self._record_unscheduled(module_id, group_exams)
         
-        for idx, (module_id, group_exams) in enumerate(sorted_modules):
-            if progress_callback and idx % 50 == 0:
-                progress_callback(idx / total)
+        return scheduled_count, unscheduled
+    
+    def _resume_greedy(self, progress_callback=None) -> Tuple[int, List[int]]:
+        """
+        Reprise de la boucle gloutonne: modules ni placés ni déjà rejetés, dans l'ordre
+        d'origine (plan identique à une exécution sans interruption pour l'ordre par
+        effectifs; en DSatur la saturation est recalculée sur les modules restants)
+        """
+        done = set(self.placements) | set(self.resume_unscheduled)
+        remaining = [(m, groups) for m, groups in self._sorted_modules() if m not in done]
+        self._set_unscheduled(self.resume_unscheduled)
+        _, unscheduled = self._schedule_modules(
+            remaining, progress_callback, checkpoint_unscheduled=list(self.resume_unscheduled)
+        )
+        return len(self.scheduled_exams), list(self.resume_unscheduled) + unscheduled
+    
+    def schedule(self, progress_callback=None) -> Tuple[int, int, float]:
+        """
+        Exécute l'algorithme de planification.
+        progress_callback(progression, meilleur_plan) - meilleur_plan est None tant
+        qu'aucun plan complet n'existe.
+        optimization_timeout_seconds borne toute la génération (hors chargement des données):
+        atteinte pendant la passe gloutonne, elle laisse un plan partiel (meilleur plan publié,
+        modules restants dans untried_modules). L'amélioration continue (anytime) reste
+        optionnelle: elle consomme toujours tout le délai, alors que le glouton seul termine
+        en général bien avant.
+        """
+        start_time = time.time()
+        self.run_started = start_time
+        timeout = self.config.get(
+            'optimization_timeout_seconds', OPTIMIZATION_CONFIG['optimization_timeout_seconds']
+        )
+        # Reprise: seul le temps restant du budget initial est accordé
+        self.deadline = start_time + max(timeout - self.elapsed_before, 0) if timeout else None
+        
+        print("\n" + "="*60)
+        print("🚀 OPTIMISATION v6.0 - Paramètres Avancés")
+        print("="*60)
+        print(f"   - Rest days: {self.config.get('rest_days', 0)}")
+        print(f"   - Division par dept: {self.config.get('dept_splitting', False)}")
+        print(f"   - Surveillants: salle={self.config.get('supervisors_small_room', 1)}, amphi={self.config.get('supervisors_amphi', 2)}")
+        print(f"   - Ordre des modules: {self.config.get('ordering', 'students')}")
+        print(f"   - Solveur: {self.config.get('solver', 'greedy')}")
+        print(f"   - Échéance: {timeout}s")
+        
+        if self.resume_phase is None:
+            self._load_data()
             
-            first_group = group_exams[0]
-            scheduled = False
+            if not self.exams_by_module:
+                print("⚠️ Aucun examen à planifier")
+                return 0, 0, time.time() - start_time
             
-            # Obtenir les créneaux pour ce département (avec division si activée)
-            available_slots = self._get_slots_for_dept(first_group.dept_id, module_id)
+            if not self.rooms:
+                print("⚠️ Aucune salle disponible")
+                return 0, 0, time.time() - start_time
             
-            for slot in available_slots:
-                if not self._check_student_availability(module_id, slot):
-                    continue
-                
-                assignments = self._find_rooms_and_supervisors(group_exams, slot)
-                if not assignments:
-                    continue
-                
-                self._commit_assignments(module_id, assignments, slot)
-                scheduled_count += len(assignments)
-                scheduled = True
-                break
+            # Bornes rapides: instance prouvée infaisable → diagnostic sans lancer la planification
+            self.precheck = FeasibilityPrecheck(self, self.config).run()
+            if not self.precheck['feasible']:
+                print(f"🧪 Infaisable: au moins {self.precheck['lower_bound_unscheduled']} module(s) non planifiable(s) "
+                      f"({self.precheck['time'] * 1000:.0f} ms)")
+                for check in self.precheck['checks']:
+                    if not check['ok']:
+                        print(f"   ❌ {check['check']}: {check['message']}")
+                if self.config.get('stop_if_infeasible', True):
+                    self.precheck['stopped'] = True
+                    # Modules prouvés impossibles: conflits en mémoire (rien n'est enregistré,
+                    # le plan de la session reste en place)
+                    for module_id, reason in self.precheck['infeasible_modules'].items():
+                        self.conflicts.append(Conflict(
+                            type='PLANIFICATION_IMPOSSIBLE',
+                            examen1_id=module_id,
+                            examen2_id=None,
+                            entite_id=None,
+                            description=f"Impossible: {reason} ({self.exams_by_module[module_id][0].niveau})",
+                            severite='CRITIQUE'
+                        ))
+                    return 0, len(self.conflicts), time.time() - start_time
             
-            if not scheduled:
-                self.conflicts.append(Conflict(
-                    type='PLANIFICATION_IMPOSSIBLE',
-                    examen1_id=module_id,
-                    examen2_id=None,
-                    entite_id=None,
-                    description=f"Impossible: {first_group.module_code} ({first_group.niveau})",
-                    severite='CRITIQUE'
-                ))
-                conflict_count += 1
+            # Données chargées: une reprise n'aura plus besoin de la base
+            self._checkpoint('loaded', [], force=True)
+        else:
+            print(f"⏯️ Reprise ({self.resume_phase}): {len(self.scheduled_exams)} examens déjà planifiés, "
+                  f"{f'{max(timeout - self.elapsed_before, 0):.1f}' if timeout else '∞'}s restantes")
+        
+        sorted_modules = self._sorted_modules()
+        
+        print(f"\n⏳ Planification de {len(sorted_modules)} modules...")
+        
+        if self.resume_phase == 'improve':
+            scheduled_count, unscheduled = len(self.scheduled_exams), list(self.resume_unscheduled)
+            self._set_unscheduled(unscheduled)
+        elif self.resume_phase == 'greedy':
+            scheduled_count, unscheduled = self._resume_greedy(progress_callback)
+        elif self.config.get('warm_start', False):
+            scheduled_count, unscheduled = self._schedule_warm_start(progress_callback)
+        elif self.config.get('solver', 'greedy') == 'milp':
+            scheduled_count, unscheduled = self._schedule_milp(progress_callback)
+        elif self.config.get('multi_start', 1) > 1:
+            scheduled_count, unscheduled = self._schedule_multi_start(progress_callback)
+        elif self.config.get('parallel_components', False):
+            scheduled_count, unscheduled = self._schedule_components_parallel(progress_callback)
+        else:
+            scheduled_count, unscheduled = self._schedule_modules(
+                sorted_modules, progress_callback, checkpoint_unscheduled=[]
+            )
+        if not self.timed_out:
+            self._checkpoint('improve', unscheduled, force=True)
+        
+        # Phase d'amélioration: essais perturbés (anytime), recuit simulé puis LNS
+        # (pas en démarrage à chaud: les placements conservés ne doivent pas bouger)
+        improve = any(self.config.get(k, False) for k in ('anytime', 'annealing', 'lns'))
+        improve = improve and self.kept_modules is None
+        if not self.timed_out and improve:
+            sa_budget = self.config.get('annealing_seconds', 10) if self.config.get('annealing', False) else 0
+            lns_budget = self.config.get('lns_seconds', 10) if self.config.get('lns', False) else 0
+            if self.config.get('anytime', False):
+                unscheduled = self._improve_until_deadline(unscheduled, progress_callback, reserve=sa_budget + lns_budget)
+            if sa_budget:
+                unscheduled = self._anneal(unscheduled, sa_budget, reserve=lns_budget)
+                self._checkpoint('improve', unscheduled, force=True)
+            if lns_budget and unscheduled:
+                unscheduled = self._repair_lns(unscheduled, lns_budget)
+                self._checkpoint('improve', unscheduled, force=True)
+            scheduled_count = len(self.scheduled_exams)
+            self._set_unscheduled(unscheduled)
+        
+        # Phase 2 du mode deux phases: surveillants affectés globalement (plan partiel à
+        # l'échéance: recherche gloutonne directe)
+        if self.defer_supervisors and self.placements:
+            if self.timed_out:
+                unscheduled = self._staff_greedily(unscheduled)
+            else:
+                unscheduled = self._assign_supervisors_flow(unscheduled)
+            scheduled_count = len(self.scheduled_exams)
+        
+        self._publish_best(self.scheduled_exams, unscheduled, self.best_score)
+        conflict_count = len(unscheduled)
         
         execution_time = time.time() - start_time
         
@@ -565,11 +2409,50 @@ class ExamScheduler:
         
         return scheduled_count, conflict_count, execution_time
     
+    def _saved_teams(self, module_ids: Set[int]) -> Set[Tuple]:
+        """(salle, date, créneau) dont l'équipe est déjà enregistrée sur une ligne de ces modules"""
+        return {
+            (row['salle_id'], row['date_examen'], row['creneau_id'])
+            for module_id in module_ids for row in self.existing_plan.get(module_id, [])
+            if row['prof_ids'] and not row['shared_team']
+        }
+    
+    def _insert_exam(self, cursor, se: ScheduledExam, written: Set[Tuple] = None):
+        """
+        Insère un examen planifié et ses surveillants.
+        written: (salle, date, créneau) dont l'équipe est déjà enregistrée - avec
+        cross_module_sharing, les surveillances d'une salle partagée ne sont écrites qu'une fois.
+        """
+        cursor.execute("""
+            INSERT INTO examens (module_id, session_id, salle_id, date_examen, creneau_id, duree_minutes, nb_etudiants_prevus, groupe)
+            VALUES (%s, %s, %s, %s, %s, %s, %s, %s)
+        """, (
+            se.module_id, self.session_id, se.salle_id,
+            se.slot.date, se.slot.creneau_id, se.duree_minutes, se.nb_etudiants, se.groupe
+        ))
+        exam_id = cursor.lastrowid
+        
+        if self.cross_module_sharing and written is not None:
+            key = (se.salle_id, se.slot.date, se.slot.creneau_id)
+            if key in written:
+                return
+            written.add(key)
+        
+        # Insérer TOUS les surveillants (uniquement rôle SURVEILLANT)
+        for idx, prof_id in enumerate(se.prof_ids):
+            cursor.execute("""
+                INSERT INTO surveillances (examen_id, professeur_id, role)
+                VALUES (%s, %s, %s)
+            """, (exam_id, prof_id, 'SURVEILLANT'))
+    
     def save_to_database(self):
         """Sauvegarde les examens planifiés"""
+        if self.kept_modules is not None:
+            return self._save_incremental()
+        
+        # Plan complet sans examen: l'ancien plan est tout de même remplacé
         if not self.scheduled_exams:
-            print("⚠️ Aucun examen à sauvegarder")
-            return
+            print("⚠️ Aucun examen planifié")
         
         print("\n💾 Sauvegarde des examens...")
         
@@ -580,30 +2463,58 @@ class ExamScheduler:
             """, (self.session_id,))
             cursor.execute("DELETE FROM examens WHERE session_id = %s", (self.session_id,))
             
+            written = set()
             for se in self.scheduled_exams:
-                cursor.execute("""
-                    INSERT INTO examens (module_id, session_id, salle_id, date_examen, creneau_id, nb_etudiants_prevus, groupe)
-                    VALUES (%s, %s, %s, %s, %s, %s, %s)
-                """, (
-                    se.module_id, self.session_id, se.salle_id,
-                    se.slot.date, se.slot.creneau_id, se.nb_etudiants, se.groupe
-                ))
-                exam_id = cursor.lastrowid
-                
-                # Insérer TOUS les surveillants (uniquement rôle SURVEILLANT)
-                for idx, prof_id in enumerate(se.prof_ids):
-                    cursor.execute("""
-                        INSERT INTO surveillances (examen_id, professeur_id, role)
-                        VALUES (%s, %s, %s)
-                    """, (exam_id, prof_id, 'SURVEILLANT'))
+                self._insert_exam(cursor, se, written)
         
         print(f"✅ {len(self.scheduled_exams)} examens sauvegardés")
     
-    def save_conflicts_to_database(self):
-        """Sauvegarde les conflits"""
-        if not self.conflicts:
-            return
+    def _save_incremental(self):
+        """Démarrage à chaud: ne réécrit que les lignes des modules re-planifiés"""
+        changed_ids = [
+            row['id'] for module_id, rows in self.existing_plan.items()
+            if module_id not in self.kept_modules for row in rows
+        ]
+        new_exams = [se for module_id, placement in self.placements.items()
+                     if module_id not in self.kept_modules for se in placement.exams]
         
+        print(f"\n💾 Sauvegarde incrémentale: -{len(changed_ids)} / +{len(new_exams)} / ~{len(self.warm_start_updates)} examens...")
+        
+        with get_cursor() as cursor:
+            if changed_ids:
+                placeholders = ','.join(['%s'] * len(changed_ids))
+                cursor.execute(f"DELETE FROM surveillances WHERE examen_id IN ({placeholders})", changed_ids)
+                cursor.execute(f"DELETE FROM examens WHERE id IN ({placeholders})", changed_ids)
+            if self.warm_start_updates:
+                cursor.executemany(
+                    "UPDATE examens SET nb_etudiants_prevus = %s WHERE id = %s",
+                    self.warm_start_updates
+                )
+            written = self._saved_teams(self.kept_modules)
+            for se in new_exams:
+                self._insert_exam(cursor, se, written)
+            self._insert_orphan_teams(cursor, self.kept_modules, written)
+        
+        print(f"✅ {len(self.kept_modules)} module(s) inchangé(s), {len(new_exams)} examens réécrits")
+    
+    def _insert_orphan_teams(self, cursor, module_ids: Set[int], written: Set[Tuple]):
+        """
+        Salles partagées conservées dont la ligne portant l'équipe a été supprimée: l'équipe
+        est ré-enregistrée sur une ligne conservée
+        """
+        for module_id in module_ids:
+            for row in self.existing_plan.get(module_id, []):
+                key = (row['salle_id'], row['date_examen'], row['creneau_id'])
+                if not row['shared_team'] or key in written:
+                    continue
+                written.add(key)
+                cursor.executemany(
+                    "INSERT INTO surveillances (examen_id, professeur_id, role) VALUES (%s, %s, 'SURVEILLANT')",
+                    [(row['id'], prof_id) for prof_id in row['prof_ids']]
+                )
+    
+    def save_conflicts_to_database(self):
+        """Sauvegarde les conflits (remplace ceux de la session, même s'il n'y en a plus)"""
         with get_cursor() as cursor:
             cursor.execute("DELETE FROM conflits WHERE session_id = %s", (self.session_id,))
             
@@ -618,16 +2529,111 @@ class ExamScheduler:
                 ))
 
 
-def run_optimization(session_id: int, config: Dict = None) -> Dict:
-    """Fonction principale pour lancer l'optimisation"""
+# Workers (pool de processus)
+
+
+_WORKER_STATE: Optional[Dict] = None
+_WORKER_STOP = None
+
+
+def _init_worker(state: Dict, stop_event=None):
+    """Initialise un worker avec les données préchargées (transmises une seule fois)"""
+    global _WORKER_STATE, _WORKER_STOP
+    _WORKER_STATE = state
+    _WORKER_STOP = stop_event
+
+
+def _solve_partition(task: Dict) -> Dict:
+    """Résout un sous-problème (composantes + tranche de salles/surveillants) dans un worker"""
+    scheduler = ExamScheduler.from_state(
+        _WORKER_STATE, room_ids=task['room_ids'], prof_ids=task['prof_ids']
+    )
+    _, unscheduled = scheduler._schedule_modules(
+        scheduler._sorted_modules(task['module_ids']), record_conflicts=False
+    )
+    return {'scheduled_exams': scheduler.scheduled_exams, 'unscheduled': unscheduled}
+
+
+def _solve_multi_start(seed: int) -> Dict:
+    """Un essai multi-start: ordre perturbé par la graine, plan et score (borné par l'échéance)"""
+    scheduler = ExamScheduler.from_state(_WORKER_STATE)
+    scheduler.stop_event = _WORKER_STOP
+    _, unscheduled = scheduler._schedule_modules(
+        scheduler._perturbed_modules(seed), record_conflicts=False
+    )
+    return {
+        'seed': seed,
+        'complete': not scheduler.timed_out,
+        'scheduled_exams': scheduler.scheduled_exams,
+        'unscheduled': unscheduled,
+        'score': scheduler.plan_score(len(unscheduled)),
+    }
+
+
+def _replay_cached_plan(session_id: int, config: Dict, key: str) -> Optional[Dict]:
+    """
+    Plan en cache pour ces données et paramètres: rien à faire s'il est encore celui
+    enregistré en base, sinon il est ré-enregistré tel quel (sans replanifier)
+    """
+    start = time.time()
+    entry = plan_cache.load_plan(session_id, key)
+    if entry is None:
+        return None
+    
+    if entry['saved_fingerprint'] == plan_cache.saved_plan_fingerprint(session_id):
+        action = 'deja_enregistre'
+    else:
+        scheduler = ExamScheduler(session_id, config, session_info=entry['session_info'])
+        scheduler.scheduled_exams = entry['scheduled_exams']
+        scheduler.conflicts = entry['conflicts']
+        scheduler.save_to_database()
+        scheduler.save_conflicts_to_database()
+        entry['saved_fingerprint'] = plan_cache.saved_plan_fingerprint(session_id)
+        plan_cache.store_plan(session_id, key, entry)
+        action = 'reenregistre'
+    
+    print(f"♻️ Plan en cache ({action}) en {(time.time() - start) * 1000:.0f} ms")
+    return dict(entry['result'], cached=action, execution_time=time.time() - start)
+
+
+def run_optimization(session_id: int, config: Dict = None, progress_callback=None, on_start=None) -> Dict:
+    """
+    Fonction principale pour lancer l'optimisation
+    progress_callback(progression, meilleur_plan) est transmis au planificateur;
+    on_start(scheduler) est appelé avant la génération (ex: garder de quoi l'arrêter)
+    """
     try:
-        scheduler = ExamScheduler(session_id, config)
-        scheduled, conflicts, exec_time = scheduler.schedule()
+        config = config or {}
+        # Mêmes données + mêmes paramètres → plan en cache (pas en régénération incrémentale:
+        # elle dépend du plan enregistré)
+        use_cache = config.get('plan_cache', True) and not config.get('warm_start', False)
+        if use_cache:
+            key = plan_cache.plan_key(session_id, config)
+            cached = _replay_cached_plan(session_id, config, key)
+            if cached:
+                return cached
         
-        if scheduled > 0:
-            scheduler.save_to_database()
+        # Reprise d'une génération interrompue (config resume) depuis son point de contrôle
+        scheduler = None
+        if config.get('resume', False):
+            path = config.get('checkpoint_path') or checkpoint.checkpoint_path(session_id)
+            scheduler = ExamScheduler.from_checkpoint(path)
+        if scheduler is None:
+            scheduler = ExamScheduler(session_id, config)
+        if on_start:
+            on_start(scheduler)
+        scheduled, conflicts, exec_time = scheduler.schedule(progress_callback)
+        
+        # Plan incomplet (boucle gloutonne interrompue) ou instance prouvée infaisable:
+        # le plan enregistré n'est pas remplacé
+        infeasible = bool(scheduler.precheck and scheduler.precheck.get('stopped'))
+        saved = not scheduler.untried_modules and not infeasible
+        if scheduler.untried_modules:
+            print(f"⏹️ Plan incomplet ({len(scheduler.untried_modules)} module(s) non traité(s)): plan enregistré inchangé")
         
-        if conflicts > 0:
+        # Même transaction que l'insertion: l'ancien plan n'est jamais supprimé sans remplaçant
+        if saved:
+            scheduler.save_to_database()
             scheduler.save_conflicts_to_database()
         
         total_modules = len(scheduler.exams_by_module)
@@ -636,12 +2642,44 @@ def run_optimization(session_id: int, config: Dict = None) -> Dict:
             'success': True,
             'scheduled': scheduled,
             'conflicts': conflicts,
+            'ordering': scheduler.config.get('ordering', 'students'),
+            'unscheduled_modules': conflicts,
+            'plan_score': scheduler.best_score,
+            'timed_out': scheduler.timed_out,
+            'untried_modules': len(scheduler.untried_modules),
+            'untried_module_ids': list(scheduler.untried_modules),
+            'saved': saved,
+            'anytime_iterations': scheduler.anytime_stats['iterations'],
+            'anytime_improvements': scheduler.anytime_stats['improvements'],
+            'annealing': scheduler.annealing_stats,
+            'lns': scheduler.lns_stats,
+            'milp': scheduler.milp_stats,
+            'warm_start': scheduler.warm_start_stats,
+            'supervision': scheduler.supervision_stats,
+            'precheck': scheduler.precheck,
+            'infeasible': infeasible,
+            'diagnostics': [] if infeasible else scheduler.unscheduled_diagnostics(),
+            'quality': metrics_from_scheduler(scheduler) if scheduler.scheduled_exams else None,
             'execution_time': exec_time,
             'success_rate': ((total_modules - conflicts) / max(total_modules, 1)) * 100,
             'modules_planifies': total_modules - conflicts,
             'total_modules': total_modules
         }
         
+        # Génération terminée: le point de contrôle n'a plus d'utilité (gardé si annulée: reprise possible)
+        if scheduler.checkpoint_path and not scheduler.stop_requested:
+            checkpoint.remove_checkpoint(scheduler.checkpoint_path)
+        
+        # Plan interrompu (échéance, arrêt demandé) ou non enregistré: pas mis en cache
+        if use_cache and saved and not scheduler.timed_out and not scheduler.stop_requested:
+            plan_cache.store_plan(session_id, key, {
+                'result': result,
+                'session_info': scheduler.session_info,
+                'scheduled_exams': scheduler.scheduled_exams,
+                'conflicts': scheduler.conflicts,
+                'saved_fingerprint': plan_cache.saved_plan_fingerprint(session_id),
+            })
+        
         return result
     except Exception as e:
         import traceback
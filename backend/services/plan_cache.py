@@ -0,0 +1,148 @@
+"""
+Cache disque des plans générés
+- empreinte des données d'entrée: nb de lignes, MAX(id) et MAX(updated_at) de chaque
+  table lue par le planificateur (une seule requête)
+- hash des paramètres effectifs (OPTIMIZATION_CONFIG complété par opt_config, clés triées)
+- version = hash du code source des modules du planificateur: toute modification du
+  code invalide les plans en cache
+- entrée = résultat de run_optimization + examens planifiés + conflits, et l'empreinte
+  du plan enregistré en base (examens/surveillances de la session) après sauvegarde:
+  si elle n'a pas changé, relancer la génération ne fait rien
+"""
+import sys
+import os
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import glob
+import hashlib
+import json
+import pickle
+import time
+from typing import Dict, Optional
+
+from config import OPTIMIZATION_CONFIG
+from database import execute_query
+
+
+# À incrémenter quand le format des entrées change (le code du planificateur est couvert
+# par source_version)
+CACHE_VERSION = 1
+
+# Modules dont le code détermine le plan et le résultat mis en cache
+SCHEDULER_MODULES = (
+    'optimization', 'annealing', 'lns', 'milp_solver', 'supervision',
+    'precheck', 'unavailability', 'quality', 'plan_cache',
+)
+
+# Tables lues par le planificateur → colonne d'horodatage
+INPUT_TABLES = {
+    'sessions_examen': 'updated_at',
+    'departements': 'updated_at',
+    'formations': 'updated_at',
+    'etudiants': 'updated_at',
+    'modules': 'updated_at',
+    'inscriptions': 'updated_at',
+    'lieu_examen': 'updated_at',
+    'professeurs': 'updated_at',
+    'creneaux_horaires': 'created_at',
+    'indisponibilites_professeurs': 'created_at',
+}
+
+# Paramètres sans effet sur le plan produit
+IGNORED_KEYS = (
+    'plan_cache', 'resume', 'checkpoint', 'checkpoint_path', 'checkpoint_interval_seconds',
+    'plan_cache_dir', 'plan_cache_max_entries', 'checkpoint_dir', 'job_workers',
+)
+
+_source_version: Optional[str] = None
+
+
+def _digest(value) -> str:
+    return hashlib.sha256(json.dumps(value, sort_keys=True, default=str).encode()).hexdigest()
+
+
+def data_fingerprint() -> str:
+    """Empreinte des tables d'entrée (modifiée par tout ajout, suppression ou mise à jour)"""
+    query = " UNION ALL ".join(
+        f"SELECT '{table}' AS t, COUNT(*) AS n, MAX(id) AS max_id, MAX({column}) AS ts FROM {table}"
+        for table, column in INPUT_TABLES.items()
+    )
+    rows = execute_query(query) or []
+    return _digest(sorted((r['t'], r['n'], r['max_id'], r['ts']) for r in rows))
+
+
+def source_version() -> str:
+    """Hash du code source des modules du planificateur (calculé une fois par processus)"""
+    global _source_version
+    if _source_version is None:
+        directory = os.path.dirname(os.path.abspath(__file__))
+        digest = hashlib.sha256()
+        for name in SCHEDULER_MODULES:
+            with open(os.path.join(directory, f"{name}.py"), 'rb') as f:
+                digest.update(f.read())
+        _source_version = digest.hexdigest()
+    return _source_version
+
+
+def config_hash(config: Dict) -> str:
+    """
+    Hash des paramètres effectifs de génération (valeurs par défaut d'OPTIMIZATION_CONFIG
+    comprises: les modifier invalide les plans en cache; ordre des clés indifférent)
+    """
+    effective = {**OPTIMIZATION_CONFIG, **(config or {})}
+    return _digest({k: v for k, v in effective.items() if k not in IGNORED_KEYS})
+
+
+def saved_plan_fingerprint(session_id: int) -> str:
+    """Empreinte du plan enregistré de la session (examens et surveillances)"""
+    row = execute_query("""
+        SELECT COUNT(*) AS n, MAX(e.id) AS max_id, MAX(e.updated_at) AS ts,
+               (SELECT COUNT(*) FROM surveillances sv JOIN examens x ON sv.examen_id = x.id
+                WHERE x.session_id = %s) AS surveillances
+        FROM examens e
+        WHERE e.session_id = %s
+    """, (session_id, session_id), fetch='one') or {}
+    return _digest([row.get('n'), row.get('max_id'), row.get('ts'), row.get('surveillances')])
+
+
+def plan_key(session_id: int, config: Dict) -> str:
+    """Clé du cache: versions (format et code), session, empreinte des données, hash des paramètres"""
+    return _digest([
+        CACHE_VERSION, source_version(), session_id, data_fingerprint(), config_hash(config)
+    ])[:32]
+
+
+def _cache_dir() -> str:
+    return OPTIMIZATION_CONFIG.get('plan_cache_dir', '.plan_cache')
+
+
+def _path(session_id: int, key: str) -> str:
+    return os.path.join(_cache_dir(), f"plan_{session_id}_{key}.pkl")
+
+
+def load_plan(session_id: int, key: str) -> Optional[Dict]:
+    """Entrée du cache (None si absente ou illisible)"""
+    try:
+        with open(_path(session_id, key), 'rb') as f:
+            entry = pickle.load(f)
+    except (OSError, pickle.UnpicklingError, EOFError, AttributeError):
+        return None
+    return entry if entry.get('key') == key else None
+
+
+def store_plan(session_id: int, key: str, entry: Dict):
+    """Écrit une entrée (remplacement atomique) et ne garde que les plus récentes de la session"""
+    os.makedirs(_cache_dir(), exist_ok=True)
+    path = _path(session_id, key)
+    tmp = f"{path}.{os.getpid()}.tmp"
+    with open(tmp, 'wb') as f:
+        pickle.dump(dict(entry, key=key, stored_at=time.time()), f, protocol=pickle.HIGHEST_PROTOCOL)
+    os.replace(tmp, path)
+    
+    max_entries = OPTIMIZATION_CONFIG.get('plan_cache_max_entries', 5)
+    entries = sorted(glob.glob(os.path.join(_cache_dir(), f"plan_{session_id}_*.pkl")), key=os.path.getmtime)
+    for old in entries[:-max_entries]:
+        try:
+            os.remove(old)
+        except OSError:
+            pass
@@ -0,0 +1,242 @@
+"""
+Pré-vérifications de faisabilité (avant la boucle gloutonne)
+Bornes vectorisées (NumPy) calculées à partir des structures préchargées:
+- module seul: durée, plus grand groupe, places, salles et surveillants simultanés
+- places·créneaux demandées vs Σ capacités des salles × créneaux
+- examens par cohorte d'étudiants vs jours d'examen (après rest_days / dept_splitting)
+- salles à surveiller vs capacité professeurs × jours (limite journalière, indisponibilités)
+Les contraintes sont vérifiées sur chaque union d'ensembles de jours autorisés
+(groupes de l'alternance des départements): condition de Hall de la relaxation.
+Une borne inférieure > 0 du nombre de modules non planifiables prouve l'infaisabilité.
+"""
+import time
+from itertools import combinations
+from typing import Dict, List, Tuple
+
+import numpy as np
+from scipy import sparse
+
+
+class FeasibilityPrecheck:
+    """Diagnostic rapide: bornes inférieures du nombre de modules impossibles à placer"""
+    
+    # Au-delà, seuls les ensembles de jours pris un par un et leur union sont vérifiés
+    MAX_SUBSET_KEYS = 6
+    
+    def __init__(self, scheduler, config: Dict = None):
+        self.scheduler = scheduler
+        self.config = config or {}
+        self.checks: List[Dict] = []
+    
+    # Données par module
+    
+    def _module_arrays(self):
+        """Effectifs, groupes, ensemble de jours autorisés et plus court span de chaque module"""
+        scheduler = self.scheduler
+        n_days = len(scheduler.day_index)
+        modules = list(scheduler.exams_by_module.items())
+        
+        keys: Dict[Tuple[int, ...], int] = {}
+        span_cache: Dict[Tuple[int, int], Tuple[int, Tuple[int, ...]]] = {}
+        key_of = np.zeros(len(modules), dtype=np.intp)
+        span_len = np.zeros(len(modules), dtype=np.int64)
+        for i, (module_id, groups) in enumerate(modules):
+            allowed = scheduler._get_slots_for_dept(groups[0].dept_id, module_id)
+            duration = scheduler._module_duration(groups)
+            cache_key = (id(allowed), duration)
+            if cache_key not in span_cache:
+                spans = [(slot, scheduler._span(slot, duration)) for slot in allowed]
+                lengths = [len(span) for _, span in spans if span]
+                days = tuple(sorted({scheduler.day_index[slot.date] for slot, span in spans if span}))
+                span_cache[cache_key] = (min(lengths, default=0), days)
+            span_len[i], days = span_cache[cache_key]
+            key_of[i] = keys.setdefault(days, len(keys))
+        
+        key_days = np.zeros((len(keys), n_days), dtype=bool)
+        for days, k in keys.items():
+            key_days[k, list(days)] = True
+        
+        seats = np.array([sum(g.nb_etudiants for g in groups) for _, groups in modules], dtype=np.int64)
+        largest = np.array([max(g.nb_etudiants for g in groups) for _, groups in modules], dtype=np.int64)
+        n_groups = np.array([len(groups) for _, groups in modules], dtype=np.int64)
+        return modules, seats, largest, n_groups, span_len, key_of, key_days
+    
+    def _rooms_needed(self, seats: np.ndarray, n_groups: np.ndarray, max_capacity: int) -> np.ndarray:
+        """Salles simultanées au minimum par module (fractionnaire si partage entre modules)"""
+        if self.config.get('cross_module_sharing', False):
+            return seats / max(max_capacity, 1)
+        if self.config.get('allow_room_sharing', True):
+            k = np.minimum(self.config.get('max_groups_per_room', 2), n_groups)
+            return (n_groups - (k - 1)).astype(float)
+        return n_groups.astype(float)
+    
+    def _prof_capacity(self) -> Tuple[np.ndarray, np.ndarray]:
+        """Créneaux et jours disponibles par (professeur, jour) - indisponibilités déduites"""
+        scheduler = self.scheduler
+        n_days = len(scheduler.day_index)
+        slot_day = np.array([scheduler.day_index[slot.date] for slot in scheduler.slots], dtype=np.intp)
+        blocked = np.array([
+            [bool(scheduler.prof_unavailable.get(p['id'], 0) & scheduler.slot_bit.get(slot, 0)) for slot in scheduler.slots]
+            for p in scheduler.professors
+        ], dtype=bool).reshape(len(scheduler.professors), len(scheduler.slots))
+        free_slots = np.zeros((len(scheduler.professors), n_days), dtype=np.int64)
+        np.add.at(free_slots.T, slot_day, (~blocked).T)
+        return free_slots, free_slots > 0
+    
+    # Vérifications
+    
+    def _module_checks(self, seats, largest, rooms, span_len, capacities) -> Dict[int, str]:
+        """Modules impossibles à placer même seuls (index → raison)"""
+        max_capacity = int(capacities[0]) if len(capacities) else 0
+        total_capacity = int(capacities.sum())
+        n_profs = len(self.scheduler.professors)
+        
+        reasons = np.select(
+            [
+                span_len == 0,
+                largest > max_capacity,
+                seats > total_capacity,
+                np.ceil(rooms - 1e-9) > len(capacities),
+                np.ceil(rooms - 1e-9) > n_profs,
+            ],
+            ['duree', 'groupe', 'places', 'salles', 'surveillants'],
+            default=''
+        )
+        return {i: str(reason) for i, reason in enumerate(reasons) if reason}
+    
+    @staticmethod
+    def _min_removed(contributions: np.ndarray, excess: float) -> int:
+        """Nb minimal de modules à retirer pour résorber l'excès (plus grosses contributions d'abord)"""
+        if excess <= 1e-9:
+            return 0
+        cumulative = np.cumsum(np.sort(contributions)[::-1])
+        return int(min(np.searchsorted(cumulative, excess - 1e-9) + 1, len(contributions)))
+    
+    def _subsets(self, n_keys: int):
+        if n_keys <= self.MAX_SUBSET_KEYS:
+            for size in range(1, n_keys + 1):
+                yield from combinations(range(n_keys), size)
+        else:
+            yield from ((k,) for k in range(n_keys))
+            yield tuple(range(n_keys))
+    
+    def _record(self, name: str, demand: float, capacity: float, lower_bound: int, n_days: int, message: str):
+        self.checks.append({
+            'check': name,
+            'ok': lower_bound == 0,
+            'demand': round(float(demand), 1),
+            'capacity': round(float(capacity), 1),
+            'days': n_days,
+            'lower_bound': lower_bound,
+            'message': message,
+        })
+    
+    def _keep(self, worst: Dict, name: str, contributions: np.ndarray, capacity: float, n_days: int, describe):
+        """Retient pour chaque vérification l'ensemble de jours le plus contraint"""
+        demand = float(contributions.sum())
+        lower_bound = self._min_removed(contributions, demand - capacity)
+        if name != 'places':
+            demand = float(np.ceil(demand - 1e-9))  # salles fractionnaires (partage entre modules)
+        ratio = demand / capacity if capacity else np.inf
+        if name not in worst or (lower_bound, ratio) > worst[name][:2]:
+            worst[name] = (lower_bound, ratio, demand, capacity, n_days, describe(demand, capacity))
+    
+    def _cohort_loads(self, modules, ok: np.ndarray, key_of: np.ndarray, n_keys: int) -> sparse.csr_matrix:
+        """Nb d'examens par (cohorte, ensemble de jours autorisés)"""
+        scheduler = self.scheduler
+        n_cohorts = len(scheduler.cohort_sizes)
+        rows, cols = [], []
+        for i, (module_id, _) in enumerate(modules):
+            cohorts = scheduler.module_cohorts.get(module_id)
+            if ok[i] and cohorts is not None and len(cohorts):
+                rows.append(np.asarray(cohorts, dtype=np.intp))
+                cols.append(np.full(len(cohorts), key_of[i], dtype=np.intp))
+        if not rows:
+            return sparse.csr_matrix((0, n_keys), dtype=np.int64)
+        rows, cols = np.concatenate(rows), np.concatenate(cols)
+        return sparse.csr_matrix((np.ones(len(rows), dtype=np.int64), (rows, cols)), shape=(n_cohorts, n_keys))
+    
+    def run(self) -> Dict:
+        start = time.time()
+        scheduler = self.scheduler
+        modules, seats, largest, n_groups, span_len, key_of, key_days = self._module_arrays()
+        capacities = np.array(sorted((r['capacite'] for r in scheduler.rooms), reverse=True), dtype=np.int64)
+        max_capacity = int(capacities[0]) if len(capacities) else 0
+        rooms = self._rooms_needed(seats, n_groups, max_capacity)
+        
+        impossible = self._module_checks(seats, largest, rooms, span_len, capacities)
+        ok = np.ones(len(modules), dtype=bool)
+        ok[list(impossible)] = False
+        
+        # Agrégats par ensemble de jours autorisés (modules faisables seuls)
+        slots_per_day = np.bincount([scheduler.day_index[slot.date] for slot in scheduler.slots],
+                                    minlength=len(scheduler.day_index))
+        free_slots, free_days = self._prof_capacity()
+        limit = scheduler._daily_supervision_limit()
+        max_exams = self.config.get('max_exam_per_student_per_day', 1)
+        
+        cohort_load = self._cohort_loads(modules, ok, key_of, key_days.shape[0])
+        worst: Dict[str, Tuple] = {}
+        
+        for subset in self._subsets(key_days.shape[0]):
+            days = key_days[list(subset)].any(axis=0)
+            in_subset = ok & np.isin(key_of, subset)
+            if not in_subset.any():
+                continue
+            n_days = int(days.sum())
+            n_slots = int(slots_per_day[days].sum())
+            
+            # 1. Places·créneaux (un examen long occupe ses places sur tout son span)
+            seat_slots = seats[in_subset] * span_len[in_subset]
+            capacity = float(capacities.sum()) * n_slots
+            self._keep(worst, 'places', seat_slots, capacity, n_days,
+                       lambda d, c: f"{d:.0f} places·créneaux demandées pour {c:.0f} disponibles "
+                                    f"({len(capacities)} salles, {n_slots} créneaux)")
+            
+            # 2. Salles·créneaux
+            room_slots = rooms[in_subset] * span_len[in_subset]
+            self._keep(worst, 'salles', room_slots, float(len(capacities) * n_slots), n_days,
+                       lambda d, c: f"{np.ceil(d):.0f} salles·créneaux nécessaires pour {c:.0f} disponibles")
+            
+            # 3. Surveillants: un prof par salle et par créneau, limite de salles par jour
+            self._keep(worst, 'surveillants_creneaux', room_slots, float(free_slots[:, days].sum()), n_days,
+                       lambda d, c: f"{np.ceil(d):.0f} salles·créneaux à surveiller pour {c:.0f} "
+                                    f"professeurs·créneaux disponibles (indisponibilités déduites)")
+            self._keep(worst, 'surveillants_jours', rooms[in_subset], float(limit * free_days[:, days].sum()), n_days,
+                       lambda d, c: f"{np.ceil(d):.0f} salles à surveiller pour {c:.0f} surveillances possibles "
+                                    f"({len(scheduler.professors)} professeurs × jours × {limit}/jour)")
+            
+            # 4. Étudiants: examens d'une cohorte vs jours d'examen × max par jour
+            if cohort_load.shape[0]:
+                load = np.asarray(cohort_load[:, list(subset)].sum(axis=1)).ravel()
+                excess = load - max_exams * n_days
+                c = int(np.argmax(excess))
+                lower_bound = int(max(excess[c], 0))
+                if 'etudiants' not in worst or (lower_bound, excess[c]) > worst['etudiants'][:2]:
+                    size = int(scheduler.cohort_sizes[c]) if c < len(scheduler.cohort_sizes) else 0
+                    worst['etudiants'] = (lower_bound, excess[c], load[c], max_exams * n_days, n_days,
+                                          f"{size} étudiant(s) avec {load[c]} examens pour {n_days} jour(s) "
+                                          f"d'examen × {max_exams}/jour (repos: {self.config.get('rest_days', 0)} jour(s), "
+                                          f"alternance départements: {'oui' if self.config.get('dept_splitting') else 'non'})")
+        
+        for name, (lower_bound, _, demand, capacity, n_days, message) in worst.items():
+            self._record(name, demand, capacity, lower_bound, n_days, message)
+        
+        reasons = {
+            'duree': "durée: l'examen ne peut se terminer avant la fin de la journée sur aucun créneau autorisé",
+            'groupe': f"un groupe dépasse la plus grande salle ({max_capacity} places)",
+            'places': f"effectif supérieur à la capacité totale des salles ({int(capacities.sum())} places)",
+            'salles': f"plus de salles simultanées que de salles disponibles ({len(capacities)})",
+            'surveillants': f"plus de salles simultanées que de professeurs ({len(scheduler.professors)})",
+        }
+        infeasible_modules = {
+            modules[i][0]: f"{modules[i][1][0].module_code}: {reasons[reason]}" for i, reason in impossible.items()
+        }
+        lower_bound = len(impossible) + max((c['lower_bound'] for c in self.checks), default=0)
+        return {
+            'feasible': lower_bound == 0,
+            'lower_bound_unscheduled': lower_bound,
+            'infeasible_modules': infeasible_modules,
+            'checks': self.checks,
+            'time': round(time.time() - start, 4),
+        }
@@ -0,0 +1,284 @@
+"""
+Indicateurs de qualité d'un plan (KPIs) calculés en NumPy
+- à partir du plan en mémoire (metrics_from_scheduler: cohortes pondérées par leur taille)
+  ou du plan enregistré (metrics_from_database: 5 requêtes, inscriptions par étudiant)
+- écart minimal entre deux examens de chaque étudiant, examens par étudiant et par jour
+- taux de remplissage de chaque (salle, créneau), charge des surveillants (Gini)
+- jours utilisés et étalement par département
+Tout est vectorisé (tri + reduceat / bincount): quelques dizaines de ms à pleine échelle.
+"""
+import sys
+import os
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import time
+from datetime import date
+from typing import Dict, List, Tuple
+
+import numpy as np
+
+from database import execute_query
+from services.supervision import gini
+
+
+EXAM_FIELDS = ('module_id', 'salle_id', 'day', 'start', 'end', 'nb_etudiants', 'dept_id')
+
+
+def _pct(part, total) -> float:
+    return round(100.0 * float(part) / total, 1) if total else 0.0
+
+
+def _segments(keys: np.ndarray) -> np.ndarray:
+    """Débuts des segments de valeurs égales d'un tableau trié"""
+    if not len(keys):
+        return np.zeros(0, dtype=np.intp)
+    return np.flatnonzero(np.r_[True, keys[1:] != keys[:-1]])
+
+
+def _student_metrics(mod_ids, mod_day, mod_start, mod_end, enrolments) -> Dict:
+    """Écarts et examens par jour de chaque étudiant (ou cohorte, pondérée par sa taille)"""
+    entity, module, weight = enrolments
+    pos = np.searchsorted(mod_ids, module)
+    pos = np.minimum(pos, max(len(mod_ids) - 1, 0))
+    valid = (mod_ids[pos] == module) if len(mod_ids) else np.zeros(len(module), dtype=bool)
+    entity, weight, pos = entity[valid], weight[valid], pos[valid]
+    
+    empty = {
+        'etudiants': 0, 'avec_plusieurs_examens': 0, 'ecart_min_heures_moyen': None,
+        'meme_jour_pct': 0.0, 'jours_consecutifs_pct': 0.0, 'deux_jours_ou_plus_pct': 0.0,
+        'examens_par_jour_max': 0, 'plusieurs_examens_jour_pct': 0.0,
+    }
+    if not len(entity):
+        return empty
+    
+    day, start, end = mod_day[pos], mod_start[pos], mod_end[pos]
+    order = np.lexsort((start, day, entity))
+    entity, weight, day = entity[order], weight[order], day[order]
+    start_abs = day * 1440 + start[order]
+    end_abs = day * 1440 + end[order]
+    
+    starts = _segments(entity)
+    n_students = float(weight[starts].sum())
+    
+    # Examens par (étudiant, jour): segments de la clé triée, maximum par étudiant
+    day_starts = _segments(entity * (int(day.max()) + 1) + day)
+    per_day = np.diff(np.r_[day_starts, len(entity)])
+    day_entity = entity[day_starts]
+    max_per_day = np.maximum.reduceat(per_day, _segments(day_entity))
+    busy_days = weight[starts][max_per_day > 1].sum()
+    
+    # Écart minimal entre deux examens consécutifs du même étudiant
+    same = entity[1:] == entity[:-1]
+    gap_minutes = (start_abs[1:] - end_abs[:-1])[same]
+    gap_days = (day[1:] - day[:-1])[same]
+    pair_entity = entity[:-1][same]
+    if len(pair_entity):
+        pair_starts = _segments(pair_entity)
+        pair_weight = weight[:-1][same][pair_starts]
+        min_minutes = np.minimum.reduceat(gap_minutes, pair_starts)
+        min_days = np.minimum.reduceat(gap_days, pair_starts)
+        n_multi = float(pair_weight.sum())
+        mean_gap = round(float((min_minutes * pair_weight).sum() / n_multi) / 60, 1)
+    else:
+        pair_weight = min_days = np.zeros(0)
+        n_multi, mean_gap = 0.0, None
+    
+    return {
+        'etudiants': int(n_students),
+        'avec_plusieurs_examens': int(n_multi),
+        'ecart_min_heures_moyen': mean_gap,
+        'meme_jour_pct': _pct(pair_weight[min_days == 0].sum(), n_multi),
+        'jours_consecutifs_pct': _pct(pair_weight[min_days == 1].sum(), n_multi),
+        'deux_jours_ou_plus_pct': _pct(pair_weight[min_days >= 2].sum(), n_multi),
+        'examens_par_jour_max': int(max_per_day.max()),
+        'plusieurs_examens_jour_pct': _pct(busy_days, n_students),
+    }
+
+
+def _room_metrics(exams: Dict[str, np.ndarray], capacities: Dict[int, int]) -> Dict:
+    """Remplissage de chaque (salle, créneau): places occupées / capacité"""
+    if not len(exams['salle_id']):
+        return {'salle_creneaux': 0, 'remplissage_moyen_pct': 0.0, 'remplissage_median_pct': 0.0,
+                'sous_50_pct': 0.0, 'surcharges': 0}
+    keys = np.stack([exams['salle_id'], exams['day'], exams['start']], axis=1)
+    room_slots, inverse = np.unique(keys, axis=0, return_inverse=True)
+    inverse = inverse.reshape(-1)
+    occupied = np.bincount(inverse, weights=exams['nb_etudiants'], minlength=len(room_slots))
+    capacity = np.array([capacities.get(int(r), 0) for r in room_slots[:, 0]], dtype=float)
+    known = capacity > 0
+    fill = occupied[known] / capacity[known]
+    return {
+        'salle_creneaux': int(len(room_slots)),
+        'remplissage_moyen_pct': round(100 * float(fill.mean()), 1) if len(fill) else 0.0,
+        'remplissage_median_pct': round(100 * float(np.median(fill)), 1) if len(fill) else 0.0,
+        'sous_50_pct': _pct((fill < 0.5).sum(), len(fill)),
+        'surcharges': int((fill > 1).sum()),
+    }
+
+
+def _supervisor_metrics(supervisor_ids: np.ndarray, prof_ids: np.ndarray) -> Dict:
+    """Distribution des surveillances sur tous les professeurs (inactifs compris)"""
+    prof_ids = np.sort(prof_ids)
+    if not len(prof_ids):
+        return {'profs': 0, 'profs_actifs': 0, 'charge_moyenne': 0.0, 'charge_min': 0,
+                'charge_max': 0, 'variance': 0.0, 'gini': 0.0}
+    pos = np.minimum(np.searchsorted(prof_ids, supervisor_ids), len(prof_ids) - 1)
+    pos = pos[prof_ids[pos] == supervisor_ids]
+    loads = np.bincount(pos, minlength=len(prof_ids))
+    return {
+        'profs': int(len(prof_ids)),
+        'profs_actifs': int((loads > 0).sum()),
+        'charge_moyenne': round(float(loads.mean()), 2),
+        'charge_min': int(loads.min()),
+        'charge_max': int(loads.max()),
+        'variance': round(float(loads.var()), 2),
+        'gini': round(gini(loads), 4),
+    }
+
+
+def _department_metrics(mod_dept: np.ndarray, mod_day: np.ndarray) -> List[Dict]:
+    """Étalement par département: jours utilisés, premier/dernier jour, modules max par jour"""
+    if not len(mod_dept):
+        return []
+    order = np.lexsort((mod_day, mod_dept))
+    dept, day = mod_dept[order], mod_day[order]
+    starts = _segments(dept)
+    day_starts = _segments(dept * (int(day.max()) + 1) + day)
+    per_day = np.diff(np.r_[day_starts, len(dept)])
+    day_dept = dept[day_starts]
+    day_groups = _segments(day_dept)
+    
+    first = day[starts]
+    last = np.maximum.reduceat(day, starts)
+    return [
+        {
+            'dept_id': int(d),
+            'modules': int(n),
+            'jours': int(j),
+            'premier_jour': date.fromordinal(int(f)),
+            'dernier_jour': date.fromordinal(int(l)),
+            'etalement_jours': int(l - f + 1),
+            'modules_max_jour': int(m),
+        }
+        for d, n, j, f, l, m in zip(
+            dept[starts], np.diff(np.r_[starts, len(dept)]), np.diff(np.r_[day_groups, len(day_dept)]),
+            first, last, np.maximum.reduceat(per_day, day_groups)
+        )
+    ]
+
+
+def compute_metrics(
+    exams: Dict[str, np.ndarray],
+    enrolments: Tuple[np.ndarray, np.ndarray, np.ndarray],
+    capacities: Dict[int, int],
+    supervisor_ids: np.ndarray,
+    prof_ids: np.ndarray
+) -> Dict:
+    """
+    KPIs d'un plan.
+    exams: tableaux alignés EXAM_FIELDS (une ligne par examen de groupe; day = date.toordinal(),
+    start/end en minutes depuis minuit); enrolments: (étudiant ou cohorte, module, poids);
+    supervisor_ids: un professeur par surveillance; prof_ids: tous les professeurs.
+    """
+    t0 = time.time()
+    exams = {name: np.asarray(exams[name], dtype=np.int64) for name in EXAM_FIELDS}
+    
+    # Un module = un créneau: jour/début du premier examen, fin la plus tardive de ses groupes
+    mod_ids, first, inverse = np.unique(exams['module_id'], return_index=True, return_inverse=True)
+    mod_end = np.zeros(len(mod_ids), dtype=np.int64)
+    np.maximum.at(mod_end, inverse, exams['end'])
+    mod_day, mod_start, mod_dept = exams['day'][first], exams['start'][first], exams['dept_id'][first]
+    
+    days = np.unique(mod_day)
+    return {
+        'examens': int(len(exams['module_id'])),
+        'modules': int(len(mod_ids)),
+        'jours_utilises': int(len(days)),
+        'salles_utilisees': int(len(np.unique(exams['salle_id']))),
+        'salles_total': len(capacities),
+        'etudiants': _student_metrics(mod_ids, mod_day, mod_start, mod_end, enrolments),
+        'salles': _room_metrics(exams, capacities),
+        'surveillants': _supervisor_metrics(np.asarray(supervisor_ids, dtype=np.int64),
+                                            np.asarray(prof_ids, dtype=np.int64)),
+        'departements': _department_metrics(mod_dept, mod_day),
+        'time': round(time.time() - t0, 4),
+    }
+
+
+def metrics_from_scheduler(scheduler) -> Dict:
+    """KPIs du plan en mémoire d'un ExamScheduler (étudiants agrégés en cohortes)"""
+    starts: Dict = {}
+    rows = []
+    supervisor_ids: List[int] = []
+    teams = set()  # cross_module_sharing: une équipe par salle et créneau, comptée une fois
+    for se in scheduler.scheduled_exams:
+        start = starts.get(se.slot)
+        if start is None:
+            start = starts[se.slot] = scheduler._minutes(se.slot.heure_debut)
+        dept_id = scheduler.exams_by_module[se.module_id][0].dept_id
+        rows.append((se.module_id, se.salle_id, se.slot.date.toordinal(), start,
+                     start + se.duree_minutes, se.nb_etudiants, dept_id or 0))
+        if scheduler.cross_module_sharing:
+            if (se.salle_id, se.slot) in teams:
+                continue
+            teams.add((se.salle_id, se.slot))
+        supervisor_ids.extend(se.prof_ids)
+    exams = dict(zip(EXAM_FIELDS, np.array(rows, dtype=np.int64).reshape(-1, len(EXAM_FIELDS)).T))
+    
+    cohort_sizes = np.asarray(scheduler.cohort_sizes, dtype=np.int64)
+    cohorts = list(scheduler.module_cohorts.items())
+    entity = np.concatenate([c for _, c in cohorts]) if cohorts else np.zeros(0, dtype=np.int64)
+    module = np.repeat([m for m, _ in cohorts], [len(c) for _, c in cohorts]).astype(np.int64)
+    weight = cohort_sizes[entity] if len(entity) else np.zeros(0, dtype=np.int64)
+    
+    return compute_metrics(
+        exams, (entity.astype(np.int64), module, weight),
+        {room['id']: room['capacite'] for room in scheduler.rooms},
+        np.array(supervisor_ids, dtype=np.int64),
+        np.array([p['id'] for p in scheduler.professors], dtype=np.int64)
+    )
+
+
+def metrics_from_database(session_id: int) -> Dict:
+    """KPIs du plan enregistré d'une session (une requête par table, calcul en NumPy)"""
+    # Import local: services.optimization importe ce module
+    from services.optimization import ExamScheduler
+    
+    exams = execute_query("""
+        SELECT e.module_id, e.salle_id, e.date_examen, ch.heure_debut, e.duree_minutes,
+               e.nb_etudiants_prevus, f.dept_id
+        FROM examens e
+        JOIN creneaux_horaires ch ON e.creneau_id = ch.id
+        JOIN modules m ON e.module_id = m.id
+        JOIN formations f ON m.formation_id = f.id
+        WHERE e.session_id = %s
+    """, (session_id,)) or []
+    supervisions = execute_query("""
+        SELECT sv.professeur_id FROM surveillances sv
+        JOIN examens e ON sv.examen_id = e.id
+        WHERE e.session_id = %s
+    """, (session_id,)) or []
+    enrolments = execute_query("""
+        SELECT DISTINCT etudiant_id, module_id FROM inscriptions
+        WHERE module_id IN (SELECT DISTINCT module_id FROM examens WHERE session_id = %s)
+    """, (session_id,)) or []
+    rooms = execute_query("SELECT id, capacite FROM lieu_examen WHERE disponible = TRUE") or []
+    profs = execute_query("SELECT id FROM professeurs") or []
+    
+    starts: Dict = {}
+    rows = []
+    for e in exams:
+        start = starts.get(e['heure_debut'])
+        if start is None:
+            start = starts[e['heure_debut']] = ExamScheduler._minutes(e['heure_debut'])
+        rows.append((e['module_id'], e['salle_id'], e['date_examen'].toordinal(), start,
+                     start + (e['duree_minutes'] or 90), e['nb_etudiants_prevus'] or 0, e['dept_id'] or 0))
+    exam_arrays = dict(zip(EXAM_FIELDS, np.array(rows, dtype=np.int64).reshape(-1, len(EXAM_FIELDS)).T))
+    
+    pairs = np.array([(r['etudiant_id'], r['module_id']) for r in enrolments], dtype=np.int64).reshape(-1, 2)
+    return compute_metrics(
+        exam_arrays, (pairs[:, 0], pairs[:, 1], np.ones(len(pairs), dtype=np.int64)),
+        {r['id']: r['capacite'] for r in rooms},
+        np.array([r['professeur_id'] for r in supervisions], dtype=np.int64),
+        np.array([p['id'] for p in profs], dtype=np.int64)
+    )
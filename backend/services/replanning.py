@@ -0,0 +1,420 @@
+"""
+Re-planification incrémentale sur événement (semaine d'examens)
+- Salle fermée:        replan_on_room_unavailable(salle_id, dates)
+- Professeur absent:   replan_on_professor_absent(prof_id, dates)
+- Module ajouté:       add_module(module_id)
+Seul le voisinage touché est chargé (inscriptions des étudiants concernés, groupes et
+placements de leurs modules, occupation des salles et surveillants sur les seules dates
+examinées) et réparé à partir du plan enregistré; la base ne reçoit que le diff (pas de
+suppression globale) et un conflit PLANIFICATION_IMPOSSIBLE par module non replacé.
+"""
+import sys
+import os
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from datetime import date
+from typing import List, Dict, Tuple, Optional, Set, Iterable
+from collections import defaultdict
+import time
+
+from database import execute_query, get_cursor
+from services.optimization import ExamScheduler, ExamSlot, GroupExam
+
+
+class ExamReplanner(ExamScheduler):
+    """
+    Répare le plan enregistré d'une session après un événement.
+    Ordre de préférence pour chaque module touché:
+    1. même créneau, mêmes salles: seuls les surveillants indisponibles sont remplacés
+    2. même créneau, autre salle (les étudiants ne voient aucun changement d'horaire)
+    3. re-placement complet sur le premier créneau valide
+    """
+    
+    def __init__(self, session_id: int, config: Dict = None, session_info: Dict = None):
+        super().__init__(session_id, config, session_info)
+        self.defer_supervisors = False  # réparation locale: surveillants cherchés directement
+        self.blocked_rooms: Dict[int, Optional[Set[date]]] = {}
+        self.blocked_profs: Dict[int, Optional[Set[date]]] = {}
+        
+        # Diff à persister
+        self.room_updates: List[Tuple[int, int]] = []            # (salle_id, examen_id)
+        self.supervisors_removed: List[Tuple[int, int]] = []     # (examen_id, professeur_id)
+        self.supervisors_added: List[Tuple[int, int]] = []       # (examen_id, professeur_id)
+        self.replaced_modules: Set[int] = set()
+        
+        # Occupation chargée à la demande (modules hors voisinage)
+        self.replayed_modules: Set[int] = set()
+        self.loaded_dates: Set[date] = set()
+    
+    # Chargement du voisinage
+    
+    def _load_static(self):
+        """Ressources seulement (examens, inscriptions et plan chargés par voisinage)"""
+        self._load_departments()
+        self._load_rooms()
+        self._load_professors()
+        self._generate_slots()
+        self._load_unavailabilities()
+    
+    def _affected_modules(self, query: str, params: Tuple, dates: Optional[Set[date]]) -> Set[int]:
+        """Modules du plan enregistré touchés par un événement (requête ciblée, sans charger le plan)"""
+        if dates is not None:
+            if not dates:
+                return set()
+            query += f" AND e.date_examen IN ({','.join(['%s'] * len(dates))})"
+            params += tuple(sorted(dates))
+        return {row['module_id'] for row in execute_query(query, params) or []}
+    
+    def _load_neighbourhood(self, module_ids: Set[int]):
+        """
+        Inscriptions des seuls étudiants des modules touchés, puis groupes et placements
+        enregistrés des modules qu'ils suivent (les seuls à contraindre leurs horaires)
+        """
+        self.inscriptions_by_module = defaultdict(list)
+        self.student_cohort = {}
+        self.cohort_sizes = []
+        self.cohorts_by_module = defaultdict(list)
+        self._preload_inscriptions(module_ids)
+        
+        neighbours = set(self.inscriptions_by_module) | set(module_ids)
+        self.exams_by_module = defaultdict(list)
+        self._load_exams_by_group(neighbours)
+        self.existing_plan = self._load_existing_plan(neighbours)
+        self.replayed_modules = {m for m in self.existing_plan if m in self.exams_by_module}
+        
+        self._build_conflict_graph()
+        self._reset_plan_state()
+        self.loaded_dates = set()
+        self._load_supervision_totals()
+    
+    def _excluded_modules(self) -> Tuple[str, Tuple]:
+        """Filtre SQL écartant les modules rejoués (leur occupation vient du rejeu)"""
+        if not self.replayed_modules:
+            return "", ()
+        placeholders = ','.join(['%s'] * len(self.replayed_modules))
+        return f"AND e.module_id NOT IN ({placeholders})", tuple(sorted(self.replayed_modules))
+    
+    def _load_supervision_totals(self):
+        """Charges totales des surveillants hors voisinage (une ligne agrégée par professeur)"""
+        module_filter, params = self._excluded_modules()
+        for row in execute_query(f"""
+            SELECT sv.professeur_id, COUNT(*) AS nb
+            FROM surveillances sv
+            JOIN examens e ON sv.examen_id = e.id
+            WHERE e.session_id = %s {module_filter}
+            GROUP BY sv.professeur_id
+        """, (self.session_id,) + params) or []:
+            self.prof_total_supervisions[row['professeur_id']] = row['nb']
+        self._rebuild_prof_heaps()
+    
+    def _load_occupancy(self, dates: Iterable[date]):
+        """
+        Occupation des salles et surveillants par les modules hors voisinage, chargée à la
+        demande pour les seules dates examinées (une requête par lot de nouvelles dates)
+        """
+        dates = sorted(set(dates) - self.loaded_dates)
+        if not dates:
+            return
+        self.loaded_dates.update(dates)
+        
+        module_filter, excluded = self._excluded_modules()
+        date_filter = ','.join(['%s'] * len(dates))
+        params = (self.session_id, *dates) + excluded
+        rows = execute_query(f"""
+            SELECT e.id, e.module_id, e.salle_id, e.date_examen, e.creneau_id, e.duree_minutes
+            FROM examens e
+            WHERE e.session_id = %s AND e.date_examen IN ({date_filter}) {module_filter}
+        """, params) or []
+        
+        supervisors = defaultdict(list)
+        for row in execute_query(f"""
+            SELECT sv.examen_id, sv.professeur_id
+            FROM surveillances sv
+            JOIN examens e ON sv.examen_id = e.id
+            WHERE e.session_id = %s AND e.date_examen IN ({date_filter}) {module_filter}
+        """, params) or []:
+            supervisors[row['examen_id']].append(row['professeur_id'])
+        
+        slots_by_key = {(slot.date, slot.creneau_id): slot for slot in self.slots}
+        touched = set()
+        for row in rows:
+            slot = slots_by_key.get((row['date_examen'], row['creneau_id']))
+            if slot is None:
+                continue
+            span = self._span(slot, row['duree_minutes']) or (slot,)
+            self._occupy_room(row['salle_id'], slot, row['module_id'], span)
+            shared = self.room_sharing.get((row['salle_id'], slot))
+            if shared is not None:
+                # Places restantes inconnues: la salle n'accueille plus d'autre module
+                self._unindex_shared(self.slot_shared_index.get(slot, []), shared['residual'], row['salle_id'])
+                shared['residual'] = 0
+            for prof_id in supervisors[row['id']]:
+                self._mark_prof_busy(prof_id, slot, span)
+                self.prof_daily_count[prof_id][slot.date] += 1  # une fois par surveillance enregistrée
+                touched.add((prof_id, slot.date))
+        for prof_id, day in touched:
+            self._update_day_full(prof_id, day)
+    
+    def _find_rooms_and_supervisors(
+        self,
+        group_exams: List[GroupExam],
+        slot: ExamSlot
+    ) -> Optional[List[Tuple[GroupExam, Dict, List[int]]]]:
+        """Charge l'occupation du jour du créneau avant la recherche de base"""
+        self._load_occupancy((slot.date,))
+        return super()._find_rooms_and_supervisors(group_exams, slot)
+    
+    def _block_resources(self):
+        """Marque salles et surveillants indisponibles sur les créneaux des dates visées"""
+        for slot in self.slots:
+            for salle_id, dates in self.blocked_rooms.items():
+                if dates is None or slot.date in dates:
+                    self._occupy_room(salle_id, slot, -1)
+            for prof_id, dates in self.blocked_profs.items():
+                if dates is None or slot.date in dates:
+                    self._mark_prof_busy(prof_id, slot)
+    
+    def _restore(self, module_ids: Set[int]) -> Set[int]:
+        """
+        Rejoue le plan enregistré du voisinage - retourne les modules dont le placement n'est
+        plus valide. L'occupation des autres modules n'est chargée qu'ensuite, par date, quand
+        une réparation examine un créneau (le plan enregistré est cohérent avec elle).
+        """
+        self._load_neighbourhood(module_ids)
+        self._block_resources()
+        
+        slots_by_key = {(slot.date, slot.creneau_id): slot for slot in self.slots}
+        rooms_by_id = {room['id']: room for room in self.rooms}
+        prof_ids = {prof['id'] for prof in self.professors}
+        
+        failed = set()
+        self.kept_modules = set()
+        for module_id, _ in self._sorted_modules(self.replayed_modules):
+            restored = self._existing_assignments(
+                module_id, self.existing_plan[module_id], slots_by_key, rooms_by_id, prof_ids
+            )
+            if restored:
+                self._commit_assignments(module_id, restored[1], restored[0])
+                self.kept_modules.add(module_id)
+            else:
+                failed.add(module_id)
+        return failed
+    
+    # Réparation
+    
+    def _repair_in_slot(self, module_id: int, rows: List[Dict]) -> bool:
+        """Garde le créneau: remplace seulement les salles et surveillants devenus indisponibles"""
+        group_exams = self.exams_by_module[module_id]
+        slot = next((s for s in self.slots
+                     if s.date == rows[0]['date_examen'] and s.creneau_id == rows[0]['creneau_id']), None)
+        if slot is None or slot not in self._get_slots_for_dept(group_exams[0].dept_id, module_id):
+            return False
+        self._load_occupancy((slot.date,))
+        rows_by_group = {row['groupe']: row for row in rows}
+        if set(rows_by_group) != {g.groupe for g in group_exams}:
+            return False
+        if not self._check_student_availability(module_id, slot):
+            return False
+        span = self._span(slot, self._module_duration(group_exams))
+        if span is None:
+            return False
+        
+        dept_id = group_exams[0].dept_id
+        rooms_by_id = {room['id']: room for room in self.rooms}
+        prof_ids = {prof['id'] for prof in self.professors}
+        max_per_day = self.config.get('max_supervisions_per_prof_per_day', 3)
+        
+        # Groupes regroupés par salle enregistrée (plus gros effectifs d'abord)
+        by_room = defaultdict(list)
+        for group in group_exams:
+            by_room[rows_by_group[group.groupe]['salle_id']].append(group)
+        
+        plan = []
+        used_rooms, used_profs = set(), set()
+        for salle_id, groups in sorted(by_room.items(), key=lambda kv: -sum(g.nb_etudiants for g in kv[1])):
+            seats = sum(g.nb_etudiants for g in groups)
+            room = rooms_by_id.get(salle_id)
+            if room is None or self._room_busy(salle_id, span) or room['capacite'] < seats:
+                # Plus petite salle libre suffisante (salles triées par capacité décroissante)
+                room = next((r for r in reversed(self.rooms)
+                             if r['id'] not in used_rooms and not self._room_busy(r['id'], span)
+                             and r['capacite'] >= seats), None)
+                if room is None:
+                    return False
+            used_rooms.add(room['id'])
+            
+            old_profs = rows_by_group[groups[0].groupe]['prof_ids']
+            profs = [
+                p for p in old_profs
+                if p in prof_ids and p not in used_profs and self._is_prof_available_for_slot(p, slot, span)
+                and self.prof_daily_count[p][slot.date] < max_per_day
+            ]
+            target = max(len(old_profs), 1) if room['id'] == salle_id else self._get_required_supervisors(room)
+            if len(profs) < target:
+                profs += self._find_supervisors(dept_id, slot, target - len(profs), used_profs | set(profs), span)
+            if not profs:
+                return False
+            used_profs.update(profs)
+            plan.append((groups, room, profs))
+        
+        self._commit_assignments(module_id, [(g, room, profs) for groups, room, profs in plan for g in groups], slot)
+        
+        for groups, room, profs in plan:
+            for group in groups:
+                row = rows_by_group[group.groupe]
+                if room['id'] != row['salle_id']:
+                    self.room_updates.append((room['id'], row['id']))
+                self.supervisors_removed += [(row['id'], p) for p in row['prof_ids'] if p not in profs]
+                self.supervisors_added += [(row['id'], p) for p in profs if p not in row['prof_ids']]
+        return True
+    
+    def _replan(self, module_ids: Set[int], event: str) -> Dict:
+        """Charge le voisinage, répare les modules touchés et persiste le diff"""
+        start = time.time()
+        print(f"\n🔁 Re-planification: {event} ({len(module_ids)} module(s) touché(s))")
+        
+        failed = self._restore(module_ids)
+        if not failed <= module_ids:
+            # Autres placements invalidés (données modifiées): élargir le voisinage
+            module_ids = module_ids | failed
+            failed = self._restore(module_ids)
+        
+        to_repair = failed | {m for m in module_ids if m in self.exams_by_module and m not in self.existing_plan}
+        repaired_in_slot, unscheduled = set(), []
+        for module_id, group_exams in self._sorted_modules(to_repair):
+            if module_id in self.existing_plan and self._repair_in_slot(module_id, self.existing_plan[module_id]):
+                repaired_in_slot.add(module_id)
+            elif self._place_module(module_id, group_exams):
+                self.replaced_modules.add(module_id)
+            else:
+                unscheduled.append(module_id)
+                self.replaced_modules.add(module_id)  # lignes devenues invalides supprimées
+                self._record_unscheduled(module_id, group_exams)
+        
+        diff = self._persist_diff(to_repair)
+        result = {
+            'success': True,
+            'event': event,
+            'affected_modules': len(to_repair),
+            'repaired_in_slot': len(repaired_in_slot),
+            'moved_modules': len(self.replaced_modules) - len(unscheduled),
+            'unscheduled_modules': unscheduled,
+            'unscheduled_diagnostics': self.unscheduled_diagnostics(),
+            **diff,
+            'execution_time': time.time() - start,
+        }
+        print(f"✅ {result['repaired_in_slot']} réparé(s) sur place, {result['moved_modules']} déplacé(s), "
+              f"{len(unscheduled)} non planifié(s) en {result['execution_time']:.2f}s")
+        return result
+    
+    def _persist_diff(self, repaired: Set[int]) -> Dict:
+        """
+        Écrit uniquement les lignes modifiées (salles, surveillants, modules déplacés) et
+        remplace les conflits PLANIFICATION_IMPOSSIBLE des modules réparés
+        """
+        deleted_ids = [row['id'] for m in self.replaced_modules for row in self.existing_plan.get(m, [])]
+        new_exams = [se for m in self.replaced_modules if m in self.placements for se in self.placements[m].exams]
+        
+        with get_cursor() as cursor:
+            if deleted_ids:
+                placeholders = ','.join(['%s'] * len(deleted_ids))
+                cursor.execute(f"DELETE FROM surveillances WHERE examen_id IN ({placeholders})", deleted_ids)
+                cursor.execute(f"DELETE FROM examens WHERE id IN ({placeholders})", deleted_ids)
+            if self.room_updates:
+                cursor.executemany("UPDATE examens SET salle_id = %s WHERE id = %s", self.room_updates)
+            if self.supervisors_removed:
+                cursor.executemany(
+                    "DELETE FROM surveillances WHERE examen_id = %s AND professeur_id = %s",
+                    self.supervisors_removed
+                )
+            if self.supervisors_added:
+                cursor.executemany(
+                    "INSERT INTO surveillances (examen_id, professeur_id, role) VALUES (%s, %s, 'SURVEILLANT')",
+                    self.supervisors_added
+                )
+            written = self._saved_teams(self.kept_modules)
+            for se in new_exams:
+                self._insert_exam(cursor, se, written)
+            self._insert_orphan_teams(cursor, self.kept_modules, written)
+            
+            if repaired:
+                placeholders = ','.join(['%s'] * len(repaired))
+                cursor.execute(f"""
+                    DELETE FROM conflits
+                    WHERE session_id = %s AND type_conflit = 'PLANIFICATION_IMPOSSIBLE'
+                      AND examen1_id IN ({placeholders})
+                """, (self.session_id, *sorted(repaired)))
+            for conflict in self.conflicts:
+                cursor.execute("""
+                    INSERT INTO conflits (session_id, examen1_id, examen2_id, type_conflit, description, severite)
+                    VALUES (%s, %s, %s, %s, %s, %s)
+                """, (
+                    self.session_id,
+                    conflict.examen1_id, conflict.examen2_id,
+                    conflict.type, conflict.description, conflict.severite
+                ))
+        
+        return {
+            'rows_deleted': len(deleted_ids),
+            'rows_inserted': len(new_exams),
+            'rows_room_changed': len(self.room_updates),
+            'supervisions_changed': len(self.supervisors_removed) + len(self.supervisors_added),
+            'conflicts_recorded': len(self.conflicts),
+        }
+    
+    # Événements
+    
+    @staticmethod
+    def _as_dates(dates: Iterable = None) -> Optional[Set[date]]:
+        if dates is None:
+            return None
+        return {date.fromisoformat(d) if isinstance(d, str) else d for d in dates}
+    
+    def replan_on_room_unavailable(self, salle_id: int, dates: Iterable = None) -> Dict:
+        """Salle fermée (toute la session si dates=None)"""
+        dates = self._as_dates(dates)
+        self._load_static()
+        self.blocked_rooms[salle_id] = dates
+        affected = self._affected_modules("""
+            SELECT DISTINCT e.module_id FROM examens e
+            WHERE e.session_id = %s AND e.salle_id = %s
+        """, (self.session_id, salle_id), dates)
+        return self._replan(affected, f"salle {salle_id} indisponible")
+    
+    def replan_on_professor_absent(self, prof_id: int, dates: Iterable = None) -> Dict:
+        """Professeur absent (toute la session si dates=None)"""
+        dates = self._as_dates(dates)
+        self._load_static()
+        self.blocked_profs[prof_id] = dates
+        affected = self._affected_modules("""
+            SELECT DISTINCT e.module_id FROM examens e
+            JOIN surveillances sv ON sv.examen_id = e.id
+            WHERE e.session_id = %s AND sv.professeur_id = %s
+        """, (self.session_id, prof_id), dates)
+        return self._replan(affected, f"professeur {prof_id} absent")
+    
+    def add_module(self, module_id: int) -> Dict:
+        """Module ajouté à la session (nouvelle épreuve ou nouveaux inscrits)"""
+        self._load_static()
+        return self._replan({module_id}, f"ajout du module {module_id}")
+
+
+def _run_event(session_id: int, config: Dict, action) -> Dict:
+    try:
+        return action(ExamReplanner(session_id, config))
+    except Exception as e:
+        import traceback
+        traceback.print_exc()
+        return {'success': False, 'error': str(e)}
+
+
+def replan_on_room_unavailable(session_id: int, salle_id: int, dates: Iterable = None, config: Dict = None) -> Dict:
+    return _run_event(session_id, config, lambda r: r.replan_on_room_unavailable(salle_id, dates))
+
+
+def replan_on_professor_absent(session_id: int, prof_id: int, dates: Iterable = None, config: Dict = None) -> Dict:
+    return _run_event(session_id, config, lambda r: r.replan_on_professor_absent(prof_id, dates))
+
+
+def add_module(session_id: int, module_id: int, config: Dict = None) -> Dict:
+    return _run_event(session_id, config, lambda r: r.add_module(module_id))
@@ -0,0 +1,411 @@
+"""
+Affectation globale des surveillants (phase 2 du mode deux phases)
+- Phase 1: le glouton place examens et salles sans chercher de surveillants; il vérifie
+  seulement la capacité agrégée (professeurs disponibles par créneau, surveillances par jour,
+  ExamScheduler._check_supervisor_capacity)
+- Phase 2: toutes les surveillances sont affectées d'un coup par un flot de coût minimal
+  résolu en programme linéaire (scipy.optimize.linprog / HiGHS - matrice de réseau,
+  solution entière), puis affiné par échanges (une salle regroupant n groupes compte
+  n surveillances, une seule si elle est partagée entre modules, dans la charge comme dans
+  la limite journalière, comme prof_total_supervisions et prof_daily_count)
+- Flot infaisable (la capacité agrégée n'est qu'une condition nécessaire): repli sur la
+  recherche gloutonne des surveillants (ExamScheduler._staff_greedily)
+"""
+import time
+from collections import defaultdict
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+from scipy import sparse
+from scipy.optimize import linprog
+
+
+def gini(values) -> float:
+    """Coefficient de Gini (0 = charges parfaitement égales)"""
+    x = np.sort(np.asarray(values, dtype=float))
+    n = len(x)
+    if n == 0 or x.sum() == 0:
+        return 0.0
+    return float(2 * np.sum(np.arange(1, n + 1) * x) / (n * x.sum()) - (n + 1) / n)
+
+
+class SupervisorFlow:
+    """
+    Réseau: source → prof (arcs unitaires de coût 2k+1: Σ charge² convexe = variance)
+            → (prof, jour) [≤ max_supervisions_per_prof_per_day]
+            → (prof, créneau) [≤ 1, sur chaque créneau couvert par un examen long;
+              0 si le prof est déclaré indisponible]
+            → (créneau, département) [petit coût si prof d'un autre département]
+            → puits: 1er surveillant de chaque salle (prioritaire) puis surveillants
+              supplémentaires jusqu'à _get_required_supervisors(salle)
+    Les nœuds intermédiaires sont exprimés par des contraintes de capacité agrégées.
+    Une salle de n groupes compte n surveillances par jour (prof_daily_count; une seule avec
+    cross_module_sharing, voir ExamScheduler._room_supervisions): le flot
+    (unitaire, pour rester un réseau à solution entière) est désagrégé puis réparé, et
+    rejeté si la limite journalière pondérée reste dépassée.
+    Un plan dont les équipes sont déjà choisies (hors mode différé) n'est remplacé que si
+    l'équilibre (Gini) ne se dégrade pas.
+    """
+    
+    def __init__(self, scheduler, config: Dict = None):
+        self.scheduler = scheduler
+        self.config = config or {}
+        self.dept_priority = self.config.get('dept_priority', True)
+        self.stats: Dict = {'status': None, 'solve_time': 0.0, 'variables': 0, 'swaps': 0, 'rounds': 0}
+    
+    def _loads(self) -> np.ndarray:
+        scheduler = self.scheduler
+        return np.array([scheduler.prof_total_supervisions.get(p['id'], 0) for p in scheduler.professors], dtype=float)
+    
+    def load_stats(self, suffix: str) -> Dict:
+        """Gini, variance et total des surveillances du plan courant (clés suffixées)"""
+        loads = self._loads()
+        return {
+            f'gini_{suffix}': round(gini(loads), 4),
+            f'variance_{suffix}': round(float(np.var(loads)), 2) if len(loads) else 0.0,
+            f'supervisions_{suffix}': int(loads.sum()),
+        }
+    
+    def _supervised_rooms(self) -> Dict[Tuple, List[Dict]]:
+        """
+        Salles occupées regroupées par (créneau, département du premier examen de la salle,
+        créneaux couverts par l'examen le plus long de la salle).
+        Une salle partagée entre modules garde une seule équipe pour tous ses groupes.
+        """
+        scheduler = self.scheduler
+        by_room = {}
+        for module_id, placement in scheduler.placements.items():
+            group_exams = scheduler.exams_by_module[module_id]
+            dept_id = group_exams[0].dept_id
+            span = scheduler._span(placement.slot, scheduler._module_duration(group_exams)) or (placement.slot,)
+            for group, room, _ in placement.assignments:
+                key = (placement.slot, room['id'])
+                if key not in by_room:
+                    by_room[key] = {
+                        'dept_id': dept_id,
+                        'room': room,
+                        'required': max(scheduler._get_required_supervisors(room), 1),
+                        'groups': [],
+                        'span': span,
+                    }
+                elif len(span) > len(by_room[key]['span']):
+                    by_room[key]['span'] = span
+                by_room[key]['groups'].append((module_id, group))
+        groups = defaultdict(list)
+        for (slot, _), room in by_room.items():
+            groups[(slot, room['dept_id'], room['span'])].append(room)
+        return groups
+    
+    def _solve_flow(self, room_groups: Dict[Tuple, List[Dict]], keys: List[Tuple],
+                    key_slots: List[np.ndarray], key_day: np.ndarray, n_slots: int, n_days: int,
+                    unavailable: np.ndarray, day_capacity: np.ndarray) -> Optional[np.ndarray]:
+        """
+        Résout le flot - retourne la matrice booléenne (prof, clé) ou None.
+        day_capacity: salles autorisées par (prof, jour) (limite journalière, abaissée là où
+        des salles de plusieurs groupes la font dépasser)
+        """
+        professors = self.scheduler.professors
+        n_profs, n_keys = len(professors), len(keys)
+        limit = self.scheduler._daily_supervision_limit()
+        k_max = max(min(n_days * limit, n_slots), 1)
+        
+        # Poids: 1er surveillant >> surveillant supplémentaire >> équilibrage > département
+        # (coût marginal de charge 2·(2k+1): la préférence de département ne sert qu'à départager)
+        w_dept = 1
+        w_extra = 2 * (2 * (2 * k_max + 1) + w_dept)
+        w_first = 10 * w_extra
+        
+        # Variables: w[p, g] | y[p, k] | f1[g] | f2[g]
+        n_w = n_profs * n_keys
+        n_y = n_profs * k_max
+        off_y, off_f1, off_f2 = n_w, n_w + n_y, n_w + n_y + n_keys
+        n_vars = off_f2 + n_keys
+        self.stats['variables'] = n_vars
+        
+        prof_dept = np.array([p.get('dept_id') or -1 for p in professors])
+        key_dept = np.array([dept for _, dept, _ in keys])
+        first = np.array([len(room_groups[k]) for k in keys], dtype=float)
+        extra = np.array([sum(r['required'] - 1 for r in room_groups[k]) for k in keys], dtype=float)
+        
+        c = np.zeros(n_vars)
+        if self.dept_priority:
+            c[:n_w] = w_dept * (prof_dept[:, None] != key_dept[None, :]).ravel()
+        c[off_y:off_f1] = np.tile(2 * (2 * np.arange(k_max) + 1), n_profs)
+        c[off_f1:off_f2] = -w_first
+        c[off_f2:] = -w_extra
+        
+        p_idx = np.repeat(np.arange(n_profs), n_keys)
+        g_idx = np.tile(np.arange(n_keys), n_profs)
+        w_cols = np.arange(n_w)
+        blocks, rhs = [], []
+        
+        # (prof, créneau) ≤ 1 sur chaque créneau couvert (0 si indisponible)
+        cover_key = np.concatenate([np.full(len(covered), g) for g, covered in enumerate(key_slots)])
+        cover_slot = np.concatenate(key_slots)
+        prof_col = np.arange(n_profs)[:, None]
+        rows = (prof_col * n_slots + cover_slot[None, :]).ravel()
+        cols = (prof_col * n_keys + cover_key[None, :]).ravel()
+        blocks.append(sparse.csr_matrix((np.ones(len(rows)), (rows, cols)), shape=(n_profs * n_slots, n_vars)))
+        rhs.append(1.0 - unavailable.ravel())
+        # (prof, jour) ≤ capacité journalière en salles (coefficients unitaires: seul le second
+        # membre est abaissé, la matrice reste un réseau)
+        rows = p_idx * n_days + key_day[g_idx]
+        blocks.append(sparse.csr_matrix((np.ones(n_w), (rows, w_cols)), shape=(n_profs * n_days, n_vars)))
+        rhs.append(day_capacity.ravel().astype(float))
+        # Conservation prof: Σ_g w[p, g] - Σ_k y[p, k] ≤ 0
+        y_cols = np.arange(off_y, off_f1)
+        blocks.append(sparse.csr_matrix((
+            np.concatenate([np.ones(n_w), -np.ones(n_y)]),
+            (np.concatenate([p_idx, np.repeat(np.arange(n_profs), k_max)]), np.concatenate([w_cols, y_cols]))
+        ), shape=(n_profs, n_vars)))
+        rhs.append(np.zeros(n_profs))
+        # Conservation (créneau, département): f1 + f2 - Σ_p w[p, g] ≤ 0
+        key_cols = np.arange(n_keys)
+        blocks.append(sparse.csr_matrix((
+            np.concatenate([-np.ones(n_w), np.ones(2 * n_keys)]),
+            (np.concatenate([g_idx, key_cols, key_cols]), np.concatenate([w_cols, off_f1 + key_cols, off_f2 + key_cols]))
+        ), shape=(n_keys, n_vars)))
+        rhs.append(np.zeros(n_keys))
+        
+        bounds = np.zeros((n_vars, 2))
+        bounds[:off_f1, 1] = 1
+        bounds[off_f1:off_f2, 1] = first
+        bounds[off_f2:, 1] = extra
+        
+        # Résolution bornée par l'échéance de la génération
+        options = {}
+        if self.scheduler.deadline:
+            options['time_limit'] = self.scheduler.deadline - time.time()
+            if options['time_limit'] <= 0:
+                self.stats['status'] = 'deadline'
+                return None
+        start = time.time()
+        result = linprog(c, A_ub=sparse.vstack(blocks).tocsr(), b_ub=np.concatenate(rhs), bounds=bounds,
+                         method='highs', options=options)
+        self.stats['solve_time'] = round(self.stats['solve_time'] + time.time() - start, 2)
+        
+        if result.status != 0 or result.x is None:
+            self.stats['status'] = 'failed'
+            return None
+        x = result.x
+        if np.abs(x - np.round(x)).max() > 1e-6:
+            self.stats['status'] = 'fractional'
+            return None
+        if np.any(np.round(x[off_f1:off_f2]) < first):
+            self.stats['status'] = 'uncovered'
+            return None
+        return np.round(x[:n_w]).reshape(n_profs, n_keys) > 0.5
+    
+    def _disaggregate(self, chosen: np.ndarray, room_groups: Dict[Tuple, List[Dict]], keys: List[Tuple],
+                      key_slots: List[np.ndarray], key_day: np.ndarray, unavailable: np.ndarray,
+                      n_days: int) -> Tuple:
+        """Désagrégation: 1 surveillant par salle puis compléments jusqu'au nombre requis"""
+        n_profs = len(self.scheduler.professors)
+        entries = []
+        loads = np.zeros(n_profs)
+        busy = unavailable > 0
+        day_count = np.zeros((n_profs, n_days), dtype=np.int32)
+        for g, (_, dept_id, _) in enumerate(keys):
+            # Salles de plusieurs groupes d'abord, confiées aux profs les moins chargés ce jour-là
+            profs = sorted(np.flatnonzero(chosen[:, g]), key=lambda p: day_count[p, key_day[g]])
+            rooms = sorted(room_groups[keys[g]], key=lambda r: (-len(r['groups']), -r['required']))
+            rest = profs[len(rooms):]
+            for i, room in enumerate(rooms):
+                team = profs[i:i + 1]
+                while rest and len(team) < room['required']:
+                    team.append(rest.pop(0))
+                weight = self.scheduler._room_supervisions(len(room['groups']))
+                entries.append({'slots': key_slots[g], 'day': key_day[g], 'dept': dept_id,
+                                'weight': weight, 'room': room, 'team': team})
+                for p in team:
+                    loads[p] += weight
+                    busy[p, key_slots[g]] = True
+                    day_count[p, key_day[g]] += weight
+        return entries, loads, busy, day_count
+    
+    def _repair_daily_limit(self, entries: List[Dict], loads: np.ndarray, busy: np.ndarray,
+                            day_count: np.ndarray, drop_extras: bool) -> bool:
+        """
+        Limite journalière pondérée (une salle de n groupes compte n): les dépassements sont
+        réparés en remplaçant les surveillants supplémentaires (retirés seulement si drop_extras:
+        dernier tour), puis en confiant des salles du jour à des profs libres qui restent
+        sous la limite. False si un dépassement subsiste.
+        """
+        limit = self.scheduler._daily_supervision_limit()
+        
+        def move(entry, i, q):
+            p, s, d, v = entry['team'][i], entry['slots'], entry['day'], entry['weight']
+            busy[p, s] = False
+            day_count[p, d] -= v
+            loads[p] -= v
+            if q is None:
+                del entry['team'][i]
+                return
+            busy[q, s] = True
+            day_count[q, d] += v
+            loads[q] += v
+            entry['team'][i] = q
+        
+        def candidate(entry):
+            s, d, v = entry['slots'], entry['day'], entry['weight']
+            free = ~busy[:, s].any(axis=1) & (day_count[:, d] + v <= limit)
+            return int(np.argmin(np.where(free, loads, np.inf))) if free.any() else None
+        
+        # Surveillants supplémentaires: remplacés, sinon retirés au dernier tour (au moins 1
+        # par salle suffit; avant, la capacité du (prof, jour) est abaissée et le flot relancé)
+        for entry in entries:
+            for i in range(len(entry['team']) - 1, 0, -1):
+                if day_count[entry['team'][i], entry['day']] > limit:
+                    q = candidate(entry)
+                    if q is not None or drop_extras:
+                        move(entry, i, q)
+        
+        # Premiers surveillants: salles du jour confiées à d'autres profs jusqu'à la limite,
+        # sinon échange avec le surveillant d'une salle plus légère sur les mêmes créneaux
+        by_day = defaultdict(list)
+        for entry in sorted(entries, key=lambda e: -e['weight']):
+            by_day[entry['day']].append(entry)
+        for p, d in zip(*np.nonzero(day_count > limit)):
+            for entry in by_day[d]:
+                if day_count[p, d] <= limit:
+                    break
+                if entry['team'][0] != p:
+                    continue
+                q = candidate(entry)
+                if q is not None:
+                    move(entry, 0, q)
+                    continue
+                self._swap_lighter(entry, by_day[d], loads, day_count, limit)
+        return not (day_count > limit).any()
+    
+    @staticmethod
+    def _swap_lighter(entry: Dict, day_entries: List[Dict], loads: np.ndarray, day_count: np.ndarray, limit: int):
+        """Échange le 1er surveillant d'une salle avec celui d'une salle plus légère aux mêmes créneaux"""
+        p, d, v = entry['team'][0], entry['day'], entry['weight']
+        for other in day_entries:
+            w = other['weight']
+            if w >= v or not np.array_equal(other['slots'], entry['slots']):
+                continue
+            for j, q in enumerate(other['team']):
+                if q in entry['team'] or day_count[q, d] + v - w > limit:
+                    continue
+                entry['team'][0], other['team'][j] = q, p
+                day_count[p, d] += w - v
+                day_count[q, d] += v - w
+                loads[p] += w - v
+                loads[q] += v - w
+                return
+    
+    def _rebalance(self, entries: List[Dict], loads: np.ndarray, busy: np.ndarray, day_count: np.ndarray):
+        """
+        Échanges: un surveillant d'une salle de n groupes est remplacé par un prof libre
+        au même créneau dont la charge + n reste inférieure (Σ charge² décroît strictement).
+        """
+        limit = self.scheduler._daily_supervision_limit()
+        prof_dept = np.array([p.get('dept_id') or -1 for p in self.scheduler.professors])
+        max_passes = self.config.get('supervisor_rebalance_passes', 10)
+        
+        for _ in range(max_passes):
+            changed = False
+            for entry in sorted(entries, key=lambda e: -e['weight']):
+                s, d, v = entry['slots'], entry['day'], entry['weight']
+                team = entry['team']
+                for i, p in enumerate(team):
+                    candidates = ~busy[:, s].any(axis=1) & (day_count[:, d] + v <= limit) & (loads + v < loads[p])
+                    if not candidates.any():
+                        continue
+                    score = 2 * loads
+                    if self.dept_priority:
+                        score = score + (prof_dept != entry['dept'])
+                    q = int(np.argmin(np.where(candidates, score, np.inf)))
+                    busy[p, s], busy[q, s] = False, True
+                    day_count[p, d] -= v
+                    day_count[q, d] += v
+                    loads[p] -= v
+                    loads[q] += v
+                    team[i] = q
+                    self.stats['swaps'] += 1
+                    changed = True
+            if not changed:
+                break
+    
+    def run(self) -> Dict:
+        """
+        Affecte les équipes de toutes les salles placées. Statut 'optimal' si le plan a été
+        ré-écrit; sinon plan inchangé (statut d'échec, équipes vides en mode différé).
+        """
+        scheduler = self.scheduler
+        professors = scheduler.professors
+        n_profs = len(professors)
+        # Mode différé: la phase 1 n'a choisi aucun surveillant, rien à comparer ni à conserver
+        deferred = scheduler.defer_supervisors
+        if not deferred:
+            self.stats.update(self.load_stats('before'))
+        
+        room_groups = self._supervised_rooms()
+        keys = list(room_groups)
+        if not keys or not n_profs:
+            self.stats['status'] = 'empty'
+            return self._keep_phase_one()
+        
+        slots = sorted({covered for _, _, span in keys for covered in span}, key=lambda s: (s.date, s.creneau_id))
+        slot_index = {slot: i for i, slot in enumerate(slots)}
+        days = sorted({slot.date for slot in slots})
+        day_index = {day: i for i, day in enumerate(days)}
+        key_slots = [np.array([slot_index[covered] for covered in span]) for _, _, span in keys]
+        key_day = np.array([day_index[slot.date] for slot, _, _ in keys])
+        
+        unavailable = np.array([
+            [bool(scheduler.prof_unavailable.get(p['id'], 0) & scheduler.slot_bit.get(slot, 0)) for slot in slots]
+            for p in professors
+        ], dtype=float).reshape(n_profs, len(slots))
+        
+        # Limite journalière pondérée (une salle de n groupes compte n): flot, désagrégation et
+        # réparation; les (prof, jour) encore en dépassement voient leur capacité abaissée
+        limit = scheduler._daily_supervision_limit()
+        day_capacity = np.full((n_profs, len(days)), limit, dtype=np.int32)
+        rounds = self.config.get('supervisor_flow_rounds', 5)
+        for round_ in range(rounds):
+            self.stats['rounds'] += 1
+            chosen = self._solve_flow(room_groups, keys, key_slots, key_day, len(slots), len(days),
+                                      unavailable, day_capacity)
+            if chosen is None:
+                return self._keep_phase_one()
+            entries, loads, busy, day_count = self._disaggregate(chosen, room_groups, keys, key_slots, key_day,
+                                                                 unavailable, len(days))
+            if self._repair_daily_limit(entries, loads, busy, day_count, drop_extras=round_ == rounds - 1):
+                break
+            over = day_count > limit
+            day_capacity[over] = np.maximum(day_capacity[over] - 1, 0)
+        else:
+            self.stats['status'] = 'daily_limit'
+            return self._keep_phase_one()
+        self._rebalance(entries, loads, busy, day_count)
+        
+        if not deferred and gini(loads) > self.stats['gini_before'] + 1e-9:
+            self.stats['status'] = 'kept_phase_one'
+            return self._keep_phase_one()
+        
+        new_assignments = defaultdict(list)
+        for entry in entries:
+            team = [professors[p]['id'] for p in entry['team']]
+            for module_id, group in entry['room']['groups']:
+                new_assignments[module_id].append((group, entry['room']['room'], team))
+        
+        placements = {m: p.slot for m, p in scheduler.placements.items()}
+        scheduler._reset_plan_state()
+        for module_id, slot in placements.items():
+            scheduler._commit_assignments(module_id, new_assignments[module_id], slot)
+        
+        self.stats['status'] = 'optimal'
+        self.stats.update(self.load_stats('after'))
+        return self.stats
+    
+    def _keep_phase_one(self) -> Dict:
+        """
+        Échec (ou pas de gain) de la phase 2: les surveillants déjà choisis sont conservés.
+        Mode différé: plan inchangé, équipes à compléter par l'appelant (_staff_greedily).
+        """
+        if not self.scheduler.defer_supervisors:
+            self.stats.update(self.load_stats('after'))
+        return self.stats
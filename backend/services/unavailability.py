@@ -0,0 +1,110 @@
+"""
+Calendrier d'indisponibilités des professeurs (absences, congés, missions)
+- Table indisponibilites_professeurs: professeur, période [date_debut, date_fin],
+  créneau optionnel (NULL = journée entière)
+- load_unavailabilities(): périodes qui chevauchent une session (lu par le planificateur)
+- import_unavailabilities(): import en masse (CSV ou lignes) identifié par matricule
+"""
+import sys
+import os
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import csv
+import io
+from datetime import date, datetime
+from typing import List, Dict, Tuple, Iterable
+
+from database import execute_query, execute_many
+
+
+CSV_COLUMNS = ('matricule', 'date_debut', 'date_fin', 'creneau', 'motif')
+
+
+def load_unavailabilities(date_debut: date, date_fin: date) -> List[Dict]:
+    """Indisponibilités qui chevauchent [date_debut, date_fin]"""
+    return execute_query("""
+        SELECT professeur_id, date_debut, date_fin, creneau_id
+        FROM indisponibilites_professeurs
+        WHERE date_debut <= %s AND date_fin >= %s
+    """, (date_fin, date_debut)) or []
+
+
+def _parse_date(value) -> date:
+    if isinstance(value, date):
+        return value
+    value = str(value).strip()
+    for fmt in ('%Y-%m-%d', '%d/%m/%Y'):
+        try:
+            return datetime.strptime(value, fmt).date()
+        except ValueError:
+            continue
+    raise ValueError(f"date invalide '{value}' (AAAA-MM-JJ ou JJ/MM/AAAA)")
+
+
+def parse_csv(content) -> List[Dict]:
+    """
+    Lit un CSV (séparateur ',' ou ';') avec l'en-tête matricule, date_debut,
+    date_fin, creneau, motif - seules matricule et date_debut sont obligatoires.
+    """
+    if isinstance(content, bytes):
+        content = content.decode('utf-8-sig')
+    sample = content[:2048]
+    delimiter = ';' if sample.count(';') > sample.count(',') else ','
+    reader = csv.DictReader(io.StringIO(content), delimiter=delimiter)
+    return [{(k or '').strip().lower(): (v or '').strip() for k, v in row.items()} for row in reader]
+
+
+def import_unavailabilities(rows: Iterable[Dict], replace: bool = False) -> Dict:
+    """
+    Import en masse. Chaque ligne: matricule, date_debut, date_fin (défaut: date_debut),
+    creneau (ordre ou libellé du créneau; vide = journée entière), motif.
+    replace=True supprime d'abord les indisponibilités des professeurs importés.
+    Retourne {'inserted', 'errors': [(n° de ligne, message)]}.
+    """
+    profs = {p['matricule']: p['id'] for p in execute_query("SELECT id, matricule FROM professeurs") or []}
+    creneaux = execute_query("SELECT id, libelle, ordre FROM creneaux_horaires") or []
+    creneau_ids = {}
+    for c in creneaux:
+        creneau_ids[str(c['ordre'])] = c['id']
+        creneau_ids[c['libelle'].strip().lower()] = c['id']
+    
+    values: List[Tuple] = []
+    errors: List[Tuple[int, str]] = []
+    for line, row in enumerate(rows, start=2):  # ligne 1 = en-tête CSV
+        prof_id = profs.get(str(row.get('matricule') or '').strip())
+        if prof_id is None:
+            errors.append((line, f"matricule inconnu '{row.get('matricule')}'"))
+            continue
+        try:
+            start = _parse_date(row.get('date_debut'))
+            end = _parse_date(row.get('date_fin')) if row.get('date_fin') else start
+        except ValueError as e:
+            errors.append((line, str(e)))
+            continue
+        if end < start:
+            errors.append((line, "date_fin antérieure à date_debut"))
+            continue
+        creneau = str(row.get('creneau') or '').strip()
+        creneau_id = None
+        if creneau:
+            creneau_id = creneau_ids.get(creneau.lower())
+            if creneau_id is None:
+                errors.append((line, f"créneau inconnu '{creneau}'"))
+                continue
+        values.append((prof_id, start, end, creneau_id, row.get('motif') or None))
+    
+    if replace and values:
+        prof_ids = sorted({v[0] for v in values})
+        placeholders = ','.join(['%s'] * len(prof_ids))
+        execute_query(
+            f"DELETE FROM indisponibilites_professeurs WHERE professeur_id IN ({placeholders})",
+            tuple(prof_ids), fetch='none'
+        )
+    if values:
+        execute_many("""
+            INSERT INTO indisponibilites_professeurs (professeur_id, date_debut, date_fin, creneau_id, motif)
+            VALUES (%s, %s, %s, %s, %s)
+        """, values)
+    
+    print(f"📅 Indisponibilités importées: {len(values)} ({len(errors)} ligne(s) rejetée(s))")
+    return {'inserted': len(values), 'errors': errors}
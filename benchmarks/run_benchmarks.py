@@ -27,6 +27,70 @@ def benchmark_query(name: str, query: str, params: tuple = None) -> dict:
     }
 
 
+def benchmark_student_occupancy(session_id: int) -> dict:
+    """
+    Compare l'ancien contrôle étudiant (ensembles de dates par étudiant)
+    à la matrice d'occupation numpy (cohorte × jour) sur les données réelles.
+    Rejoue la même séquence de placements (premier jour libre) avec les deux chemins.
+    """
+    scheduler = ExamScheduler(session_id)
+    scheduler._load_data()
+    
+    days = sorted(scheduler.day_index)
+    modules = sorted(
+        scheduler.exams_by_module.items(),
+        key=lambda x: sum(g.nb_etudiants for g in x[1]),
+        reverse=True
+    )
+    max_exams = scheduler.config.get('max_exam_per_student_per_day', 1)
+    
+    # Ancien chemin: Dict[etudiant, Set[date]] + générateur par étudiant
+    student_schedule = {}
+    legacy_days = []
+    start = time.time()
+    for module_id, _ in modules:
+        student_ids = scheduler.inscriptions_by_module.get(module_id, [])
+        chosen = None
+        for day in days:
+            if all(
+                sum(1 for d in student_schedule.get(etudiant_id, set()) if d == day) < max_exams
+                for etudiant_id in student_ids
+            ):
+                chosen = day
+                break
+        legacy_days.append(chosen)
+        if chosen is not None:
+            for etudiant_id in student_ids:
+                student_schedule.setdefault(etudiant_id, set()).add(chosen)
+    legacy_time = time.time() - start
+    
+    # Nouveau chemin: matrice int8 (cohorte × jour) + fancy-indexing
+    day_slots = {}
+    for slot in scheduler.slots:
+        day_slots.setdefault(slot.date, slot)
+    matrix_days = []
+    start = time.time()
+    for module_id, _ in modules:
+        chosen = None
+        for day in days:
+            if scheduler._check_student_availability(module_id, day_slots[day]):
+                chosen = day
+                break
+        matrix_days.append(chosen)
+        if chosen is not None:
+            scheduler._commit_assignments(module_id, [], day_slots[chosen])
+    matrix_time = time.time() - start
+    
+    return {
+        'name': 'Contrôle étudiants (sets vs matrice)',
+        'execution_time_ms': round(matrix_time * 1000, 2),
+        'legacy_time_ms': round(legacy_time * 1000, 2),
+        'speedup': round(legacy_time / max(matrix_time, 1e-9), 1),
+        'decisions_identiques': legacy_days == matrix_days,
+        'modules': len(modules)
+    }
+
+
 def run_benchmarks():
     """Exécute tous les benchmarks"""
     print("\n" + "="*60)
@@ -110,6 +174,18 @@ def run_benchmarks():
     except Exception as e:
         print(f"  ❌ Erreur: {e}")
     
+    # 4. Contrôle de disponibilité étudiants: ancien vs nouveau chemin
+    print("\n📌 Test contrôle étudiants (sets vs matrice numpy)...")
+    
+    try:
+        occ_result = benchmark_student_occupancy(1)
+        results['benchmarks'].append(occ_result)
+        status = "✅" if occ_result['decisions_identiques'] else "⚠️"
+        print(f"  {status} Ancien: {occ_result['legacy_time_ms']}ms → Matrice: {occ_result['execution_time_ms']}ms "
+              f"(x{occ_result['speedup']}, {occ_result['modules']} modules)")
+    except Exception as e:
+        print(f"  ❌ Erreur: {e}")
+    
     # Résumé
     print("\n" + "="*60)
     print("📋 RÉSUMÉ")
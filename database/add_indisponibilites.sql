@@ -0,0 +1,17 @@
+-- Calendrier d'indisponibilités des professeurs
+-- Note: La table est maintenant incluse dans schema.sql
+-- Ce script existe pour ajouter la table aux bases existantes
+
+CREATE TABLE IF NOT EXISTS indisponibilites_professeurs (
+    id INT AUTO_INCREMENT PRIMARY KEY,
+    professeur_id INT NOT NULL,
+    date_debut DATE NOT NULL,
+    date_fin DATE NOT NULL,
+    creneau_id INT NULL,
+    motif VARCHAR(255),
+    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+    FOREIGN KEY (professeur_id) REFERENCES professeurs(id) ON DELETE CASCADE,
+    FOREIGN KEY (creneau_id) REFERENCES creneaux_horaires(id) ON DELETE CASCADE,
+    INDEX idx_professeur (professeur_id),
+    INDEX idx_periode (date_debut, date_fin)
+) ENGINE=InnoDB;
@@ -243,6 +243,25 @@ CREATE TABLE surveillances (
 ) ENGINE=InnoDB;
 
 
+-- TABLE: indisponibilites_professeurs
+-- Description: Calendrier d'indisponibilités des professeurs (creneau_id NULL = journée entière)
+
+CREATE TABLE indisponibilites_professeurs (
+    id INT AUTO_INCREMENT PRIMARY KEY,
+    professeur_id INT NOT NULL,
+    date_debut DATE NOT NULL,
+    date_fin DATE NOT NULL,
+    creneau_id INT NULL,
+    motif VARCHAR(255),
+    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+    FOREIGN KEY (professeur_id) REFERENCES professeurs(id) ON DELETE CASCADE,
+    FOREIGN KEY (creneau_id) REFERENCES creneaux_horaires(id) ON DELETE CASCADE,
+    CHECK (date_fin >= date_debut),
+    INDEX idx_professeur (professeur_id),
+    INDEX idx_periode (date_debut, date_fin)
+) ENGINE=InnoDB;
+
+
 -- TABLE: utilisateurs
 -- Description: Gestion des utilisateurs du système (unifié)
 
@@ -188,6 +188,21 @@ CREATE TABLE IF NOT EXISTS surveillances (
     INDEX idx_professeur (professeur_id)
 );
 
+-- TABLE: indisponibilites_professeurs
+CREATE TABLE IF NOT EXISTS indisponibilites_professeurs (
+    id INT AUTO_INCREMENT PRIMARY KEY,
+    professeur_id INT NOT NULL,
+    date_debut DATE NOT NULL,
+    date_fin DATE NOT NULL,
+    creneau_id INT NULL,
+    motif VARCHAR(255),
+    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+    FOREIGN KEY (professeur_id) REFERENCES professeurs(id) ON DELETE CASCADE,
+    FOREIGN KEY (creneau_id) REFERENCES creneaux_horaires(id) ON DELETE CASCADE,
+    INDEX idx_professeur (professeur_id),
+    INDEX idx_periode (date_debut, date_fin)
+);
+
 -- TABLE: utilisateurs
 CREATE TABLE IF NOT EXISTS utilisateurs (
     id INT AUTO_INCREMENT PRIMARY KEY,
@@ -1347,6 +1347,91 @@ elif "Configuration" in page:
         )
         st.session_state.selected_levels = niveaux if niveaux else ["L1", "L2", "L3", "M1", "M2"]
         
+        # ════════════════════════════════════════════════════════
+        # SECTION 5: ALGORITHME
+        # ════════════════════════════════════════════════════════
+        
+        st.markdown("---")
+        st.markdown("#### 🧠 Algorithme")
+        
+        ordering = st.selectbox(
+            "🔢 Ordre de placement des modules",
+            options=["students", "dsatur"],
+            index=0,
+            format_func=lambda x: {"students": "Effectifs décroissants", "dsatur": "DSatur (saturation des conflits)"}[x],
+            help="DSatur place d'abord les modules ayant le moins de jours encore possibles (utile avec repos ou division)"
+        )
+        st.session_state.ordering = ordering
+        
+        solver = st.selectbox(
+            "🧮 Solveur",
+            options=["greedy", "milp"],
+            index=0,
+            format_func=lambda x: {"greedy": "Glouton (rapide)", "milp": "Exact MILP (petites sessions)"}[x],
+            help="Le mode exact convient au rattrapage ou à peu de niveaux; repli automatique sur le glouton à l'échéance"
+        )
+        st.session_state.solver = solver
+        
+        room_assignment = st.selectbox(
+            "🏛️ Affectation des salles",
+            options=["first_fit", "assignment"],
+            index=0,
+            format_func=lambda x: {"first_fit": "Première salle libre", "assignment": "Affectation optimale (moins de places perdues)"}[x],
+            help="L'affectation optimale réserve les amphis aux gros effectifs: plus de modules tiennent sur un même créneau"
+        )
+        st.session_state.room_assignment = room_assignment
+        
+        cross_sharing = st.checkbox(
+            "🤝 Partager les salles entre modules d'un même créneau",
+            value=False,
+            help="Les places libres d'une salle (amphis à moitié vides) accueillent d'autres examens du créneau, avec la même équipe de surveillants"
+        )
+        st.session_state.cross_module_sharing = cross_sharing
+        
+        parallel = st.checkbox(
+            "⚡ Calcul parallèle par composantes indépendantes",
+            value=False,
+            help="Découpe le problème en groupes de formations sans étudiants communs, résolus sur tous les cœurs du serveur"
+        )
+        st.session_state.parallel_components = parallel
+        
+        multi_start = st.number_input(
+            "🎲 Essais multi-start (ordres perturbés)",
+            min_value=1, max_value=64, value=1, step=1,
+            help="Plusieurs ordres de placement aléatoires résolus en parallèle; le meilleur plan est conservé"
+        )
+        st.session_state.multi_start = multi_start
+        
+        anytime = st.checkbox(
+            "♾️ Amélioration continue jusqu'à l'échéance",
+            value=False,
+            help="Produit d'abord le plan glouton, puis l'améliore jusqu'au délai maximal (45s par défaut)"
+        )
+        st.session_state.anytime = anytime
+        
+        annealing = st.checkbox(
+            "🔥 Recherche locale (recuit simulé) après le glouton",
+            value=False,
+            help="Déplace/échange des modules pour placer les non planifiés, espacer les examens des étudiants et équilibrer les surveillances"
+        )
+        st.session_state.annealing = annealing
+        
+        lns = st.checkbox(
+            "🧩 Réparation exacte (LNS + MILP) des modules non planifiés",
+            value=False,
+            help="Libère un voisinage (modules en conflit, ou un département sur une journée) et le re-résout exactement"
+        )
+        st.session_state.lns = lns
+        
+        supervisor_assignment = st.selectbox(
+            "👥 Affectation des surveillants",
+            options=["greedy", "flow"],
+            index=0,
+            format_func=lambda x: {"greedy": "Pendant le placement (glouton)", "flow": "Deux phases (flot de coût minimal)"}[x],
+            help="Deux phases: examens et salles d'abord, puis toutes les surveillances affectées d'un coup pour équilibrer les charges"
+        )
+        st.session_state.supervisor_assignment = supervisor_assignment
+        
         # Valeurs par défaut pour les autres paramètres
         st.session_state.max_exam_prof = 5
         st.session_state.fair_distribution = True
@@ -1547,6 +1632,38 @@ elif "Données" in page:
                                 st.success("✅ Tous supprimés!"); st.cache_data.clear(); st.rerun()
                             except Exception as e:
                                 st.error(f"❌ Erreur: {e}")
+        
+        # Calendrier d'indisponibilités (pris en compte à la génération)
+        with st.expander("📅 Indisponibilités des professeurs"):
+            indispos = q("""SELECT p.matricule, CONCAT(p.prenom, ' ', p.nom) as nom, i.date_debut, i.date_fin,
+                                   COALESCE(c.libelle, 'Journée') as creneau, i.motif
+                            FROM indisponibilites_professeurs i
+                            JOIN professeurs p ON i.professeur_id = p.id
+                            LEFT JOIN creneaux_horaires c ON i.creneau_id = c.id
+                            ORDER BY i.date_debut DESC LIMIT 100""")
+            if indispos:
+                st.dataframe(pd.DataFrame([{
+                    'Matricule': i['matricule'], 'Nom': i['nom'], 'Du': i['date_debut'], 'Au': i['date_fin'],
+                    'Créneau': i['creneau'], 'Motif': i.get('motif') or '—'
+                } for i in indispos]), use_container_width=True, hide_index=True)
+            else:
+                st.info("Aucune indisponibilité déclarée")
+            
+            st.markdown("#### 📥 Import CSV")
+            st.caption("Colonnes: matricule, date_debut, date_fin, creneau (ordre ou libellé, vide = journée), motif")
+            from services.unavailability import CSV_COLUMNS, parse_csv, import_unavailabilities
+            st.download_button("⬇️ Modèle CSV", ";".join(CSV_COLUMNS) + "\nP001;2026-01-12;2026-01-14;;Congé\n",
+                               "indisponibilites.csv", "text/csv")
+            uploaded = st.file_uploader("Fichier CSV", type=["csv"], key="indispo_csv")
+            replace = st.checkbox("Remplacer les indisponibilités existantes des professeurs importés", key="indispo_replace")
+            if uploaded and st.button("📥 Importer", key="btn_import_indispo", type="primary"):
+                try:
+                    result = import_unavailabilities(parse_csv(uploaded.getvalue()), replace=replace)
+                    st.success(f"✅ {result['inserted']} indisponibilité(s) importée(s)")
+                    for line, message in result['errors'][:20]:
+                        st.warning(f"Ligne {line}: {message}")
+                except Exception as e:
+                    st.error(f"❌ Erreur: {e}")
     
     # ══════════════════════════════════════════════════════════════════════════
     # TAB 4: SALLES (avec bâtiment + autocomplete)
@@ -1872,97 +1989,231 @@ elif "Génération" in page:
         col1, col2 = st.columns([2, 1])
         
         with col1:
-            if st.button("🚀 GÉNÉRER L'EMPLOI DU TEMPS", type="primary", use_container_width=True):
-                with st.spinner("⏳ Génération en cours..."):
-                    try:
-                        # Nettoyer les anciens examens
-                        q("DELETE FROM surveillances WHERE examen_id IN (SELECT id FROM examens WHERE session_id=%s)", (sid,), fetch='none')
-                        q("DELETE FROM conflits WHERE examen1_id IN (SELECT id FROM examens WHERE session_id=%s)", (sid,), fetch='none')
-                        q("DELETE FROM examens WHERE session_id=%s", (sid,), fetch='none')
-                        
-                        from services.optimization import run_optimization
-                        
-                        opt_config = {
-                            'max_exam_per_student_per_day': st.session_state.get('max_exam_student', 1),
-                            'max_exam_per_professor_per_day': st.session_state.get('max_exam_prof', 3),
-                            'rest_days': st.session_state.get('rest_days', 0),
-                            'dept_splitting': st.session_state.get('dept_splitting', False),
-                            'dept_group_a': st.session_state.get('dept_group_a', []),
-                            'dept_group_b': st.session_state.get('dept_group_b', []),
-                            'selected_levels': st.session_state.get('selected_levels', ['L1','L2','L3','M1','M2']),
-                            'supervisors_small_room': st.session_state.get('supervisors_small_room', 1),
-                            'supervisors_amphi': st.session_state.get('supervisors_amphi', 2),
-                            'fair_distribution': st.session_state.get('fair_distribution', True),
-                            'dept_priority': st.session_state.get('dept_priority', True),
-                            'max_supervisions_per_prof_per_day': st.session_state.get('max_supervisions_per_prof_per_day', 3)
-                        }
-                        
-                        start = datetime.now()
-                        r = run_optimization(sid, opt_config)
-                        elapsed = (datetime.now() - start).total_seconds()
-                        
-                        st.balloons()
+            warm_start = st.checkbox(
+                "♻️ Conserver le plan existant (régénération incrémentale)",
+                value=bool(stats and stats['total_creneaux']),
+                help="Garde les examens encore valides et ne replanifie que les modules touchés par les changements"
+            )
+            stop_if_infeasible = st.checkbox(
+                "🧪 Arrêter si l'instance est prouvée infaisable",
+                value=True,
+                help="Bornes rapides (places, salles, surveillants, examens par étudiant et par jour) vérifiées avant la planification"
+            )
+            from services import checkpoint as gen_checkpoint
+            resume = False
+            if gen_checkpoint.has_checkpoint(gen_checkpoint.checkpoint_path(sid)):
+                resume = st.checkbox(
+                    "⏯️ Reprendre la génération interrompue",
+                    value=True,
+                    help="Repart du dernier point de contrôle enregistré sur disque, sans recharger les données"
+                )
+            from services.jobs import submit_generation, get_job_status, cancel_job, active_job
+            job_id = active_job(sid) or st.session_state.get('generation_job')
+            job = get_job_status(job_id) if job_id else None
+            if job and job['session_id'] != sid:
+                job = None
+            running = bool(job and job['status'] in ('en_attente', 'en_cours'))
+            if st.button("🚀 GÉNÉRER L'EMPLOI DU TEMPS", type="primary", use_container_width=True, disabled=running):
+                try:
+                    opt_config = {
+                        'max_exam_per_student_per_day': st.session_state.get('max_exam_student', 1),
+                        'max_exam_per_professor_per_day': st.session_state.get('max_exam_prof', 3),
+                        'rest_days': st.session_state.get('rest_days', 0),
+                        'dept_splitting': st.session_state.get('dept_splitting', False),
+                        'dept_group_a': st.session_state.get('dept_group_a', []),
+                        'dept_group_b': st.session_state.get('dept_group_b', []),
+                        'selected_levels': st.session_state.get('selected_levels', ['L1','L2','L3','M1','M2']),
+                        'supervisors_small_room': st.session_state.get('supervisors_small_room', 1),
+                        'supervisors_amphi': st.session_state.get('supervisors_amphi', 2),
+                        'fair_distribution': st.session_state.get('fair_distribution', True),
+                        'dept_priority': st.session_state.get('dept_priority', True),
+                        'max_supervisions_per_prof_per_day': st.session_state.get('max_supervisions_per_prof_per_day', 3),
+                        'ordering': st.session_state.get('ordering', 'students'),
+                        'solver': st.session_state.get('solver', 'greedy'),
+                        'room_assignment': st.session_state.get('room_assignment', 'first_fit'),
+                        'cross_module_sharing': st.session_state.get('cross_module_sharing', False),
+                        'warm_start': warm_start,
+                        'stop_if_infeasible': stop_if_infeasible,
+                        'checkpoint': True,
+                        'resume': resume,
+                        'parallel_components': st.session_state.get('parallel_components', False),
+                        'multi_start': st.session_state.get('multi_start', 1),
+                        'anytime': st.session_state.get('anytime', False),
+                        'annealing': st.session_state.get('annealing', False),
+                        'lns': st.session_state.get('lns', False),
+                        'supervisor_assignment': st.session_state.get('supervisor_assignment', 'greedy')
+                    }
+                    
+                    # Génération en arrière-plan: la page suit sa progression, les reruns ne l'interrompent plus.
+                    # L'ancien plan n'est remplacé qu'à l'enregistrement d'un plan complet (même transaction)
+                    st.session_state['generation_job'] = submit_generation(sid, opt_config)
+                    st.rerun()
+                except Exception as e:
+                    st.error(f"❌ {e}")
+            
+            # Suivi de la génération en arrière-plan: fragment rafraîchi chaque seconde (seule cette
+            # section est réexécutée, la page reste utilisable); génération finie: rerun complet
+            @st.fragment(run_every=1)
+            def generation_progress(job_id):
+                job = get_job_status(job_id)
+                if not job or job['status'] not in ('en_attente', 'en_cours'):
+                    st.rerun()
+                if job['status'] == 'en_attente':
+                    st.progress(0.0, text="⏳ En attente de la fin d'une autre génération...")
+                else:
+                    st.progress(job['progress'], text=f"⏳ Génération en cours... {job['progress'] * 100:.0f}% de la phase en cours")
+                c1, c2, c3 = st.columns(3)
+                c1.metric("📅 Examens placés", job['scheduled'])
+                c2.metric("🏆 Meilleur plan - non planifiés", job['best_unscheduled'] if job['best_unscheduled'] is not None else "-")
+                c3.metric("⏱️ Temps écoulé", f"{job['elapsed']:.0f}s")
+                if job['score']:
+                    st.caption(f"Meilleur plan: variance surveillances {job['score']['supervisor_variance']:.2f}, "
+                               f"{job['score']['days_used']} jour(s) utilisés")
+                if st.button("⏹️ Annuler la génération", use_container_width=True, disabled=job['cancel_requested'],
+                             help="Arrête la recherche: le meilleur plan complet trouvé est enregistré; "
+                                  "arrêtée avant la fin de la passe gloutonne, le plan existant est conservé"):
+                    cancel_job(job['id'])
+            
+            if job:
+                if running:
+                    generation_progress(job['id'])
+                elif job['status'] == 'erreur':
+                    st.error(f"❌ {job['error']}")
+                else:
+                    from services.optimization import ExamScheduler
+                    r, opt_config, elapsed = job['result'], job['config'], job['elapsed']
+                    # Premier affichage du résultat: vider le cache des pages (nouveau plan en base)
+                    first_view = st.session_state.get('generation_shown') != job['id']
+                    if first_view:
+                        st.session_state['generation_shown'] = job['id']
+                        st.cache_data.clear()
+                    
+                    if r.get('infeasible'):
+                        pc = r['precheck']
+                        st.error(f"🧪 Instance infaisable: au moins {pc['lower_bound_unscheduled']} module(s) "
+                                 f"ne peuvent pas être planifiés (diagnostic en {pc['time'] * 1000:.0f} ms)")
+                        for check in pc['checks']:
+                            if not check['ok']:
+                                st.warning(f"**{check['check']}** (≥ {check['lower_bound']} module(s)): {check['message']}")
+                        for reason in list(pc['infeasible_modules'].values())[:20]:
+                            st.caption(f"• {reason}")
+                    elif r.get('cached'):
+                        st.info(f"♻️ Données et paramètres inchangés: plan en cache "
+                                f"{'déjà enregistré' if r['cached'] == 'deja_enregistre' else 'ré-enregistré'} ({elapsed:.2f}s)")
+                    elif not r.get('saved', True):
+                        st.warning(f"⏹️ Génération {'annulée' if job['status'] == 'annule' else 'interrompue (échéance)'} après {elapsed:.1f}s "
+                                   f"avant un plan complet (plan partiel: {r.get('scheduled', 0)} examens, "
+                                   f"{r.get('untried_modules', 0)} module(s) non traité(s)): plan existant conservé"
+                                   f"{' - reprise possible depuis le point de contrôle' if gen_checkpoint.has_checkpoint(gen_checkpoint.checkpoint_path(sid)) else ''}")
+                    elif job['status'] == 'annule':
+                        st.warning(f"⏹️ Génération annulée après {elapsed:.1f}s: meilleur plan trouvé conservé"
+                                   f"{' - reprise possible depuis le point de contrôle' if gen_checkpoint.has_checkpoint(gen_checkpoint.checkpoint_path(sid)) else ''}")
+                    else:
+                        if first_view:
+                            st.balloons()
                         st.success(f"✅ Terminé en {elapsed:.1f}s!")
+                    
+                    # Obtenir les valeurs depuis la base de données (source de vérité)
+                    db_exams = q("SELECT COUNT(*) as cnt FROM examens WHERE session_id = %s", (sid,), fetch='one')
+                    db_surv = q("SELECT COUNT(*) as cnt FROM surveillances sv JOIN examens e ON sv.examen_id = e.id WHERE e.session_id = %s", (sid,), fetch='one')
+                    
+                    exams_count = db_exams.get('cnt', 0) if db_exams else r.get('scheduled', 0)
+                    surv_count = db_surv.get('cnt', 0) if db_surv else 0
+                    
+                    c1, c2, c3 = st.columns(3)
+                    c1.metric("📅 Examens Planifiés", exams_count)
+                    c2.metric("⚠️ Conflits", r.get('conflicts', 0))
+                    c3.metric("📊 Surveillances", surv_count)
+                    
+                    # Afficher les paramètres appliqués
+                    with st.expander("📋 Paramètres appliqués", expanded=True):
+                        st.write(f"**Jours de repos:** {opt_config.get('rest_days', 0)}")
+                        st.write(f"**Surveillants (salle <100):** {opt_config.get('supervisors_small_room', 1)}")
+                        st.write(f"**Surveillants (amphi ≥100):** {opt_config.get('supervisors_amphi', 2)}")
+                        st.write(f"**Division département:** {'Oui' if opt_config.get('dept_splitting') else 'Non'}")
+                        st.write(f"**Ordre des modules:** {r.get('ordering', 'students')} → {r.get('unscheduled_modules', 0)} module(s) non planifié(s) en {r.get('execution_time', 0):.2f}s")
+                        if r.get('plan_score'):
+                            ps = r['plan_score']
+                            st.write(f"**Meilleur plan multi-start:** variance surveillances {ps['supervisor_variance']:.2f}, {ps['days_used']} jour(s) utilisés")
+                        if r.get('warm_start'):
+                            ws = r['warm_start']
+                            st.write(f"**Régénération incrémentale:** {ws['kept_modules']} module(s) conservé(s), "
+                                     f"{ws['rows_changed']} ligne(s) modifiée(s) (-{ws['rows_deleted']} / +{ws['rows_inserted']} / ~{ws['rows_updated']})")
+                        if r.get('milp'):
+                            mp = r['milp']
+                            gap = f"{mp['gap'] * 100:.1f}%" if mp.get('gap') is not None else "n/a"
+                            st.write(f"**MILP:** {mp['status']}, écart d'optimalité {gap}, résolu en {mp['solve_time']}s"
+                                     f"{' (repli glouton)' if mp.get('fallback') else ''}")
+                        if r.get('lns'):
+                            st.write(f"**LNS:** {r['lns']['repaired']} module(s) récupéré(s) en {r['lns']['iterations']} voisinage(s)")
+                        if r.get('precheck') and not r['precheck']['feasible'] and not r.get('infeasible'):
+                            st.write(f"**Pré-vérification:** au moins {r['precheck']['lower_bound_unscheduled']} "
+                                     f"module(s) non planifiable(s) (borne inférieure)")
+                        if r.get('supervision'):
+                            sv = r['supervision']
+                            st.write(f"**Surveillants (deux phases):** Gini {sv['gini_after']}, "
+                                     f"variance {sv['variance_after']} ({sv['status']}"
+                                     f"{', repli glouton' if sv.get('fallback') else ''})")
+                        if r.get('quality'):
+                            qm = r['quality']
+                            st.write(f"**Qualité du plan:** {qm['jours_utilises']} jour(s), écart min. moyen "
+                                     f"{qm['etudiants']['ecart_min_heures_moyen']} h, remplissage salles "
+                                     f"{qm['salles']['remplissage_moyen_pct']}%, Gini surveillances {qm['surveillants']['gini']}")
+                    
+                    # Diagnostic: créneaux rejetés par motif pour chaque module non planifié
+                    if r.get('diagnostics'):
+                        with st.expander(f"🔎 Modules non planifiés - rejets par motif ({len(r['diagnostics'])})", expanded=True):
+                            labels = ExamScheduler.REJECTION_LABELS
+                            diag = pd.DataFrame(r['diagnostics'])
+                            totals = diag[list(labels)].sum()
+                            main = totals.idxmax()
+                            st.info(f"🎯 Goulot principal: **{labels[main]}** ({int(totals[main])} créneau(x) rejeté(s) "
+                                    f"sur {int(diag['creneaux'].sum())} essayés) - à corriger avant de relancer")
+                            diag['goulot'] = diag['goulot'].map(labels)
+                            diag = diag.rename(columns={'module_code': 'Module', 'niveau': 'Niveau', 'creneaux': 'Créneaux',
+                                                        'goulot': 'Goulot', **labels})
+                            st.dataframe(diag.drop(columns=['module_id']), use_container_width=True, hide_index=True)
+                    
+                    # VÉRIFICATION: Statistiques réelles depuis la base de données
+                    with st.expander("✅ Vérification - Surveillants Assignés", expanded=True):
+                        # Requête pour compter les surveillants par examen
+                        stats = q("""
+                            SELECT 
+                                COUNT(DISTINCT e.id) as nb_examens,
+                                COUNT(s.id) as total_surveillants,
+                                ROUND(COUNT(s.id) / COUNT(DISTINCT e.id), 1) as moyenne_par_examen
+                            FROM examens e 
+                            LEFT JOIN surveillances s ON s.examen_id = e.id
+                            WHERE e.session_id = %s
+                        """, (sid,))
                         
-                        # Obtenir les valeurs depuis la base de données (source de vérité)
-                        db_exams = q("SELECT COUNT(*) as cnt FROM examens WHERE session_id = %s", (sid,), fetch='one')
-                        db_surv = q("SELECT COUNT(*) as cnt FROM surveillances sv JOIN examens e ON sv.examen_id = e.id WHERE e.session_id = %s", (sid,), fetch='one')
-                        
-                        exams_count = db_exams.get('cnt', 0) if db_exams else r.get('scheduled', 0)
-                        surv_count = db_surv.get('cnt', 0) if db_surv else 0
-                        
-                        c1, c2, c3 = st.columns(3)
-                        c1.metric("📅 Examens Planifiés", exams_count)
-                        c2.metric("⚠️ Conflits", r.get('conflicts', 0))
-                        c3.metric("📊 Surveillances", surv_count)
-                        
-                        # Afficher les paramètres appliqués
-                        with st.expander("📋 Paramètres appliqués", expanded=True):
-                            st.write(f"**Jours de repos:** {opt_config.get('rest_days', 0)}")
-                            st.write(f"**Surveillants (salle <100):** {opt_config.get('supervisors_small_room', 1)}")
-                            st.write(f"**Surveillants (amphi ≥100):** {opt_config.get('supervisors_amphi', 2)}")
-                            st.write(f"**Division département:** {'Oui' if opt_config.get('dept_splitting') else 'Non'}")
+                        # Détail par type de salle
+                        detail = q("""
+                            SELECT 
+                                CASE WHEN l.capacite >= 100 THEN 'Amphithéâtre (≥100)' ELSE 'Petite salle (<100)' END as type_salle,
+                                COUNT(DISTINCT e.id) as nb_examens,
+                                COUNT(s.id) as total_surveillants,
+                                ROUND(COUNT(s.id) / COUNT(DISTINCT e.id), 1) as moyenne
+                            FROM examens e 
+                            LEFT JOIN surveillances s ON s.examen_id = e.id
+                            LEFT JOIN lieu_examen l ON e.salle_id = l.id
+                            WHERE e.session_id = %s
+                            GROUP BY type_salle
+                        """, (sid,))
                         
-                        # VÉRIFICATION: Statistiques réelles depuis la base de données
-                        with st.expander("✅ Vérification - Surveillants Assignés", expanded=True):
-                            # Requête pour compter les surveillants par examen
-                            stats = q("""
-                                SELECT 
-                                    COUNT(DISTINCT e.id) as nb_examens,
-                                    COUNT(s.id) as total_surveillants,
-                                    ROUND(COUNT(s.id) / COUNT(DISTINCT e.id), 1) as moyenne_par_examen
-                                FROM examens e 
-                                LEFT JOIN surveillances s ON s.examen_id = e.id
-                                WHERE e.session_id = %s
-                            """, (sid,))
+                        if stats and stats[0]:
+                            s = stats[0]
+                            st.metric("📊 Total surveillances", s.get('total_surveillants', 0))
+                            st.metric("📈 Moyenne par examen", s.get('moyenne_par_examen', 0))
                             
-                            # Détail par type de salle
-                            detail = q("""
-                                SELECT 
-                                    CASE WHEN l.capacite >= 100 THEN 'Amphithéâtre (≥100)' ELSE 'Petite salle (<100)' END as type_salle,
-                                    COUNT(DISTINCT e.id) as nb_examens,
-                                    COUNT(s.id) as total_surveillants,
-                                    ROUND(COUNT(s.id) / COUNT(DISTINCT e.id), 1) as moyenne
-                                FROM examens e 
-                                LEFT JOIN surveillances s ON s.examen_id = e.id
-                                LEFT JOIN lieu_examen l ON e.salle_id = l.id
-                                WHERE e.session_id = %s
-                                GROUP BY type_salle
-                            """, (sid,))
-                            
-                            if stats and stats[0]:
-                                s = stats[0]
-                                st.metric("📊 Total surveillances", s.get('total_surveillants', 0))
-                                st.metric("📈 Moyenne par examen", s.get('moyenne_par_examen', 0))
-                                
-                            if detail:
-                                st.write("**Détail par type de salle:**")
-                                for d in detail:
-                                    st.write(f"- {d['type_salle']}: {d['total_surveillants']} surveillants ({d['moyenne']} par examen)")
-                        
-                        st.cache_data.clear()
-                    except Exception as e:
-                        st.error(f"❌ {e}")
+                        if detail:
+                            st.write("**Détail par type de salle:**")
+                            for d in detail:
+                                st.write(f"- {d['type_salle']}: {d['total_surveillants']} surveillants ({d['moyenne']} par examen)")
+                    
+                    if st.button("✖️ Masquer le résultat", use_container_width=True):
+                        st.session_state.pop('generation_job', None)
+                        st.rerun()
         
         with col2:
             with st.expander("🔄 Réinitialiser"):
@@ -2439,27 +2690,42 @@ elif "KPIs Vice-doyen" in page:
         
         st.markdown("### 📊 Indicateurs Globaux")
         
-        kpis = q("""
-            SELECT 
-                (SELECT COUNT(*) FROM examens WHERE session_id = %s) as total_examens,
-                (SELECT COUNT(DISTINCT module_id) FROM examens WHERE session_id = %s) as modules_planifies,
-                (SELECT COUNT(DISTINCT salle_id) FROM examens WHERE session_id = %s) as salles_utilisees,
-                (SELECT COUNT(*) FROM lieu_examen WHERE disponible=TRUE) as total_salles,
-                (SELECT COUNT(*) FROM surveillances sv JOIN examens e ON sv.examen_id=e.id WHERE e.session_id=%s) as total_surveillances,
-                (SELECT COUNT(DISTINCT sv.professeur_id) FROM surveillances sv JOIN examens e ON sv.examen_id=e.id WHERE e.session_id=%s) as profs_actifs,
-                (SELECT COUNT(*) FROM professeurs) as total_profs
-        """, (sid, sid, sid, sid, sid), fetch='one')
-        
-        if kpis:
-            c1, c2, c3, c4 = st.columns(4)
-            c1.metric("📅 Examens Planifiés", kpis['total_examens'] or 0)
-            c2.metric("📖 Modules Couverts", kpis['modules_planifies'] or 0)
-            
-            taux_salles = ((kpis['salles_utilisees'] or 0) / max(kpis['total_salles'] or 1, 1)) * 100
-            c3.metric("🏢 Taux Occupation Salles", f"{taux_salles:.1f}%")
+        # Indicateurs calculés en NumPy à partir du plan enregistré (services/quality.py)
+        from services.quality import metrics_from_database
+        metrics = metrics_from_database(sid)
+        
+        c1, c2, c3, c4 = st.columns(4)
+        c1.metric("📅 Examens Planifiés", metrics['examens'])
+        c2.metric("📖 Modules Couverts", metrics['modules'])
+        
+        taux_salles = (metrics['salles_utilisees'] / max(metrics['salles_total'], 1)) * 100
+        c3.metric("🏢 Taux Occupation Salles", f"{taux_salles:.1f}%")
+        
+        sv = metrics['surveillants']
+        taux_profs = (sv['profs_actifs'] / max(sv['profs'], 1)) * 100
+        c4.metric("👨‍🏫 Profs Mobilisés", f"{taux_profs:.0f}%")
+        
+        if metrics['examens']:
+            st.markdown("### 🎯 Qualité du Planning")
+            et, sa = metrics['etudiants'], metrics['salles']
             
-            taux_profs = ((kpis['profs_actifs'] or 0) / max(kpis['total_profs'] or 1, 1)) * 100
-            c4.metric("👨‍🏫 Profs Mobilisés", f"{taux_profs:.0f}%")
+            c1, c2, c3, c4 = st.columns(4)
+            c1.metric("📆 Jours Utilisés", metrics['jours_utilises'])
+            c2.metric("⏱️ Écart Min. Moyen", f"{et['ecart_min_heures_moyen']} h" if et['ecart_min_heures_moyen'] is not None else "-")
+            c3.metric("🪑 Remplissage Salles", f"{sa['remplissage_moyen_pct']}%")
+            c4.metric("⚖️ Gini Surveillances", f"{sv['gini']:.3f}")
+            
+            st.caption(f"👨‍🎓 {et['etudiants']:,} étudiants - écart minimal: {et['meme_jour_pct']}% le même jour, "
+                       f"{et['jours_consecutifs_pct']}% jours consécutifs, {et['deux_jours_ou_plus_pct']}% ≥ 2 jours · "
+                       f"{et['plusieurs_examens_jour_pct']}% avec plusieurs examens un même jour (max {et['examens_par_jour_max']})")
+            st.caption(f"🏢 {sa['salle_creneaux']} salle×créneaux, médiane {sa['remplissage_median_pct']}%, "
+                       f"{sa['sous_50_pct']}% remplies à moins de 50%, {sa['surcharges']} en surcharge · "
+                       f"👁️ surveillances par prof: {sv['charge_min']}-{sv['charge_max']} (moyenne {sv['charge_moyenne']})")
+            
+            dept_names = {d['id']: d['nom'] for d in get_depts()}
+            spread = pd.DataFrame(metrics['departements'])
+            spread.insert(0, 'departement', spread.pop('dept_id').map(dept_names))
+            st.dataframe(spread, use_container_width=True, hide_index=True)
         
         # ═══════════════════════════════════════════════════════════════════════
         # SECTION 2: TAUX DE CONFLITS PAR DÉPARTEMENT
@@ -0,0 +1,288 @@
+"""
+Fixture commune des tests: une petite session en mémoire servie par un module `database`
+factice (aucune base MySQL requise). Les données sont chargées une fois par le chemin
+normal (_load_data) puis chaque test reconstruit un planificateur vierge via
+ExamScheduler.from_state. Les écritures du plan (examens, surveillances) et des
+indisponibilités sont répercutées en mémoire et relues par les requêtes du démarrage à
+chaud, de la re-planification et du cache de plans.
+- 2 départements, 6 formations (L1 en 3 groupes, L3 en 2, M1 en 1), 4 modules S1 chacune
+- quelques inscriptions croisées (dettes), 2 amphis et 8 salles, 8 professeurs (4 par département)
+- 5 jours ouvrables × 3 créneaux de 90 minutes
+"""
+import os
+import re
+import sys
+import types
+from collections import defaultdict
+from contextlib import contextmanager
+from datetime import date, timedelta
+
+import pytest
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'backend'))
+
+
+SESSION = {
+    'id': 1, 'nom': 'Session test', 'type_session': 'NORMALE',
+    'date_debut': date(2026, 1, 5), 'date_fin': date(2026, 1, 9),
+}
+
+
+def build_tables():
+    """Tables de la session de test (déterministes)"""
+    departements = [{'id': 1, 'nom': 'Informatique', 'code': 'INF'}, {'id': 2, 'nom': 'Mathématiques', 'code': 'MAT'}]
+    lieu_examen = [
+        {'id': 1, 'code': 'A1', 'nom': 'Amphi 1', 'capacite': 120, 'type': 'AMPHI', 'disponible': True},
+        {'id': 2, 'code': 'A2', 'nom': 'Amphi 2', 'capacite': 80, 'type': 'AMPHI', 'disponible': True},
+    ] + [
+        {'id': 3 + i, 'code': f'S{i + 1}', 'nom': f'Salle {i + 1}', 'capacite': capacite, 'type': 'SALLE', 'disponible': True}
+        for i, capacite in enumerate((40, 30, 30, 25, 25, 20, 20, 15))
+    ]
+    professeurs = [
+        {'id': i + 1, 'nom': f'Nom{i + 1}', 'prenom': f'Prenom{i + 1}', 'dept_id': 1 if i < 4 else 2,
+         'matricule': f'P{i + 1:03d}'}
+        for i in range(8)
+    ]
+    creneaux = [
+        {'id': i + 1, 'libelle': f'C{i + 1}', 'ordre': i + 1,
+         'heure_debut': timedelta(hours=h, minutes=m), 'heure_fin': timedelta(hours=h, minutes=m + 90)}
+        for i, (h, m) in enumerate(((8, 0), (10, 0), (13, 30)))
+    ]
+    
+    formations, modules, etudiants, inscriptions = [], [], [], []
+    for dept_id in (1, 2):
+        for niveau, nb_etudiants, nb_groupes in (('L1', 60, 3), ('L3', 40, 2), ('M1', 18, 1)):
+            formation_id = len(formations) + 1
+            formations.append({'id': formation_id, 'dept_id': dept_id, 'niveau': niveau})
+            module_ids = []
+            for k in range(4):
+                module_ids.append(len(modules) + 1)
+                modules.append({
+                    'id': len(modules) + 1, 'code': f'F{formation_id}M{k + 1}', 'nom': f'Module {k + 1}',
+                    'formation_id': formation_id, 'semestre': 'S1', 'duree_examen_minutes': 90,
+                })
+            for i in range(nb_etudiants):
+                etudiant_id = len(etudiants) + 1
+                etudiants.append({'id': etudiant_id, 'formation_id': formation_id, 'groupe': f'G{i % nb_groupes + 1:02d}'})
+                inscriptions += [{'etudiant_id': etudiant_id, 'module_id': m} for m in module_ids]
+    # Dettes: étudiants inscrits à un module d'une autre formation
+    for etudiant_id, module_id in ((61, 1), (62, 2), (101, 5), (150, 9), (170, 6), (200, 14), (230, 18)):
+        inscriptions.append({'etudiant_id': etudiant_id, 'module_id': module_id})
+    
+    return {
+        'departements': departements, 'lieu_examen': lieu_examen, 'professeurs': professeurs,
+        'creneaux_horaires': creneaux, 'formations': formations, 'modules': modules,
+        'etudiants': etudiants, 'inscriptions': inscriptions, 'indisponibilites_professeurs': [],
+    }
+
+
+TABLES = build_tables()
+
+# Requêtes d'écriture reçues (texte normalisé, nb de lignes de paramètres)
+WRITES = []
+
+# Plan enregistré: examens par id, surveillances dans l'ordre d'insertion; version =
+# horodatage simulé (updated_at), incrémentée à chaque écriture
+PLAN = {'examens': {}, 'surveillances': [], 'version': 0}
+
+# Conditions des requêtes du plan, dans l'ordre de leurs paramètres
+_CONDITION = re.compile(r"\b(?:e|sv)\.(\w+) (NOT IN|IN|=) (\((?:%s,?)+\)|%s)")
+
+
+def _group_exams(params):
+    """Équivalent de la requête de _load_exams_by_group (examens par module et groupe)"""
+    only = set(params) if params else None
+    formations = {f['id']: f for f in TABLES['formations']}
+    groupe_of = {e['id']: e['groupe'] for e in TABLES['etudiants']}
+    students = defaultdict(set)
+    for row in TABLES['inscriptions']:
+        students[row['module_id']].add(row['etudiant_id'])
+    rows = []
+    for module in TABLES['modules']:
+        if only is not None and module['id'] not in only:
+            continue
+        formation = formations[module['formation_id']]
+        by_group = defaultdict(set)
+        for etudiant_id in students[module['id']]:
+            by_group[groupe_of[etudiant_id]].add(etudiant_id)
+        rows += [{
+            'module_id': module['id'], 'module_code': module['code'], 'module_nom': module['nom'],
+            'formation_id': formation['id'], 'dept_id': formation['dept_id'], 'niveau': formation['niveau'],
+            'groupe': groupe, 'nb_etudiants': len(ids), 'duree_minutes': module['duree_examen_minutes'],
+        } for groupe, ids in by_group.items()]
+    return sorted(rows, key=lambda r: (-r['nb_etudiants'], r['module_id'], r['groupe']))
+
+
+def _inscriptions(params):
+    """Inscriptions (seulement celles des étudiants inscrits aux modules donnés, si filtre)"""
+    if not params:
+        return [dict(r) for r in TABLES['inscriptions']]
+    students = {r['etudiant_id'] for r in TABLES['inscriptions'] if r['module_id'] in set(params)}
+    return [dict(r) for r in TABLES['inscriptions'] if r['etudiant_id'] in students]
+
+
+def _plan_rows(query, params, join):
+    """Lignes du plan (examen, ou examen × surveillance) filtrées par les conditions WHERE"""
+    examens = PLAN['examens']
+    if join:
+        rows = [dict(examens[sv['examen_id']], examen_id=sv['examen_id'], professeur_id=sv['professeur_id'], sv_id=sv['id'])
+                for sv in PLAN['surveillances'] if sv['examen_id'] in examens]
+    else:
+        rows = [dict(e) for e in examens.values()]
+    remaining = list(params or ())
+    for column, operator, values in _CONDITION.findall(query[query.index(' WHERE '):]):
+        n = values.count('%s')
+        taken, remaining = set(remaining[:n]), remaining[n:]
+        rows = [r for r in rows if (r[column] in taken) != (operator == 'NOT IN')]
+    return rows
+
+
+def _plan_query(query, params):
+    """Requêtes de lecture du plan enregistré (démarrage à chaud, re-planification, cache)"""
+    if query.startswith('SELECT COUNT(*) AS n, MAX(e.id) AS max_id'):
+        rows = [e for e in PLAN['examens'].values() if e['session_id'] == params[0]]
+        ids = {e['id'] for e in rows}
+        return {
+            'n': len(rows), 'max_id': max(ids, default=None), 'ts': PLAN['version'] if rows else None,
+            'surveillances': sum(1 for sv in PLAN['surveillances'] if sv['examen_id'] in ids),
+        }
+    if 'FROM surveillances sv' in query:
+        rows = sorted(_plan_rows(query, params, join=True), key=lambda r: r['sv_id'])
+        if 'COUNT(*) AS nb' in query:
+            counts = defaultdict(int)
+            for r in rows:
+                counts[r['professeur_id']] += 1
+            return [{'professeur_id': p, 'nb': n} for p, n in counts.items()]
+        return [{'examen_id': r['examen_id'], 'professeur_id': r['professeur_id']} for r in rows]
+    rows = _plan_rows(query, params, join='JOIN surveillances sv' in query)
+    if query.startswith('SELECT DISTINCT e.module_id'):
+        return [{'module_id': m} for m in sorted({r['module_id'] for r in rows})]
+    return sorted(rows, key=lambda r: (r['module_id'], r['id']))
+
+
+def execute_query(query, params=None, fetch='all'):
+    """Répond aux requêtes de lecture (chargement, plan enregistré, empreintes du cache)"""
+    query = ' '.join(query.split())
+    if query.startswith('DELETE FROM indisponibilites_professeurs'):
+        _write(query, [params])
+        return None
+    if 'UNION ALL' in query:
+        # Empreinte des données d'entrée (plan_cache.data_fingerprint)
+        tables = dict(TABLES, sessions_examen=[SESSION])
+        return [
+            {'t': t, 'n': len(tables[t]), 'max_id': max((r.get('id') or 0 for r in tables[t]), default=None), 'ts': None}
+            for t in re.findall(r"SELECT '(\w+)' AS t", query)
+        ]
+    if 'FROM examens' in query or 'FROM surveillances' in query:
+        return _plan_query(query, params)
+    if 'FROM sessions_examen' in query:
+        return dict(SESSION)
+    if 'COUNT(DISTINCT i.etudiant_id) AS nb_etudiants' in query:
+        return _group_exams(params)
+    if 'FROM indisponibilites_professeurs' in query:
+        fin, debut = params
+        return [dict(r) for r in TABLES['indisponibilites_professeurs']
+                if r['date_debut'] <= fin and r['date_fin'] >= debut]
+    if query.startswith('SELECT module_id, etudiant_id FROM inscriptions'):
+        return _inscriptions(params)
+    if 'FROM lieu_examen' in query:
+        return sorted((dict(r) for r in TABLES['lieu_examen'] if r['disponible']), key=lambda r: -r['capacite'])
+    for table in ('departements', 'professeurs', 'creneaux_horaires'):
+        if f'FROM {table}' in query:
+            return [dict(r) for r in TABLES[table]]
+    raise NotImplementedError(f"requête non prévue par la fixture: {query[:120]}")
+
+
+def _write(query, seq_params):
+    """Répercute une écriture sur le plan enregistré et les indisponibilités"""
+    examens, surveillances = PLAN['examens'], PLAN['surveillances']
+    for params in seq_params:
+        params = tuple(params or ())
+        _Cursor.lastrowid += 1
+        if query.startswith('INSERT INTO examens'):
+            columns = query[query.index('(') + 1:query.index(')')].replace(' ', '').split(',')
+            examens[_Cursor.lastrowid] = dict(zip(columns, params), id=_Cursor.lastrowid)
+        elif query.startswith('INSERT INTO surveillances'):
+            surveillances.append({'id': _Cursor.lastrowid, 'examen_id': params[0], 'professeur_id': params[1]})
+        elif query.startswith('INSERT INTO indisponibilites_professeurs'):
+            columns = ('professeur_id', 'date_debut', 'date_fin', 'creneau_id', 'motif')
+            TABLES['indisponibilites_professeurs'].append(dict(zip(columns, params), id=_Cursor.lastrowid))
+        elif query.startswith('DELETE FROM indisponibilites_professeurs'):
+            TABLES['indisponibilites_professeurs'][:] = [
+                r for r in TABLES['indisponibilites_professeurs'] if r['professeur_id'] not in params
+            ]
+        elif query.startswith('DELETE FROM surveillances WHERE examen_id = %s AND professeur_id = %s'):
+            surveillances[:] = [sv for sv in surveillances if (sv['examen_id'], sv['professeur_id']) != params]
+        elif query.startswith('DELETE FROM surveillances WHERE examen_id IN (SELECT'):
+            surveillances[:] = [sv for sv in surveillances if examens[sv['examen_id']]['session_id'] != params[0]]
+        elif query.startswith('DELETE FROM surveillances WHERE examen_id IN'):
+            surveillances[:] = [sv for sv in surveillances if sv['examen_id'] not in params]
+        elif query.startswith('DELETE FROM examens WHERE session_id'):
+            for exam_id in [i for i, e in examens.items() if e['session_id'] == params[0]]:
+                del examens[exam_id]
+        elif query.startswith('DELETE FROM examens WHERE id IN'):
+            for exam_id in params:
+                examens.pop(exam_id, None)
+        elif query.startswith('UPDATE examens SET'):
+            examens[params[1]][query.split()[3]] = params[0]
+    PLAN['version'] += 1
+
+
+class _Cursor:
+    lastrowid = 0
+    rowcount = 0
+    
+    def execute(self, query, params=None):
+        query = ' '.join(query.split())
+        WRITES.append((query, 1))
+        _write(query, [params])
+    
+    def executemany(self, query, seq_params):
+        query = ' '.join(query.split())
+        WRITES.append((query, len(seq_params)))
+        _write(query, seq_params)
+    
+    def fetchall(self):
+        return []
+    
+    def fetchone(self):
+        return None
+
+
+@contextmanager
+def get_cursor(dictionary=True):
+    yield _Cursor()
+
+
+def execute_many(query, seq_params):
+    query = ' '.join(query.split())
+    WRITES.append((query, len(seq_params)))
+    _write(query, seq_params)
+    return len(seq_params)
+
+
+database = types.ModuleType('database')
+database.execute_query = execute_query
+database.get_cursor = get_cursor
+database.execute_many = execute_many
+sys.modules['database'] = database
+
+
+@pytest.fixture(scope='session')
+def state():
+    """Données préchargées de la session de test (chargées une fois)"""
+    from services.optimization import ExamScheduler
+    
+    scheduler = ExamScheduler(SESSION['id'], {}, session_info=dict(SESSION))
+    scheduler._load_data()
+    return scheduler.export_state()
+
+
+@pytest.fixture
+def writes():
+    """Journal des écritures en base; plan enregistré et indisponibilités vidés pour chaque test"""
+    WRITES.clear()
+    PLAN['examens'].clear()
+    PLAN['surveillances'].clear()
+    yield WRITES
+    TABLES['indisponibilites_professeurs'].clear()
@@ -0,0 +1,68 @@
+"""
+Recuit simulé (config annealing): le delta d'un mouvement est pondéré terme à terme (un poids
+nul désactive un terme), le plan retenu reste valide et le recuit s'arrête sur l'échéance
+comme sur un arrêt demandé (drapeau ou signal partagé d'un worker).
+"""
+import threading
+import time
+from collections import Counter
+
+import pytest
+
+from services.annealing import SimulatedAnnealing
+from tests.test_scheduler import BASELINE_UNSCHEDULED, exams_per_student_day, greedy
+
+
+def removed_module(state, weights):
+    """Plan glouton dont le dernier module placé est retiré (insertion possible)"""
+    scheduler = greedy(state)
+    module_id = list(scheduler.placements)[-1]
+    scheduler._unplace_module(module_id)
+    annealer = SimulatedAnnealing(scheduler, [module_id], {'annealing_weights': weights})
+    return scheduler, annealer, module_id
+
+
+@pytest.mark.parametrize('spread', [0.0, 2.0])
+def test_insertion_delta_is_weighted(state, spread):
+    scheduler, annealer, module_id = removed_module(state, {'spread': spread})
+    annealer.rng.random = lambda: 0.0  # mouvement d'insertion
+    
+    delta = None
+    while delta is None:
+        journal, touched = [], {}
+        delta = annealer._propose(journal, touched)
+        if delta is None:
+            annealer._undo(journal)
+    
+    day = scheduler.day_index[scheduler.placements[module_id].slot.date]
+    scheduler._unplace_module(module_id)
+    assert delta == pytest.approx(spread * annealer._spread_cost(module_id, day) - annealer.weights['unscheduled'])
+
+
+def test_annealing_without_spread_term_keeps_valid_plan(state):
+    scheduler, annealer, module_id = removed_module(state, {'spread': 0})
+    
+    unscheduled = annealer.run(time.time() + 0.3)
+    
+    assert annealer.stats['moves'] > 0
+    assert module_id in scheduler.placements and unscheduled == []
+    assert max(exams_per_student_day(scheduler).values()) == 1
+    # Un surveillant par salle et créneau au plus
+    teams = {(se.salle_id, se.slot): se.prof_ids for se in scheduler.scheduled_exams}
+    busy = Counter((p, slot) for (_, slot), team in teams.items() for p in team)
+    assert max(busy.values()) == 1
+
+
+@pytest.mark.parametrize('stop', ['request', 'event'])
+def test_annealing_honours_stop(state, stop):
+    scheduler = greedy(state)
+    if stop == 'request':
+        scheduler.request_stop()
+    else:
+        scheduler.stop_event = threading.Event()
+        scheduler.stop_event.set()
+    annealer = SimulatedAnnealing(scheduler, BASELINE_UNSCHEDULED, {})
+    
+    unscheduled = annealer.run(time.time() + 30)
+    
+    assert annealer.stats['moves'] == 0 and unscheduled == BASELINE_UNSCHEDULED
@@ -0,0 +1,56 @@
+"""
+Points de contrôle: un planificateur repris depuis son point de contrôle retrouve le même
+plan (matrices d'occupation comprises), et une génération arrêtée reprend sans recharger
+la base jusqu'au plan d'une génération ininterrompue.
+"""
+import pytest
+
+from config import OPTIMIZATION_CONFIG
+from services import checkpoint
+from services.optimization import ExamScheduler, run_optimization
+from tests.conftest import PLAN, SESSION
+from tests.test_run_optimization import stop_after
+from tests.test_scheduler import BASELINE_PLAN, BASELINE_UNSCHEDULED, greedy, plan_of
+from tests.test_warm_start import saved_plan
+
+
+@pytest.fixture(autouse=True)
+def checkpoint_dir(monkeypatch, tmp_path):
+    monkeypatch.setitem(OPTIMIZATION_CONFIG, 'checkpoint_dir', str(tmp_path / 'checkpoints'))
+
+
+def test_checkpoint_restores_plan(state, tmp_path):
+    scheduler = greedy(state)
+    scheduler.checkpoint_path = str(tmp_path / 'plan')
+    scheduler._checkpoint('improve', BASELINE_UNSCHEDULED, force=True)
+    
+    resumed = ExamScheduler.from_checkpoint(scheduler.checkpoint_path)
+    
+    assert resumed.resume_phase == 'improve' and resumed.resume_unscheduled == BASELINE_UNSCHEDULED
+    assert plan_of(resumed) == BASELINE_PLAN
+    assert set(resumed.placements) == set(scheduler.placements)
+    assert resumed.slot_room_mask == scheduler.slot_room_mask
+    assert resumed.prof_total_supervisions == scheduler.prof_total_supervisions
+
+
+def test_missing_checkpoint_gives_none(tmp_path):
+    assert ExamScheduler.from_checkpoint(str(tmp_path / 'absent')) is None
+
+
+def test_stopped_run_resumes_from_checkpoint(writes):
+    path = checkpoint.checkpoint_path(SESSION['id'])
+    stopped = run_optimization(SESSION['id'], {'plan_cache': False, 'checkpoint': True}, on_start=stop_after(5))
+    assert not stopped['saved'] and checkpoint.has_checkpoint(path)
+    
+    # Reprise sans rechargement des données
+    with pytest.MonkeyPatch.context() as patch:
+        patch.setattr(ExamScheduler, '_load_data', lambda self: pytest.fail("données rechargées"))
+        resumed = run_optimization(SESSION['id'], {'plan_cache': False, 'resume': True})
+    
+    assert resumed['saved'] and resumed['untried_modules'] == 0
+    assert not checkpoint.has_checkpoint(path)
+    resumed_plan = saved_plan()
+    PLAN['examens'].clear()
+    PLAN['surveillances'].clear()
+    run_optimization(SESSION['id'], {'plan_cache': False})
+    assert resumed_plan == saved_plan()
@@ -0,0 +1,74 @@
+"""
+Diagnostic des modules non planifiés: les créneaux rejetés sont comptés par motif pendant la
+recherche de _place_module (le diagnostic ne rejoue pas la recherche de salles et de
+surveillants); la matrice des rejets grandit sans perdre les lignes déjà remplies.
+"""
+from tests.test_scheduler import BASELINE_UNSCHEDULED, greedy
+
+
+def reasons(scheduler, module_id):
+    counts = scheduler.rejection_counts[scheduler._rejection_row(module_id)]
+    return {reason: int(n) for reason, n in zip(scheduler.REJECTION_REASONS, counts) if n}
+
+
+def no_search(scheduler):
+    """Compte les appels à la recherche de salles et de surveillants"""
+    calls = []
+    
+    def counted(*args):
+        calls.append(args)
+        raise AssertionError("recherche rejouée par le diagnostic")
+    scheduler._find_rooms_and_supervisors = counted
+    return calls
+
+
+def test_rejections_counted_during_placement(state):
+    scheduler = greedy(state)
+    (module_id,) = BASELINE_UNSCHEDULED
+    
+    # Module 8: tous les jours déjà pris par des étudiants en dette
+    assert reasons(scheduler, module_id) == {'etudiants': len(scheduler.slots)}
+    heap = list(scheduler.prof_heap)
+    calls = no_search(scheduler)
+    scheduler._set_unscheduled(BASELINE_UNSCHEDULED)
+    
+    assert not calls and scheduler.prof_heap == heap
+    (conflict,) = scheduler.conflicts
+    assert conflict.examen1_id == module_id and f"étudiants {len(scheduler.slots)}" in conflict.description
+    assert scheduler.unscheduled_diagnostics()[0]['goulot'] == 'etudiants'
+
+
+def test_placed_modules_keep_no_rejection(state):
+    scheduler = greedy(state)
+    
+    assert scheduler.rejection_tried == set(BASELINE_UNSCHEDULED)
+    # Un module placé après plusieurs essais a compté les créneaux rejetés avant le sien
+    assert any(reasons(scheduler, m) for m in scheduler.placements)
+
+
+def test_module_not_tried_is_diagnosed_without_search(state):
+    scheduler = greedy(state)
+    (module_id,) = BASELINE_UNSCHEDULED
+    scheduler.rejection_tried.clear()
+    scheduler.rejection_counts[:] = 0
+    calls = no_search(scheduler)
+    
+    counts = scheduler._diagnose_module(module_id, scheduler.exams_by_module[module_id])
+    
+    assert not calls and int(counts.sum()) == len(scheduler.slots)
+
+
+def test_rejection_matrix_grows_keeping_rows(state):
+    scheduler = greedy(state)
+    (module_id,) = BASELINE_UNSCHEDULED
+    before = reasons(scheduler, module_id)
+    
+    # Voisinage élargi (re-planification): un module chargé après coup
+    new_id = max(scheduler.exams_by_module) + 1
+    scheduler.exams_by_module = dict(scheduler.exams_by_module)
+    scheduler.exams_by_module[new_id] = scheduler.exams_by_module[module_id]
+    index = scheduler._rejection_row(new_id)
+    
+    assert scheduler.rejection_counts.shape[0] == len(scheduler.exams_by_module)
+    assert not scheduler.rejection_counts[index].any()
+    assert reasons(scheduler, module_id) == before
@@ -0,0 +1,91 @@
+"""
+Générations en arrière-plan: une génération soumise enregistre son plan, l'annulation en
+cours arrête le planificateur (plan existant conservé), et un job annulé en file puis
+oublié par _prune ne fait pas échouer le worker qui le dépile.
+"""
+import time
+
+import pytest
+
+from config import OPTIMIZATION_CONFIG
+from services import jobs
+from tests.conftest import PLAN, SESSION
+
+
+class QueuedExecutor:
+    """Pool qui garde les jobs soumis en file (exécutés à la demande)"""
+    
+    def __init__(self):
+        self.queued = []
+    
+    def submit(self, fn, *args):
+        self.queued.append((fn, args))
+    
+    def run_all(self):
+        for fn, args in self.queued:
+            fn(*args)
+
+
+@pytest.fixture(autouse=True)
+def registry(monkeypatch, tmp_path):
+    monkeypatch.setitem(OPTIMIZATION_CONFIG, 'plan_cache_dir', str(tmp_path / 'cache'))
+    monkeypatch.setitem(OPTIMIZATION_CONFIG, 'checkpoint_dir', str(tmp_path / 'checkpoints'))
+    monkeypatch.setattr(jobs, '_jobs', {})
+
+
+@pytest.fixture
+def executor(monkeypatch):
+    executor = QueuedExecutor()
+    monkeypatch.setattr(jobs, '_get_executor', lambda: executor)
+    return executor
+
+
+def wait(job_id, timeout=30):
+    end = time.time() + timeout
+    while jobs.get_job_status(job_id)['status'] in jobs.ACTIVE_STATUSES:
+        assert time.time() < end
+        time.sleep(0.05)
+    return jobs.get_job_status(job_id)
+
+
+def test_submitted_generation_saves_plan(writes):
+    job_id = jobs.submit_generation(SESSION['id'], {'plan_cache': False})
+    
+    status = wait(job_id)
+    
+    assert status['status'] == 'termine' and status['progress'] == 1.0
+    assert status['result']['success'] and status['result']['saved']
+    assert status['result']['scheduled'] == len(PLAN['examens'])
+    assert jobs.active_job(SESSION['id']) is None
+
+
+def test_cancel_during_run_keeps_saved_plan(writes, executor, monkeypatch):
+    run_optimization = jobs.run_optimization
+    
+    def cancelled_on_start(session_id, config, progress_callback, on_start):
+        def start(scheduler):
+            on_start(scheduler)
+            assert jobs.cancel_job(job_id)
+        return run_optimization(session_id, config, progress_callback=progress_callback, on_start=start)
+    monkeypatch.setattr(jobs, 'run_optimization', cancelled_on_start)
+    job_id = jobs.submit_generation(SESSION['id'], {'plan_cache': False})
+    
+    executor.run_all()
+    
+    status = jobs.get_job_status(job_id)
+    assert status['status'] == 'annule' and status['cancel_requested']
+    assert not status['result']['saved'] and writes == []
+    assert not jobs.cancel_job(job_id)
+
+
+def test_cancelled_queued_job_pruned_before_start(executor, monkeypatch):
+    monkeypatch.setattr(jobs, 'MAX_FINISHED_JOBS', 1)
+    monkeypatch.setattr(jobs, 'run_optimization', lambda *args, **kwargs: pytest.fail("job annulé exécuté"))
+    first, second = jobs.submit_generation(SESSION['id'], {}), jobs.submit_generation(SESSION['id'], {})
+    
+    # Le second job annulé fait oublier le premier, encore dans la file du pool
+    assert jobs.cancel_job(first) and jobs.cancel_job(second)
+    assert jobs.get_job_status(first) is None
+    
+    executor.run_all()
+    assert [job['id'] for job in jobs.list_jobs()] == [second]
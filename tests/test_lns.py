@@ -0,0 +1,73 @@
+"""
+LNS (config lns): les ressources agrégées d'un créneau suivent les règles du glouton (span
+des examens longs, indisponibilités déclarées, limite journalière effective) et chaque
+MILP de voisinage est borné par l'échéance de la phase.
+"""
+import time
+
+from services import lns
+from services.lns import LargeNeighbourhoodSearch
+from services.optimization import ExamScheduler
+from tests.test_scheduler import BASELINE_UNSCHEDULED, exams_per_student_day, greedy
+
+
+def test_free_resources_follow_greedy_rules(state):
+    # Limite effective: min(max_supervisions_per_prof_per_day, max_exam_per_professor_per_day)
+    scheduler = ExamScheduler.from_state(state, {'max_exam_per_professor_per_day': 2})
+    first, second = scheduler.slots[0], scheduler.slots[1]
+    span = scheduler._span(first, 150)
+    assert span == (first, second)
+    # Un module placé au second créneau, un prof à la limite du jour, un prof indisponible
+    assignments = scheduler._find_rooms_and_supervisors(scheduler.exams_by_module[24], second)
+    scheduler._commit_assignments(24, assignments, second)
+    busy_rooms = {room['id'] for _, room, _ in assignments}
+    busy_profs = {p for _, _, team in assignments for p in team}
+    full, unavailable = [p['id'] for p in scheduler.professors if p['id'] not in busy_profs][:2]
+    scheduler.prof_daily_count[full][first.date] = 2
+    scheduler.prof_unavailable = {unavailable: scheduler.slot_bit[second]}
+    scheduler._index_unavailabilities()
+    search = LargeNeighbourhoodSearch(scheduler, [], scheduler.config)
+    
+    rooms, seats, profs = search._free_resources(first, span)
+    
+    free_rooms = [r for r in scheduler.rooms if r['id'] not in busy_rooms]
+    assert (rooms, seats) == (len(free_rooms), sum(r['capacite'] for r in free_rooms))
+    assert profs == len(scheduler.professors) - len(busy_profs) - 2
+    assert search._free_resources(first, (first,)) == (
+        len(scheduler.rooms), sum(r['capacite'] for r in scheduler.rooms), len(scheduler.professors) - 1
+    )
+
+
+def test_milp_time_limit_clipped_to_deadline(state, monkeypatch):
+    scheduler = greedy(state)
+    module_id = list(scheduler.placements)[-1]
+    scheduler._unplace_module(module_id)
+    search = LargeNeighbourhoodSearch(scheduler, [module_id], {'lns_milp_time_limit': 30})
+    limits = []
+    solve = lns.milp
+    
+    def recorded(*args, options, **kwargs):
+        limits.append(options['time_limit'])
+        return solve(*args, options=options, **kwargs)
+    monkeypatch.setattr(lns, 'milp', recorded)
+    
+    search.deadline = time.time() + 5
+    assert search._build_and_solve([module_id])
+    search.deadline = time.time() - 1
+    assert search._build_and_solve([module_id]) is None
+    
+    assert len(limits) == 1 and 0 < limits[0] <= 5
+
+
+def test_lns_repairs_removed_module(state):
+    scheduler = greedy(state)
+    module_id = list(scheduler.placements)[-1]
+    scheduler._unplace_module(module_id)
+    search = LargeNeighbourhoodSearch(scheduler, [module_id] + BASELINE_UNSCHEDULED, {})
+    
+    unscheduled = search.run(time.time() + 2)
+    
+    assert len(unscheduled) == len(BASELINE_UNSCHEDULED)
+    assert set(scheduler.placements) | set(unscheduled) == set(scheduler.exams_by_module)
+    assert search.stats['repaired'] >= 1
+    assert max(exams_per_student_day(scheduler).values()) == 1
@@ -0,0 +1,42 @@
+"""
+Mode exact (config solver='milp'): la solution MILP appliquée respecte les mêmes règles
+que le glouton (étudiants, salles, surveillants) et ne laisse pas plus de modules non
+planifiés; sans solution, repli sur le glouton.
+"""
+from collections import Counter
+
+from services.milp_solver import ExactSolver
+from services.optimization import ExamScheduler
+from tests.test_scheduler import BASELINE_PLAN, BASELINE_UNSCHEDULED, exams_per_student_day, plan_of
+
+
+def exact(state, config=None):
+    scheduler = ExamScheduler.from_state(state, dict({'solver': 'milp', 'milp_time_limit': 30}, **(config or {})))
+    return scheduler, scheduler._schedule_milp()
+
+
+def test_milp_plan_respects_constraints(state):
+    scheduler, (scheduled_count, unscheduled) = exact(state)
+    
+    assert scheduler.milp_stats['status'] == 'optimal' and not scheduler.milp_stats.get('fallback')
+    assert len(unscheduled) <= len(BASELINE_UNSCHEDULED)
+    assert scheduled_count == len(scheduler.scheduled_exams)
+    assert set(scheduler.placements) | set(unscheduled) == set(scheduler.exams_by_module)
+    assert max(exams_per_student_day(scheduler).values()) <= 1
+    # Une salle et un surveillant par créneau, équipe complète pour chaque salle
+    rooms = Counter((se.slot, se.salle_id, se.module_id) for se in scheduler.scheduled_exams)
+    assert len({(slot, room) for slot, room, _ in rooms}) == len(rooms)
+    teams = {(se.slot, se.salle_id): tuple(se.prof_ids) for se in scheduler.scheduled_exams}
+    busy = Counter((slot, p) for (slot, _), team in teams.items() for p in team)
+    assert max(busy.values()) == 1
+    assert all(se.prof_ids for se in scheduler.scheduled_exams)
+
+
+def test_milp_without_solution_falls_back_to_greedy(state, monkeypatch):
+    monkeypatch.setattr(ExactSolver, 'solve', lambda self, time_limit: None)
+    
+    scheduler, (_, unscheduled) = exact(state)
+    
+    assert scheduler.milp_stats['fallback']
+    assert plan_of(scheduler) == BASELINE_PLAN
+    assert unscheduled == BASELINE_UNSCHEDULED
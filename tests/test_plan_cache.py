@@ -0,0 +1,61 @@
+"""
+Cache de plans: mêmes données et mêmes paramètres → le plan en cache est rejoué sans
+replanifier (aucune écriture s'il est encore celui enregistré, ré-enregistré tel quel
+sinon); données ou paramètres modifiés → nouvelle génération.
+"""
+import pytest
+
+from config import OPTIMIZATION_CONFIG
+from services.optimization import ExamScheduler, run_optimization
+from tests.conftest import PLAN, SESSION, TABLES
+from tests.test_warm_start import saved_plan
+
+
+@pytest.fixture(autouse=True)
+def cache_dir(monkeypatch, tmp_path):
+    monkeypatch.setitem(OPTIMIZATION_CONFIG, 'plan_cache_dir', str(tmp_path / 'cache'))
+
+
+def forbid_generation(monkeypatch):
+    monkeypatch.setattr(ExamScheduler, 'schedule', lambda self, *args: pytest.fail("plan régénéré"))
+
+
+def test_cached_plan_already_saved(writes, monkeypatch):
+    first = run_optimization(SESSION['id'], {})
+    assert first['saved'] and 'cached' not in first
+    writes.clear()
+    forbid_generation(monkeypatch)
+    
+    second = run_optimization(SESSION['id'], {})
+    
+    assert second['cached'] == 'deja_enregistre'
+    assert second['scheduled'] == first['scheduled'] and second['conflicts'] == first['conflicts']
+    assert writes == []
+
+
+def test_cached_plan_rewritten_when_saved_plan_changed(writes, monkeypatch):
+    run_optimization(SESSION['id'], {})
+    expected = saved_plan()
+    PLAN['examens'].clear()
+    PLAN['surveillances'].clear()
+    forbid_generation(monkeypatch)
+    
+    result = run_optimization(SESSION['id'], {})
+    
+    assert result['cached'] == 'reenregistre'
+    assert saved_plan() == expected
+    # Plan de nouveau enregistré: rejoué ensuite sans écriture
+    writes.clear()
+    assert run_optimization(SESSION['id'], {})['cached'] == 'deja_enregistre'
+    assert writes == []
+
+
+def test_changed_data_or_config_regenerates(writes):
+    run_optimization(SESSION['id'], {})
+    
+    assert 'cached' not in run_optimization(SESSION['id'], {'max_exam_per_student_per_day': 2})
+    TABLES['indisponibilites_professeurs'].append({
+        'id': 1, 'professeur_id': 1, 'date_debut': SESSION['date_debut'], 'date_fin': SESSION['date_debut'],
+        'creneau_id': None, 'motif': 'Test'
+    })
+    assert 'cached' not in run_optimization(SESSION['id'], {})
@@ -0,0 +1,54 @@
+"""
+Pré-vérifications de faisabilité: aucune borne sur la session de test, et sur une instance
+réduite la borne inférieure ne dépasse jamais le nombre de modules que le glouton laisse;
+instance prouvée infaisable: run_optimization s'arrête sans toucher au plan enregistré.
+"""
+from services.optimization import ExamScheduler, run_optimization
+from services.precheck import FeasibilityPrecheck
+from tests.conftest import SESSION, TABLES
+
+
+def precheck(state, config=None, room_ids=None, prof_ids=None):
+    scheduler = ExamScheduler.from_state(state, config or {}, room_ids=room_ids, prof_ids=prof_ids)
+    result = FeasibilityPrecheck(scheduler, scheduler.config).run()
+    _, unscheduled = scheduler._schedule_modules(scheduler._sorted_modules())
+    assert result['lower_bound_unscheduled'] <= len(unscheduled)
+    return result
+
+
+def test_session_passes_precheck(state):
+    result = precheck(state)
+    
+    assert result['feasible'] and result['lower_bound_unscheduled'] == 0
+    assert all(check['ok'] for check in result['checks']) and not result['infeasible_modules']
+
+
+def test_group_larger_than_every_room(state):
+    result = precheck(state, room_ids={10})  # 15 places
+    
+    assert not result['feasible']
+    assert set(result['infeasible_modules']) == set(state['exams_by_module'])
+    assert all('plus grande salle (15 places)' in reason for reason in result['infeasible_modules'].values())
+
+
+def test_daily_supervision_limit_bound(state):
+    result = precheck(state, {'max_supervisions_per_prof_per_day': 1}, prof_ids={1, 2, 3})
+    
+    assert not result['feasible'] and not result['infeasible_modules']
+    failed = {check['check']: check['lower_bound'] for check in result['checks'] if not check['ok']}
+    assert failed == {'surveillants_jours': result['lower_bound_unscheduled']}
+
+
+def test_infeasible_session_keeps_saved_plan(writes):
+    # Un seul professeur disponible sur toute la session
+    TABLES['indisponibilites_professeurs'].extend(
+        {'id': p, 'professeur_id': p, 'date_debut': SESSION['date_debut'], 'date_fin': SESSION['date_fin'],
+         'creneau_id': None, 'motif': 'Absent'}
+        for p in range(2, 9)
+    )
+    
+    result = run_optimization(SESSION['id'], {'plan_cache': False})
+    
+    assert result['success'] and result['infeasible'] and not result['saved']
+    assert result['precheck']['lower_bound_unscheduled'] > 0 and result['scheduled'] == 0
+    assert writes == []
@@ -0,0 +1,63 @@
+"""
+Re-planification sur événement: seuls les modules touchés sont réparés à partir du plan
+enregistré, la base ne reçoit que le diff (pas de suppression globale) et le plan obtenu
+respecte toujours les contraintes des étudiants.
+"""
+from collections import Counter
+
+from services import replanning
+from tests.conftest import PLAN, SESSION, TABLES
+from tests.test_scheduler import greedy
+
+
+def saved_rows():
+    return {i: dict(e) for i, e in PLAN['examens'].items()}
+
+
+def saved_teams():
+    teams = {}
+    for sv in PLAN['surveillances']:
+        teams.setdefault(sv['examen_id'], []).append(sv['professeur_id'])
+    return teams
+
+
+def exams_per_student_day():
+    days = {e['module_id']: e['date_examen'] for e in PLAN['examens'].values()}
+    return Counter((r['etudiant_id'], days[r['module_id']]) for r in TABLES['inscriptions'] if r['module_id'] in days)
+
+
+def test_closed_room_moves_only_its_exams(state, writes):
+    greedy(state).save_to_database()
+    before = saved_rows()
+    writes.clear()
+    
+    result = replanning.replan_on_room_unavailable(SESSION['id'], 7)
+    
+    assert result['success'] and result['unscheduled_modules'] == []
+    assert result['affected_modules'] == 4  # modules 11, 12, 21, 22
+    after = saved_rows()
+    assert all(e['salle_id'] != 7 for e in after.values())
+    # Lignes hors salle 7 intactes, modules touchés toujours planifiés
+    assert {i: e for i, e in before.items() if e['salle_id'] != 7} == \
+        {i: e for i, e in after.items() if i in before and before[i]['salle_id'] != 7}
+    assert {e['module_id'] for e in after.values()} == {e['module_id'] for e in before.values()}
+    assert max(exams_per_student_day().values()) <= 1
+    assert not any(query.startswith('DELETE FROM examens WHERE session_id') for query, _ in writes)
+
+
+def test_absent_professor_is_replaced(state, writes):
+    greedy(state).save_to_database()
+    before, teams_before = saved_rows(), saved_teams()
+    writes.clear()
+    
+    result = replanning.replan_on_professor_absent(SESSION['id'], 8)
+    
+    assert result['success'] and result['unscheduled_modules'] == []
+    teams = saved_teams()
+    assert all(8 not in team for team in teams.values())
+    # Modules que le professeur 8 ne surveillait pas: ni déplacés ni re-surveillés
+    absent = {before[i]['module_id'] for i, team in teams_before.items() if 8 in team}
+    untouched = [i for i, e in before.items() if e['module_id'] not in absent]
+    assert untouched and all(saved_rows()[i] == before[i] and teams[i] == teams_before[i] for i in untouched)
+    assert result['rows_deleted'] + result['rows_inserted'] + result['supervisions_changed'] > 0
+    assert max(exams_per_student_day().values()) <= 1
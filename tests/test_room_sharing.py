@@ -0,0 +1,73 @@
+"""
+Partage de salles entre modules (cross_module_sharing): l'équipe d'une salle est comptée
+et enregistrée une fois par (salle, créneau), la limite journalière tient donc pour les
+surveillances réellement assurées.
+"""
+import random
+from collections import Counter
+
+import pytest
+
+from services.optimization import ExamScheduler
+
+
+def shared_plan(state, limit, flow=False):
+    config = {'cross_module_sharing': True, 'max_supervisions_per_prof_per_day': limit}
+    if flow:
+        config['supervisor_assignment'] = 'flow'
+    scheduler = ExamScheduler.from_state(state, config)
+    _, unscheduled = scheduler._schedule_modules(scheduler._sorted_modules())
+    if flow:
+        scheduler._assign_supervisors_flow(unscheduled)
+    return scheduler
+
+
+def room_teams(scheduler):
+    """Équipe de chaque (salle, créneau) occupé"""
+    teams = {}
+    for se in scheduler.scheduled_exams:
+        assert teams.setdefault((se.salle_id, se.slot), se.prof_ids) == se.prof_ids
+    return teams
+
+
+@pytest.mark.parametrize('flow', [False, True])
+@pytest.mark.parametrize('limit', [2, 3])
+def test_daily_limit_holds_with_sharing(state, limit, flow):
+    scheduler = shared_plan(state, limit, flow)
+    teams = room_teams(scheduler)
+    
+    # Des salles accueillent bien plusieurs modules
+    modules = {}
+    for se in scheduler.scheduled_exams:
+        modules.setdefault((se.salle_id, se.slot), set()).add(se.module_id)
+    assert max(len(module_ids) for module_ids in modules.values()) > 1
+    daily = Counter((p, slot.date) for (_, slot), team in teams.items() for p in team)
+    assert max(daily.values()) <= limit
+    assert {(p, d): n for p, days in scheduler.prof_daily_count.items() for d, n in days.items() if n} == dict(daily)
+    assert sum(scheduler.prof_total_supervisions.values()) == sum(len(team) for team in teams.values())
+
+
+def test_unplacing_shared_rooms_releases_everything(state):
+    scheduler = shared_plan(state, 3)
+    module_ids = list(scheduler.placements)
+    random.Random(1).shuffle(module_ids)
+    
+    for module_id in module_ids:
+        scheduler._unplace_module(module_id)
+    
+    assert not scheduler.scheduled_exams and not scheduler.room_sharing
+    assert not any(scheduler.slot_room_mask.values()) and not any(scheduler.slot_prof_mask.values())
+    assert not any(n for days in scheduler.prof_daily_count.values() for n in days.values())
+    assert not any(scheduler.prof_total_supervisions.values())
+
+
+def test_shared_room_team_is_saved_once(state, writes):
+    scheduler = shared_plan(state, 3)
+    teams = room_teams(scheduler)
+    
+    scheduler.save_to_database()
+    
+    exams = sum(1 for query, _ in writes if query.startswith('INSERT INTO examens'))
+    supervisions = sum(1 for query, _ in writes if query.startswith('INSERT INTO surveillances'))
+    assert exams == len(scheduler.scheduled_exams) > len(teams)
+    assert supervisions == sum(len(team) for team in teams.values())
@@ -0,0 +1,133 @@
+"""
+run_optimization: l'échéance borne toute la génération, passe gloutonne comprise; une
+génération interrompue avant la fin de la passe gloutonne (échéance ou arrêt demandé) publie
+son plan partiel comme meilleur plan et ne remplace jamais le plan enregistré.
+"""
+import time
+
+import pytest
+
+from config import OPTIMIZATION_CONFIG
+from services.optimization import run_optimization
+from tests.conftest import SESSION
+
+
+@pytest.fixture(autouse=True)
+def no_disk_state(monkeypatch, tmp_path):
+    monkeypatch.setitem(OPTIMIZATION_CONFIG, 'plan_cache_dir', str(tmp_path / 'cache'))
+    monkeypatch.setitem(OPTIMIZATION_CONFIG, 'checkpoint_dir', str(tmp_path / 'checkpoints'))
+
+
+def plan_writes(writes):
+    return [query for query, _ in writes if 'examens' in query or 'surveillances' in query]
+
+
+def after_placements(calls, action):
+    """on_start: exécute action(scheduler) pendant la passe gloutonne, au placement n° calls"""
+    def on_start(scheduler):
+        place = scheduler._place_module
+        count = [0]
+        
+        def counted(*args):
+            count[0] += 1
+            if count[0] == calls:
+                action(scheduler)
+            return place(*args)
+        scheduler._place_module = counted
+        started.append(scheduler)
+    started = []
+    on_start.started = started
+    return on_start
+
+
+def stop_after(calls):
+    return after_placements(calls, lambda scheduler: scheduler.request_stop())
+
+
+def expire_after(calls):
+    """Échéance atteinte au placement n° calls"""
+    def expire(scheduler):
+        scheduler.deadline = time.time() - 1
+    return after_placements(calls, expire)
+
+
+def test_complete_run_replaces_saved_plan(writes):
+    result = run_optimization(SESSION['id'], {'plan_cache': False})
+    
+    assert result['success'] and result['saved']
+    assert result['untried_modules'] == 0
+    assert any(query.startswith('DELETE FROM examens') for query in plan_writes(writes))
+    assert any(query.startswith('INSERT INTO examens') for query in plan_writes(writes))
+
+
+def test_stop_during_greedy_keeps_saved_plan(writes):
+    result = run_optimization(SESSION['id'], {'plan_cache': False}, on_start=stop_after(5))
+    
+    assert result['success']
+    assert not result['saved']
+    assert result['timed_out']
+    assert result['untried_modules'] > 0
+    assert writes == []
+    assert result['diagnostics'] == []
+
+
+def test_deadline_bounds_greedy_pass(writes):
+    on_start = expire_after(5)
+    result = run_optimization(SESSION['id'], {'plan_cache': False}, on_start=on_start)
+    scheduler = on_start.started[0]
+    
+    assert result['success'] and result['timed_out']
+    assert not result['saved'] and writes == []
+    # Plan partiel: 5 modules tentés, les autres signalés comme non traités (pas impossibles)
+    assert len(scheduler.placements) == 5
+    assert result['untried_modules'] == 24 - 5
+    assert sorted(result['untried_module_ids']) == sorted(set(scheduler.exams_by_module) - set(scheduler.placements))
+    assert result['diagnostics'] == []
+    assert scheduler.best_plan['scheduled'] == result['scheduled'] == len(scheduler.scheduled_exams)
+    assert sorted(scheduler.best_plan['unscheduled']) == sorted(result['untried_module_ids'])
+
+
+def test_elapsed_deadline_places_nothing(writes):
+    result = run_optimization(SESSION['id'], {'plan_cache': False, 'optimization_timeout_seconds': 1e-6})
+    
+    assert result['timed_out'] and not result['saved']
+    assert result['scheduled'] == 0
+    assert result['untried_modules'] == 24
+    assert writes == []
+
+
+def test_flow_phase_skipped_on_partial_plan(writes):
+    on_start = expire_after(5)
+    result = run_optimization(SESSION['id'], {'plan_cache': False, 'supervisor_assignment': 'flow'}, on_start=on_start)
+    
+    assert result['timed_out'] and result['supervision'] is None
+    # Plan partiel publié avec les surveillants de la recherche gloutonne
+    scheduler = on_start.started[0]
+    assert scheduler.scheduled_exams and all(se.prof_ids for se in scheduler.scheduled_exams)
+
+
+def test_stop_during_improvement_saves_complete_plan(writes):
+    config = {'plan_cache': False, 'anytime': True, 'optimization_timeout_seconds': 30}
+    
+    def on_start(scheduler):
+        improve = scheduler._improve_until_deadline
+        
+        def stopped(*args, **kwargs):
+            scheduler.request_stop()
+            return improve(*args, **kwargs)
+        scheduler._improve_until_deadline = stopped
+    
+    result = run_optimization(SESSION['id'], config, on_start=on_start)
+    
+    assert result['saved']
+    assert result['untried_modules'] == 0
+    assert any(query.startswith('INSERT INTO examens') for query in plan_writes(writes))
+
+
+def test_anytime_improves_until_deadline(writes):
+    config = {'plan_cache': False, 'anytime': True, 'optimization_timeout_seconds': 0.5}
+    result = run_optimization(SESSION['id'], config)
+    
+    assert result['saved'] and not result['timed_out']
+    assert result['anytime_iterations'] > 0
+    assert 0.5 <= result['execution_time'] < 1.5
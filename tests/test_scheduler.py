@@ -0,0 +1,196 @@
+"""
+Planificateur glouton: mêmes placements que l'implémentation d'origine et structures
+optimisées (cohortes, matrice d'occupation, graphe de conflits, index des salles, tas
+des surveillants) équivalentes à un calcul direct sur les données de la fixture.
+"""
+from collections import defaultdict
+from datetime import date
+
+import pytest
+
+from services.optimization import ExamScheduler
+from tests.conftest import TABLES
+
+
+# Placements du planificateur d'origine (contrôles par étudiant, parcours linéaire des
+# salles, tri des professeurs à chaque appel) sur la session de test:
+# (module, groupe, salle, jour de janvier 2026, créneau, surveillants)
+BASELINE_PLAN = [
+    (1, 'G01', 1, 5, 1, (1, 2)), (1, 'G02', 1, 5, 1, (1, 2)), (1, 'G03', 2, 5, 1, (3,)),
+    (2, 'G01', 1, 6, 1, (4, 3)), (2, 'G02', 1, 6, 1, (4, 3)), (2, 'G03', 2, 6, 1, (1,)),
+    (3, 'G01', 1, 7, 1, (2, 4)), (3, 'G02', 1, 7, 1, (2, 4)), (3, 'G03', 2, 7, 1, (1,)),
+    (4, 'G01', 1, 8, 1, (3, 1)), (4, 'G02', 1, 8, 1, (3, 1)), (4, 'G03', 2, 8, 1, (2,)),
+    (5, 'G01', 5, 7, 1, (3,)), (5, 'G02', 6, 7, 1, (8,)),
+    (6, 'G01', 1, 9, 1, (4, 2)), (6, 'G02', 1, 9, 1, (4, 2)),
+    (7, 'G01', 5, 8, 1, (4,)), (7, 'G02', 6, 8, 1, (8,)),
+    (9, 'G01', 3, 9, 1, (1,)), (9, 'G02', 3, 9, 1, (1,)),
+    (10, 'G01', 6, 5, 1, (4,)),
+    (11, 'G01', 7, 6, 1, (2,)),
+    (12, 'G01', 7, 8, 1, (6,)),
+    (13, 'G01', 3, 6, 1, (8,)), (13, 'G02', 3, 6, 1, (8,)), (13, 'G03', 4, 6, 1, (5,)),
+    (14, 'G01', 4, 5, 1, (6,)), (14, 'G02', 3, 5, 1, (5,)), (14, 'G03', 5, 5, 1, (7,)),
+    (15, 'G01', 3, 7, 1, (6,)), (15, 'G02', 3, 7, 1, (6,)), (15, 'G03', 4, 7, 1, (7,)),
+    (16, 'G01', 3, 8, 1, (5,)), (16, 'G02', 3, 8, 1, (5,)), (16, 'G03', 4, 8, 1, (7,)),
+    (17, 'G01', 1, 7, 2, (5, 6)), (17, 'G02', 1, 7, 2, (5, 6)),
+    (18, 'G01', 5, 6, 1, (6,)), (18, 'G02', 6, 6, 1, (7,)),
+    (19, 'G01', 1, 8, 2, (7, 8)), (19, 'G02', 1, 8, 2, (7, 8)),
+    (20, 'G01', 2, 9, 1, (5,)), (20, 'G02', 2, 9, 1, (5,)),
+    (21, 'G01', 7, 5, 1, (8,)),
+    (22, 'G01', 7, 7, 1, (5,)),
+    (23, 'G01', 2, 8, 2, (6,)),
+    (24, 'G01', 4, 9, 1, (7,)),
+]
+
+# Module 8 (L3, département 1): deux étudiants en dette suivent aussi deux modules de L1,
+# soit 6 examens pour 5 jours
+BASELINE_UNSCHEDULED = [8]
+
+
+def plan_of(scheduler: ExamScheduler):
+    return sorted(
+        (se.module_id, se.groupe, se.salle_id, se.slot.date.day, se.slot.creneau_id, tuple(se.prof_ids))
+        for se in scheduler.scheduled_exams
+    )
+
+
+def greedy(state, config=None) -> ExamScheduler:
+    scheduler = ExamScheduler.from_state(state, config or {})
+    scheduler.greedy_result = scheduler._schedule_modules(scheduler._sorted_modules())
+    return scheduler
+
+
+def exams_per_student_day(scheduler: ExamScheduler):
+    """Examens par (étudiant, jour) recalculés depuis les inscriptions de la fixture"""
+    day_of = {module_id: placement.slot.date for module_id, placement in scheduler.placements.items()}
+    counts = defaultdict(int)
+    for row in TABLES['inscriptions']:
+        if row['module_id'] in day_of:
+            counts[(row['etudiant_id'], day_of[row['module_id']])] += 1
+    return counts
+
+
+def test_greedy_matches_baseline_plan(state):
+    scheduler = greedy(state)
+    
+    assert plan_of(scheduler) == BASELINE_PLAN
+    assert scheduler.greedy_result == (len(BASELINE_PLAN), BASELINE_UNSCHEDULED)
+
+
+def test_from_state_copies_are_independent(state):
+    first = greedy(state)
+    second = greedy(state)
+    
+    assert plan_of(first) == plan_of(second) == BASELINE_PLAN
+
+
+def test_cohorts_partition_students(state):
+    students = {row['etudiant_id'] for row in TABLES['inscriptions']}
+    
+    assert sum(state['cohort_sizes']) == len(students)
+    # Une cohorte par ensemble de modules distinct
+    modules_of = defaultdict(set)
+    for row in TABLES['inscriptions']:
+        modules_of[row['etudiant_id']].add(row['module_id'])
+    assert len(state['cohort_sizes']) == len({frozenset(m) for m in modules_of.values()})
+
+
+def test_occupancy_matrix_matches_students(state):
+    scheduler = greedy(state)
+    
+    expected = defaultdict(int)
+    modules_of_cohort = defaultdict(set)
+    for module_id, cohort_ids in scheduler.module_cohorts.items():
+        for cohort_id in cohort_ids.tolist():
+            modules_of_cohort[cohort_id].add(module_id)
+    for cohort_id, module_ids in modules_of_cohort.items():
+        for module_id in module_ids & set(scheduler.placements):
+            expected[(cohort_id, scheduler.day_index[scheduler.placements[module_id].slot.date])] += 1
+    
+    occupied = {(int(c), int(d)): int(scheduler.cohort_day_exams[c, d])
+                for c, d in zip(*scheduler.cohort_day_exams.nonzero())}
+    assert occupied == dict(expected)
+    assert max(exams_per_student_day(scheduler).values()) == 1
+
+
+@pytest.mark.parametrize('max_exams', [2, 3])
+def test_several_exams_per_day_respect_student_limit(state, max_exams):
+    scheduler = greedy(state, {'max_exam_per_student_per_day': max_exams})
+    
+    assert max(exams_per_student_day(scheduler).values()) <= max_exams
+    assert not scheduler.greedy_result[1]
+
+
+def test_conflict_graph_matches_shared_students(state):
+    students = defaultdict(set)
+    for row in TABLES['inscriptions']:
+        students[row['module_id']].add(row['etudiant_id'])
+    
+    graph = state['conflict_graph']
+    module_ids = state['module_ids'].tolist()
+    for i, a in enumerate(module_ids):
+        for j, b in enumerate(module_ids):
+            shared = len(students[a] & students[b]) if a != b else 0
+            assert graph[i, j] == shared, (a, b)
+    assert state['module_degree'].tolist() == [int((graph[i] != 0).sum()) for i in range(len(module_ids))]
+
+
+def test_room_index_matches_linear_scan(state):
+    scheduler = ExamScheduler.from_state(state, {})
+    original = scheduler._free_rooms_mask
+    calls = []
+    
+    def checked(slot, min_capacity, used_mask=0, span=None):
+        mask = original(slot, min_capacity, used_mask, span)
+        expected = {
+            room['id'] for room in scheduler.rooms
+            if room['capacite'] >= min_capacity
+            and not scheduler.room_bit[room['id']] & used_mask
+            and not scheduler._room_busy(room['id'], span or (slot,))
+        }
+        assert {room_id for room_id, bit in scheduler.room_bit.items() if mask & bit} == expected
+        calls.append(slot)
+        return mask
+    
+    scheduler._free_rooms_mask = checked
+    scheduler._schedule_modules(scheduler._sorted_modules())
+    
+    assert calls
+    assert plan_of(scheduler) == BASELINE_PLAN
+
+
+def test_supervisor_pool_matches_sorted_scan(state):
+    scheduler = ExamScheduler.from_state(state, {})
+    original = scheduler._find_supervisors
+    max_per_day = scheduler.config.get('max_supervisions_per_prof_per_day', 3)
+    calls = []
+    
+    def reference(dept_id, slot, count, excluded, span):
+        """Implémentation d'origine: tri stable de tous les professeurs par charge"""
+        sorted_profs = sorted(scheduler.professors, key=lambda p: scheduler.prof_total_supervisions[p['id']])
+        eligible = [
+            p['id'] for p in sorted_profs
+            if p['id'] not in excluded and scheduler.prof_daily_count[p['id']][slot.date] < max_per_day
+            and scheduler._is_prof_available_for_slot(p['id'], slot, span)
+        ]
+        first = [p for p in eligible if scheduler.professors[scheduler.prof_rank[p]]['dept_id'] == dept_id][:count]
+        return first + [p for p in eligible if p not in first][:count - len(first)]
+    
+    def checked(dept_id, slot, count, excluded, span=None):
+        expected = reference(dept_id, slot, count, excluded, span)
+        supervisors = original(dept_id, slot, count, excluded, span)
+        assert supervisors == expected
+        calls.append(slot)
+        return supervisors
+    
+    scheduler._find_supervisors = checked
+    scheduler._schedule_modules(scheduler._sorted_modules())
+    
+    assert calls
+    assert plan_of(scheduler) == BASELINE_PLAN
+
+
+def test_slots_cover_working_days(state):
+    days = sorted({slot.date for slot in state['slots']})
+    
+    assert days == [date(2026, 1, d) for d in range(5, 10)]
+    assert len(state['slots']) == 15
@@ -0,0 +1,100 @@
+"""
+Mode deux phases (supervisor_assignment='flow'): la phase 1 ne choisit aucun surveillant
+(capacité agrégée seulement), l'affectation globale respecte la limite journalière, comptée
+par ligne d'examen de groupe comme dans _commit_assignments (une salle regroupant 2 groupes
+compte 2). Les surveillants supplémentaires ne sont retirés qu'en dernier recours (limite 2
+sur la session de test); flot infaisable: repli sur la recherche gloutonne.
+"""
+from collections import Counter
+
+import pytest
+
+from services.optimization import ExamScheduler
+from services.supervision import SupervisorFlow
+
+
+def phase_one(state, limit):
+    config = {'supervisor_assignment': 'flow', 'max_supervisions_per_prof_per_day': limit}
+    scheduler = ExamScheduler.from_state(state, config)
+    _, unscheduled = scheduler._schedule_modules(scheduler._sorted_modules())
+    return scheduler, unscheduled
+
+
+def two_phase(state, limit):
+    scheduler, unscheduled = phase_one(state, limit)
+    scheduler._assign_supervisors_flow(unscheduled)
+    return scheduler
+
+
+def test_phase_one_only_reserves_capacity(state):
+    scheduler, _ = phase_one(state, 2)
+    
+    assert scheduler.scheduled_exams
+    assert all(se.prof_ids == [] for se in scheduler.scheduled_exams)
+    assert not any(scheduler.prof_total_supervisions.values()) and not any(scheduler.slot_prof_mask.values())
+    # Une salle réservée par créneau couvert, une surveillance par ligne et par jour
+    rooms = Counter(slot for slot, _ in {(se.slot, se.salle_id) for se in scheduler.scheduled_exams})
+    assert {s: n for s, n in scheduler.slot_team_count.items() if n} == dict(rooms)
+    assert max(rooms.values()) <= len(scheduler.professors)
+    days = Counter(se.slot.date for se in scheduler.scheduled_exams)
+    assert {d: n for d, n in scheduler.day_team_count.items() if n} == dict(days)
+    assert max(days.values()) <= 2 * len(scheduler.professors)
+    
+    for module_id in list(scheduler.placements):
+        scheduler._unplace_module(module_id)
+    assert not any(scheduler.slot_team_count.values()) and not any(scheduler.day_team_count.values())
+
+
+@pytest.mark.parametrize('limit', [2, 3])
+def test_flow_respects_daily_limit(state, limit):
+    scheduler = two_phase(state, limit)
+    
+    assert scheduler.supervision_stats['status'] == 'optimal'
+    rows = Counter((p, se.slot.date) for se in scheduler.scheduled_exams for p in se.prof_ids)
+    assert max(rows.values()) <= limit
+    assert {(p, d): n for p, days in scheduler.prof_daily_count.items() for d, n in days.items() if n} == dict(rows)
+
+
+@pytest.mark.parametrize('limit', [2, 3])
+def test_flow_keeps_room_teams_and_slots(state, limit):
+    scheduler = two_phase(state, limit)
+    
+    teams = {}
+    for se in scheduler.scheduled_exams:
+        required = scheduler._get_required_supervisors(scheduler.room_by_id[se.salle_id])
+        assert 1 <= len(se.prof_ids) <= required
+        assert len(set(se.prof_ids)) == len(se.prof_ids)
+        # Groupes d'une même salle: même équipe
+        assert teams.setdefault((se.salle_id, se.slot), se.prof_ids) == se.prof_ids
+    busy = Counter((p, slot) for (_, slot), team in teams.items() for p in team)
+    assert max(busy.values()) == 1
+
+
+def test_flow_staffs_every_room(state):
+    scheduler = two_phase(state, 3)
+    
+    assert scheduler.supervision_stats['status'] == 'optimal'
+    assert all(se.prof_ids for se in scheduler.scheduled_exams)
+    stats = scheduler.supervision_stats
+    assert stats['supervisions_after'] == sum(len(se.prof_ids) for se in scheduler.scheduled_exams)
+    assert sum(scheduler.prof_total_supervisions.values()) == stats['supervisions_after']
+    assert not scheduler.defer_supervisors
+
+
+def test_infeasible_flow_falls_back_to_greedy_search(state, monkeypatch):
+    scheduler, unscheduled = phase_one(state, 2)
+    placed = set(scheduler.placements)
+    
+    def infeasible(self, *args):
+        self.stats['status'] = 'failed'
+        return None
+    monkeypatch.setattr(SupervisorFlow, '_solve_flow', infeasible)
+    unscheduled = scheduler._assign_supervisors_flow(unscheduled)
+    
+    stats = scheduler.supervision_stats
+    assert stats['status'] == 'failed' and stats['fallback'] == 'glouton'
+    assert all(se.prof_ids for se in scheduler.scheduled_exams)
+    assert set(scheduler.placements) | set(unscheduled) >= placed
+    daily = Counter((p, se.slot.date) for se in scheduler.scheduled_exams for p in se.prof_ids)
+    assert {(p, d): n for p, days in scheduler.prof_daily_count.items() for d, n in days.items() if n} == dict(daily)
+    assert stats['supervisions_after'] == sum(daily.values())
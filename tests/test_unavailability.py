@@ -0,0 +1,67 @@
+"""
+Import des indisponibilités (CSV identifié par matricule): lignes invalides rejetées avec
+leur numéro de ligne, remplacement limité aux professeurs importés, et périodes importées
+respectées par la génération suivante.
+"""
+from datetime import date
+
+from services.optimization import run_optimization
+from services.unavailability import import_unavailabilities, parse_csv
+from tests.conftest import PLAN, SESSION, TABLES
+
+
+CSV = (
+    "\ufeffMatricule ; Date_debut;date_fin;creneau;motif\n"
+    "P001;2026-01-05;2026-01-06;;Congé\n"
+    "P002;07/01/2026;;C2;Jury\n"
+    "P003;2026-01-08;;3;\n"
+    "X999;2026-01-05;;;\n"
+    "P004;2026-13-01;;;\n"
+    "P005;2026-01-09;2026-01-08;;\n"
+    "P006;2026-01-09;;C9;\n"
+).encode('utf-8')
+
+
+def test_parse_csv_normalises_header_and_delimiter():
+    rows = parse_csv(CSV)
+    
+    assert len(rows) == 7
+    assert rows[0] == {'matricule': 'P001', 'date_debut': '2026-01-05', 'date_fin': '2026-01-06',
+                       'creneau': '', 'motif': 'Congé'}
+    assert parse_csv("matricule,date_debut\nP001,2026-01-05\n") == [{'matricule': 'P001', 'date_debut': '2026-01-05'}]
+
+
+def test_import_rejects_invalid_lines(writes):
+    result = import_unavailabilities(parse_csv(CSV))
+    
+    assert result['inserted'] == 3
+    assert [line for line, _ in result['errors']] == [5, 6, 7, 8]
+    assert "matricule inconnu 'X999'" in result['errors'][0][1]
+    assert "date invalide" in result['errors'][1][1]
+    assert "créneau inconnu 'C9'" in result['errors'][3][1]
+    rows = sorted((r['professeur_id'], r['date_debut'], r['date_fin'], r['creneau_id'], r['motif'])
+                  for r in TABLES['indisponibilites_professeurs'])
+    assert rows == [
+        (1, date(2026, 1, 5), date(2026, 1, 6), None, 'Congé'),
+        (2, date(2026, 1, 7), date(2026, 1, 7), 2, 'Jury'),
+        (3, date(2026, 1, 8), date(2026, 1, 8), 3, None),
+    ]
+
+
+def test_replace_only_touches_imported_professors(writes):
+    import_unavailabilities(parse_csv(CSV))
+    
+    result = import_unavailabilities([{'matricule': 'P001', 'date_debut': '2026-01-09'}], replace=True)
+    
+    assert result == {'inserted': 1, 'errors': []}
+    rows = sorted((r['professeur_id'], r['date_debut']) for r in TABLES['indisponibilites_professeurs'])
+    assert rows == [(1, date(2026, 1, 9)), (2, date(2026, 1, 7)), (3, date(2026, 1, 8))]
+
+
+def test_imported_unavailability_is_respected(writes):
+    import_unavailabilities([{'matricule': 'P001', 'date_debut': SESSION['date_debut'], 'date_fin': SESSION['date_fin']}])
+    
+    result = run_optimization(SESSION['id'], {'plan_cache': False})
+    
+    assert result['saved'] and PLAN['surveillances']
+    assert all(sv['professeur_id'] != 1 for sv in PLAN['surveillances'])
@@ -0,0 +1,66 @@
+"""
+Démarrage à chaud (config warm_start): les modules du plan enregistré encore réalisables
+sont conservés tels quels, seuls les modules invalidés sont re-planifiés et la sauvegarde
+incrémentale ne réécrit que leurs lignes.
+"""
+from services.optimization import ExamScheduler
+from tests.conftest import PLAN
+from tests.test_scheduler import BASELINE_PLAN, BASELINE_UNSCHEDULED, greedy, plan_of
+
+
+PLANNED_MODULES = {row[0] for row in BASELINE_PLAN}
+
+
+def saved_plan():
+    """Plan enregistré, au format de plan_of"""
+    teams = {}
+    for sv in PLAN['surveillances']:
+        teams.setdefault(sv['examen_id'], []).append(sv['professeur_id'])
+    return sorted(
+        (e['module_id'], e['groupe'], e['salle_id'], e['date_examen'].day, e['creneau_id'], tuple(teams.get(i, ())))
+        for i, e in PLAN['examens'].items()
+    )
+
+
+def warm_start(state, room_ids=None):
+    scheduler = ExamScheduler.from_state(state, {'warm_start': True}, room_ids=room_ids)
+    scheduler.result = scheduler._schedule_warm_start()
+    return scheduler
+
+
+def test_unchanged_data_keeps_whole_plan(state, writes):
+    greedy(state).save_to_database()
+    writes.clear()
+    
+    scheduler = warm_start(state)
+    scheduler.save_to_database()
+    
+    assert scheduler.kept_modules == PLANNED_MODULES
+    assert plan_of(scheduler) == BASELINE_PLAN
+    assert scheduler.result[1] == BASELINE_UNSCHEDULED
+    assert scheduler.warm_start_stats['rows_changed'] == 0
+    assert writes == []
+
+
+def test_closed_room_replans_only_its_modules(state, writes):
+    greedy(state).save_to_database()
+    before = {e['id']: dict(e) for e in PLAN['examens'].values()}
+    writes.clear()
+    
+    # Salle 7 retirée: seuls ses modules (11, 12, 21, 22) sont re-planifiés
+    scheduler = warm_start(state, room_ids={r['id'] for r in state['rooms']} - {7})
+    scheduler.save_to_database()
+    
+    moved = {row[0] for row in BASELINE_PLAN if row[2] == 7}
+    assert moved == {11, 12, 21, 22}
+    assert scheduler.kept_modules == PLANNED_MODULES - moved
+    assert [row for row in plan_of(scheduler) if row[0] not in moved] == \
+        [row for row in BASELINE_PLAN if row[0] not in moved]
+    assert all(se.salle_id != 7 for se in scheduler.scheduled_exams)
+    # Lignes des modules conservés intactes, plan enregistré = plan calculé
+    assert all(before[i] == e for i, e in PLAN['examens'].items() if e['module_id'] not in moved)
+    assert saved_plan() == plan_of(scheduler)
+    deleted = [query for query, _ in writes if query.startswith('DELETE FROM examens')]
+    assert deleted == [f"DELETE FROM examens WHERE id IN ({','.join(['%s'] * 4)})"]
+    assert scheduler.warm_start_stats['rows_deleted'] == 4
+